@@ -4,6 +4,11 @@ from flask_cors import CORS
 from flask_healthz import healthz
 from flask_restx import Api
 from common.extensions import cache
+from common.cache_backends import get_cache_config
+from common import conditional
+from common import config as settings
+from common import memo
+from lib import warmup
 
 from .ecnl import ns as ecnl
 from .ncaa import ns as ncaa
@@ -30,17 +35,27 @@ api.add_namespace(nwsl, path="/nwsl")
 
 config = {
     "DEBUG": True,          # some Flask specific configs
-    "CACHE_TYPE": "SimpleCache",  # Flask-Caching related configs
     "CACHE_DEFAULT_TIMEOUT": 300
 }
 
+# Flask-Caching related configs, selected with SOCCER_API_CACHE_TYPE.
+config.update(get_cache_config())
+
 app = Flask(__name__)
 
 # tell Flask to use the above defined config
 app.config.from_mapping(config)
 cache.init_app(app, config)
 
+# Report how old the cached scrapes behind each response are, and let
+# clients and the nginx cache revalidate them (hooks run in reverse order).
+app.after_request(conditional.add_validators)
+app.after_request(memo.add_age_header)
+
 app.register_blueprint(blueprint)
 app.register_blueprint(healthz, url_prefix="/healthz")
 
 cors = CORS(app, resources={r"/api/*": {"origins": "*"}})
+
+if settings.WARMUP_ENABLED:
+    warmup.SCHEDULER.start()
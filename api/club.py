@@ -1,9 +1,10 @@
 from http import HTTPStatus
 
-from flask_restx import Namespace, Resource, fields, reqparse
+from flask_restx import Resource, fields, reqparse
 from requests.exceptions import HTTPError
+from common.marshalling import Namespace
 
-from common import utils
+from lib import clubs as club_registry
 
 ns = Namespace("club", description="Generic club related operations")
 
@@ -11,7 +12,9 @@ league_lookup_model = ns.model(
     "LeagueLookup",
     {
         "club": fields.String(required=True, description="The name of the club"),
-        "league": fields.String(required=True, description="The name of the league")
+        "league": fields.String(required=True, description="The name of the league"),
+        "match": fields.String(description="The name of the club it was resolved to"),
+        "confidence": fields.Float(description="How closely the name matched, from 0 to 1")
     }
 )
 
@@ -20,9 +23,6 @@ league_lookup_model = ns.model(
 clubs_parser = ns.parser()
 clubs_parser.add_argument("clubs[]", type=str, location="form", action="append")
 
-ecnl_clubs = []
-ga_clubs = []
-
 @ns.route("/league/lookup")
 @ns.expect(clubs_parser)
 class LeagueLookup(Resource):
@@ -32,25 +32,30 @@ class LeagueLookup(Resource):
     @ns.marshal_list_with(league_lookup_model)
     def post(self):
         """Lookup club leagues"""
-        global ecnl_clubs
-        global ga_clubs
-
-        result = []
-
-        search = utils.ClubSearch()
-
         args = clubs_parser.parse_args()
-        clubs = args["clubs[]"]
-
-        if ecnl_clubs is None or len(ecnl_clubs) == 0:
-            ecnl_clubs = search.get_ecnl_clubs()
-
-        if ga_clubs is None or len(ga_clubs) == 0:
-            ga_clubs = search.get_ga_clubs()
-
-        for club_name in clubs:
-            league = utils.get_league(club_name, ecnl_clubs, ga_clubs)
-            club = { "club": club_name, "league": league }
-            result.append(club)
-
-        return result
+        clubs = args["clubs[]"] or []
+
+        try:
+            matches = club_registry.resolve_clubs(clubs)
+        except HTTPError as http_err:
+            return ns.abort(
+                HTTPStatus.BAD_REQUEST.value, f"HTTP error occurred: {http_err}"
+            )
+        except Exception as err:
+            return ns.abort(
+                HTTPStatus.BAD_REQUEST.value, f"Other error occurred: {err}"
+            )
+
+        results = []
+        for club_name, match in zip(clubs, matches):
+            if match is None:
+                results.append({"club": club_name, "league": "Other", "confidence": 0.0})
+            else:
+                results.append({
+                    "club": club_name,
+                    "league": match["league"] or "Other",
+                    "match": match["name"],
+                    "confidence": match["confidence"],
+                })
+
+        return results
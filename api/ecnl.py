@@ -1,10 +1,11 @@
 from http import HTTPStatus
 
 import requests
-from flask_restx import Namespace, Resource, fields
+from flask_restx import Resource, fields
 from requests.exceptions import HTTPError
+from common.marshalling import Namespace
+from common import listing
 from common import utils
-from common.extensions import cache
 
 ns = Namespace("ecnl", description="ECNL related operations")
 
@@ -29,10 +30,9 @@ class ClubList(Resource):
     @ns.doc("list_clubs")
     @ns.response(HTTPStatus.OK.value, "Get the item list", [club_model])
     @ns.response(HTTPStatus.BAD_REQUEST.value, "Item not found")
-    @ns.marshal_list_with(club_model)
-    @cache.cached(timeout=604800)
+    @listing.marshal_list_with(ns, club_model, {"state": "state", "city": "city"})
     def get(self):
-        """List all clubs"""
+        """List all clubs, a page at a time with limit and cursor"""
         global search
 
         try:
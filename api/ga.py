@@ -1,9 +1,11 @@
 from http import HTTPStatus
-from bs4 import BeautifulSoup
+from bs4 import SoupStrainer
 
-import requests
-from flask_restx import Namespace, Resource, fields
+from flask_restx import Resource, fields
 from requests.exceptions import HTTPError
+from common.marshalling import Namespace
+from common import fetch
+from common import parsing
 from common import utils
 
 ns = Namespace("ga", description="Girls Academy related operations")
@@ -60,9 +62,9 @@ class ConferenceList(Resource):
         url = "https://girlsacademyleague.com/members/"
 
         try:
-            response = requests.get(url)
+            response = fetch.get(url)
 
-            soup = BeautifulSoup(response.content, "html.parser")
+            soup = parsing.parse(response.content, SoupStrainer("div", class_=parsing.has_class("et_pb_tab_content")))
 
             tabs = soup.find_all("div", class_=["et_pb_tab_content"])
 
@@ -1,8 +1,10 @@
 from http import HTTPStatus
 
-from flask_restx import Namespace, Resource, fields
+from flask_restx import Resource, fields
 from requests.exceptions import HTTPError
+from common.marshalling import Namespace
 
+from common import listing
 from lib import ncaa as library
 
 ns = Namespace("ncaa", description="NCAA related operations")
@@ -138,9 +140,9 @@ class NCAASchoolList(Resource):
         HTTPStatus.OK.value, "Get the list of NCAA schools", [ncaa_school_model]
     )
     @ns.response(HTTPStatus.BAD_REQUEST.value, "Item not found")
-    @ns.marshal_list_with(ncaa_school_model)
+    @listing.marshal_list_with(ns, ncaa_school_model, {"conference": "conference", "state": "state"})
     def get(self, division: str):
-        """List all NCAA schools of the specified division"""
+        """List all NCAA schools of the specified division, a page at a time with limit and cursor"""
         try:
             return library.get_schools(division)
         except HTTPError as http_err:
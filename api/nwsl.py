@@ -1,8 +1,10 @@
 from http import HTTPStatus
 
 import requests
-from flask_restx import Namespace, Resource, fields
+from flask_restx import Resource, fields
 from requests.exceptions import HTTPError
+from common.marshalling import Namespace
+from common import listing
 from common import utils
 from common.extensions import cache
 from pprint import pprint
@@ -129,6 +131,12 @@ standing_model = ns.model(
 )
 
 
+def _get_team_names(player):
+    team = player.get("team") or {}
+
+    return [team.get(name) for name in ("abbreviation", "shortname", "short_display", "slug")]
+
+
 @ns.route("/standings")
 class Standings(Resource):
     @ns.doc("standings")
@@ -154,9 +162,9 @@ class PlayerList(Resource):
     @ns.doc("player_list")
     @ns.response(HTTPStatus.OK.value, "Get the NWSL player list", [player_model])
     @ns.response(HTTPStatus.BAD_REQUEST.value, "Item not found")
-    @ns.marshal_list_with(player_model)
+    @listing.marshal_list_with(ns, player_model, {"team": _get_team_names, "position": "position"})
     def get(self):
-        """List all players"""
+        """List all players, a page at a time with limit and cursor"""
         try:
             return library.get_players()
         except HTTPError as http_err:
@@ -3,8 +3,9 @@ from http import HTTPStatus
 import flask
 
 from pprint import pprint
-from flask_restx import Namespace, Resource, fields, reqparse
+from flask_restx import Resource, fields, reqparse
 from requests.exceptions import HTTPError
+from common.marshalling import Namespace
 
 from common import utils
 from common.extensions import cache
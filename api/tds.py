@@ -1,18 +1,24 @@
-from dbm.ndbm import library
 from http import HTTPStatus
 
 import flask
 
 from pprint import pprint
-from flask_restx import Namespace, Resource, fields, reqparse
+from flask_restx import Resource, fields, reqparse
 from requests.exceptions import HTTPError
+from common.marshalling import Namespace
 
 from common import utils
-from common.extensions import cache
 
 from common import config
+from common import listing
+from common import memo
+from common import streaming
 
+from lib import analytics
+from lib import clubs
 from lib import topdrawer
+from lib import transfers
+from lib import warmup
 
 ns = Namespace("tds", description="TopDrawerSoccer related operations")
 
@@ -54,7 +60,8 @@ player_model = ns.model(
         "rating": fields.String(required=True, description="The players rating"),
         "league": fields.String(required=False, description="The players league"),
         "commitment": fields.String(required=False, description="The players commitment"),
-        "commitmentUrl": fields.String(required=False, description="The players commitment URL")
+        "commitmentUrl": fields.String(required=False, description="The players commitment URL"),
+        "error": fields.String(required=False, description="Why the players details could not be loaded")
     },
 )
 
@@ -174,10 +181,30 @@ transfer_model = ns.model(
         "formerSchoolName": fields.String(required=True, description="The players former school name"),
         "formerSchoolUrl": fields.String(required=False, description="The URL of the players former school"),
         "newSchoolName": fields.String(required=True, description="The players new school name"),
-        "newSchoolUrl": fields.String(required=False, description="the URL of the players new school")
+        "newSchoolUrl": fields.String(required=False, description="the URL of the players new school"),
+        "year": fields.Integer(required=False, description="The year of the transfer tracker"),
+        "gender": fields.String(required=False, description="The gender of the transfer tracker"),
+        "division": fields.String(required=False, description="The division of the transfer tracker"),
+        "sequence": fields.Integer(required=False, description="The change number the transfer was last recorded with"),
+        "removed": fields.Boolean(required=False, description="Whether the transfer is no longer listed")
     }
 )
 
+transfers_parser = ns.parser()
+transfers_parser.add_argument(
+    "since",
+    type=int,
+    location="args",
+    help="Only the changes after this sequence number (see the X-Change-Sequence header)",
+)
+transfers_parser.add_argument("year", type=int, location="args")
+transfers_parser.add_argument(
+    "gender", type=str, location="args", choices=("female", "male"), help='Bad choice: {error_msg}'
+)
+transfers_parser.add_argument(
+    "division", type=str, location="args", choices=tuple(config.DIVISION_MAPPING), help='Bad choice: {error_msg}'
+)
+
 
 players_parser = reqparse.RequestParser(bundle_errors=True)
 players_parser.add_argument("name", type=str, location="json")
@@ -296,15 +323,20 @@ players_parser.add_argument(
 
 
 @ns.route("/college/transfers")
+@ns.expect(transfers_parser)
 class TransferTracker(Resource):
     @ns.doc("transfer_tracker")
     @ns.response(HTTPStatus.OK.value, "Search for transfers", [transfer_model])
     @ns.response(HTTPStatus.BAD_REQUEST.value, "Item not found")
     @ns.marshal_list_with(transfer_model)
     def get(self):
-        """Get the transfers"""
+        """Get the transfers of every tracker or, with since, the changes after a sequence number"""
+        args = transfers_parser.parse_args()
+
         try:
-            return topdrawer.get_transfers()
+            records, sequence = transfers.get_transfers(args["since"], args["year"], args["gender"], args["division"])
+
+            return records, HTTPStatus.OK.value, {"X-Change-Sequence": str(sequence)}
         except HTTPError as http_err:
             print(f"HTTP error occurred: {http_err}")
             return ns.abort(
@@ -384,19 +416,11 @@ class PlayerSearch(Resource):
     @ns.doc("player_search")
     @ns.response(HTTPStatus.OK.value, "Search for players", [player_model])
     @ns.response(HTTPStatus.BAD_REQUEST.value, "Item not found")
-    @ns.marshal_list_with(player_model)
+    @streaming.marshal_list_with(ns, player_model)
     def post(self):
-        """Search for players"""
+        """Search for players (NDJSON with ?stream=true or Accept: application/x-ndjson)"""
         try:
-            args = players_parser.parse_args()
-
-            gender = _get_gender_id(args)
-            position = _get_position_id(args)
-            grad_year = _get_grad_year(args)
-            region = _get_region_id(args)
-            state = _get_state_id(args)
-
-            return topdrawer.search_for_players(gender, position, grad_year, region, state)
+            return topdrawer.search_for_players(*_get_search_criteria())
         except HTTPError as http_err:
             print(f"HTTP error occurred: {http_err}")
             return ns.abort(
@@ -409,6 +433,25 @@ class PlayerSearch(Resource):
                 HTTPStatus.BAD_REQUEST.value, f"Other error occurred: {err}"
             )
 
+    def stream(self):
+        return topdrawer.iter_search_for_players(*_get_search_criteria())
+
+
+def _get_search_criteria():
+    args = players_parser.parse_args()
+
+    gender = _get_gender_id(args)
+    position = _get_position_id(args)
+    grad_year = _get_grad_year(args)
+    region = _get_region_id(args)
+    state = _get_state_id(args)
+
+    return gender, position, grad_year, region, state
+
+
+def _get_club_league(record):
+    return clubs.get_league(record["club"])
+
 
 conferences_parser = ns.parser()
 conferences_parser.add_argument(
@@ -457,7 +500,6 @@ class Conference(Resource):
     @ns.response(HTTPStatus.OK.value, "Get the conference", conference_model)
     @ns.response(HTTPStatus.BAD_REQUEST.value, "Conference not found")
     @ns.marshal_with(conference_model)
-    @cache.memoize(timeout=604800)
     def get(self, gender: str, division: str, name: str):
         """Get a conference by name"""
         try:
@@ -524,11 +566,12 @@ class ConferenceCommits(Resource):
     @ns.doc("get_conference_commits")
     @ns.response(HTTPStatus.OK.value, "Get the conference commits", school_model)
     @ns.response(HTTPStatus.BAD_REQUEST.value, "Commitments not found")
-    @ns.marshal_list_with(school_model)
+    @streaming.marshal_list_with(ns, school_model)
     def get(self, gender: str, division: str, name: str, year: int):
-        """Get a conferences commitments"""
+        """Get a conferences commitments (NDJSON with ?stream=true or Accept: application/x-ndjson)"""
         try:
             schools = topdrawer.get_conference_commits(gender, division, name, year)
+            _record_conference_commits(schools, gender, division, name, year)
 
             return schools
         except HTTPError as http_err:
@@ -540,6 +583,24 @@ class ConferenceCommits(Resource):
                 HTTPStatus.BAD_REQUEST.value, f"Other error occurred: {err}"
             )
 
+    def stream(self, gender: str, division: str, name: str, year: int):
+        schools = []
+
+        for school in topdrawer.iter_conference_commits(gender, division, name, year):
+            schools.append(school)
+            yield school
+
+        # Recorded once every school was served, like get() does.
+        _record_conference_commits(schools, gender, division, name, year)
+
+
+def _record_conference_commits(schools, gender: str, division: str, name: str, year: int):
+    """Keep the commitments served for a conference in the analytics table."""
+    conference = topdrawer.get_conference(gender, division, name)
+
+    if conference is not None:
+        analytics.record_conference(schools, gender, division, conference, year)
+
 
 @ns.route("/college/commits/club/<string:gender>/<int:year>")
 @ns.expect(commits_club_parser)
@@ -547,9 +608,9 @@ class ConferenceCommitsByClub(Resource):
     @ns.doc("get_conference_commits_club")
     @ns.response(HTTPStatus.OK.value, "Get commitments data for clubs", conference_model)
     @ns.response(HTTPStatus.BAD_REQUEST.value, "Commitments not found")
-    @ns.marshal_list_with(commitments_by_club_model)
+    @listing.marshal_list_with(ns, commitments_by_club_model, {"league": _get_club_league})
     def get(self, gender: str, year: int):
-        """Get a commitment data for clubs"""
+        """Get a commitment data for clubs, a page at a time with limit and cursor"""
         try:
             return topdrawer.get_commitments_by_club(gender, year)
         except HTTPError as http_err:
@@ -627,9 +688,9 @@ class ConferenceDetails(Resource):
     @ns.doc("get_conference_details")
     @ns.response(HTTPStatus.OK.value, "Get conference details", school_model)
     @ns.response(HTTPStatus.BAD_REQUEST.value, "Details not found")
-    @ns.marshal_list_with(school_model)
+    @streaming.marshal_list_with(ns, school_model)
     def get(self, gender: str, name: str, cfid: int):
-        """Get a conferences details"""
+        """Get a conferences details (NDJSON with ?stream=true or Accept: application/x-ndjson)"""
         try:
             return topdrawer.get_conference_details(gender, name, cfid)
         except HTTPError as http_err:
@@ -641,6 +702,9 @@ class ConferenceDetails(Resource):
                 HTTPStatus.BAD_REQUEST.value, f"Other error occurred: {err}"
             )
 
+    def stream(self, gender: str, name: str, cfid: int):
+        return topdrawer.iter_conference_details(gender, name, cfid)
+
 commitment_chart_data_model = ns.model(
     "Commitment Chart Data",
     {
@@ -694,3 +758,130 @@ class PlayerDetails(Resource):
             return ns.abort(
                 HTTPStatus.BAD_REQUEST.value, f"Other error occurred: {err}"
             )
+
+
+warmup_job_model = ns.model(
+    "Warm-up Job",
+    {
+        "name": fields.String(required=True, description="The gender/division/conference/year warmed"),
+        "seconds": fields.Float(required=True, description="How long the job took"),
+        "error": fields.String(required=False, description="Why the job failed"),
+    }
+)
+
+warmup_model = ns.model(
+    "Warm-up Status",
+    {
+        "state": fields.String(required=True, description="idle, enumerating, running or failed"),
+        "rounds": fields.Integer(required=True, description="The number of completed rounds"),
+        "started": fields.Float(required=False, description="When the current or last round started"),
+        "finished": fields.Float(required=False, description="When the last round finished"),
+        "seconds": fields.Float(required=False, description="How long the last round took"),
+        "total": fields.Integer(required=False, description="The number of jobs in the round"),
+        "done": fields.Integer(required=False, description="The number of jobs completed"),
+        "failed": fields.Integer(required=False, description="The number of jobs that failed"),
+        "jobs": fields.List(fields.Nested(warmup_job_model)),
+    }
+)
+
+
+@ns.route("/warmup")
+class Warmup(Resource):
+    @ns.doc("get_warmup_status")
+    @ns.response(HTTPStatus.OK.value, "Get the cache warm-up progress", warmup_model)
+    @ns.marshal_with(warmup_model)
+    def get(self):
+        """Get the progress of the conference commitments warm-up"""
+        return warmup.SCHEDULER.get_status()
+
+
+cache_stats_model = ns.model(
+    "Cache Stats",
+    {
+        "function": fields.String(required=True, description="The memoized function"),
+        "hits": fields.Integer(required=True, description="The lookups answered by a fresh entry"),
+        "stale": fields.Integer(required=True, description="The lookups answered by an expired entry being refreshed"),
+        "misses": fields.Integer(required=True, description="The lookups that waited for the function"),
+        "lookups": fields.Integer(required=True, description="The number of lookups"),
+        "ratio": fields.Float(required=True, description="The share of lookups answered from the cache"),
+    }
+)
+
+
+@ns.route("/cache")
+class CacheStats(Resource):
+    @ns.doc("get_cache_stats")
+    @ns.response(HTTPStatus.OK.value, "Get the cache hit ratio of every memoized scraper", cache_stats_model)
+    @ns.marshal_list_with(cache_stats_model)
+    def get(self):
+        """Get the cache hit ratio of every memoized scraper in this worker"""
+        return [dict(counters, function=name) for name, counters in sorted(memo.get_stats().items())]
+
+
+analytics_parser = ns.parser()
+analytics_parser.add_argument(
+    "group_by",
+    type=str,
+    location="args",
+    default="league",
+    help="A comma separated list of: " + ", ".join(analytics.DIMENSIONS),
+)
+for dimension in analytics.DIMENSIONS:
+    analytics_parser.add_argument(dimension, type=int if dimension == "year" else str, location="args")
+
+commitment_group_model = ns.model(
+    "Commitment Group",
+    {
+        "gender": fields.String(required=False, description="The gender"),
+        "division": fields.String(required=False, description="The division"),
+        "conference": fields.String(required=False, description="The conference name"),
+        "year": fields.Integer(required=False, description="The graduation year"),
+        "school": fields.String(required=False, description="The school name"),
+        "club": fields.String(required=False, description="The club name"),
+        "league": fields.String(required=False, description="The league of the club"),
+        "state": fields.String(required=False, description="The players state"),
+        "position": fields.String(required=False, description="The players position"),
+        "count": fields.Integer(required=True, description="The number of commitments"),
+        "share": fields.Float(required=True, description="The percentage of the matching commitments"),
+    }
+)
+
+analytics_model = ns.model(
+    "Commitment Analytics",
+    {
+        "rows": fields.Integer(required=True, description="The number of commitments kept"),
+        "partitions": fields.Integer(required=True, description="The number of conference pages they came from"),
+        "values": fields.Raw(required=True, description="The number of distinct values of each dimension"),
+    }
+)
+
+
+@ns.route("/analytics/commitments")
+@ns.expect(analytics_parser)
+class CommitmentAnalytics(Resource):
+    @ns.doc("get_commitment_analytics")
+    @ns.response(HTTPStatus.OK.value, "Get the commitment counts", [commitment_group_model])
+    @ns.response(HTTPStatus.BAD_REQUEST.value, "Invalid query")
+    @ns.marshal_list_with(commitment_group_model, skip_none=True)
+    def get(self):
+        """Count the crawled commitments matching the filters, grouped by the group_by dimensions"""
+        args = analytics_parser.parse_args()
+        group_by = [dimension.strip() for dimension in args["group_by"].split(",") if dimension.strip()]
+        filters = {dimension: args[dimension] for dimension in analytics.DIMENSIONS}
+
+        try:
+            total, groups = analytics.COMMITMENTS.count(group_by, **filters)
+        except ValueError as err:
+            return ns.abort(HTTPStatus.BAD_REQUEST.value, f"Invalid query: {err}")
+
+        return [dict(values, count=count, share=round(100 * count / total, 1)) for values, count in groups]
+
+
+@ns.route("/analytics")
+class CommitmentAnalyticsStats(Resource):
+    @ns.doc("get_commitment_analytics_stats")
+    @ns.response(HTTPStatus.OK.value, "Get the size of the analytics table", analytics_model)
+    @ns.marshal_with(analytics_model)
+    def get(self):
+        """Get the number of crawled commitments the analytics endpoints answer from"""
+        return analytics.COMMITMENTS.get_stats()
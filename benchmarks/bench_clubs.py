@@ -0,0 +1,81 @@
+import argparse
+import statistics
+import sys
+import time
+
+from common import config
+from common import tools
+from lib import clubs
+
+
+def get_variants(club_names: list):
+    """(variant, club name) pairs spelled the ways TopDrawerSoccer spells club names."""
+    variants = []
+
+    for name in club_names:
+        words = name.split()
+        variants.append((f"{name} (TX)", name))
+        variants.append(("  ".join(words), name))
+        variants.append((" ".join(word for word in words if word not in ("SC", "FC", "Soccer", "Club")) + " SC", name))
+
+        # A dropped letter in the longest word.
+        longest = max(range(len(words)), key=lambda position: len(words[position]))
+        if len(words[longest]) > 5:
+            typo = words[longest][:2] + words[longest][3:]
+            variants.append((" ".join(words[:longest] + [typo] + words[longest + 1:]), name))
+
+    return variants
+
+
+def get_index():
+    """The league index over the GA snapshot and the translations, without fetching the ECNL clubs."""
+    index = clubs.LeagueIndex([("GA", clubs.GA_CLUBS)])
+    index.get_index()
+
+    return index
+
+
+def measure(index, variants: list, runs: int = 5):
+    exact = {tools.normalize_club_name(club["name"]) for club in clubs.GA_CLUBS.get()}
+    exact.update(tools.normalize_club_name(source) for source in config.get_club_translations())
+
+    resolved = 0
+    for variant, name in variants:
+        match = index.resolve(variant)
+        if match is not None and match["name"] == name:
+            resolved += 1
+
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        for variant, _ in variants:
+            index._resolved.clear()
+            index.resolve(variant)
+        samples.append((time.perf_counter() - started) / len(variants))
+
+    return {
+        "variants": len(variants),
+        "before_resolved": sum(tools.normalize_club_name(variant) in exact for variant, _ in variants),
+        "after_resolved": resolved,
+        "lookup": statistics.median(samples),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resolve misspelled club names with the n-gram index.")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    index = get_index()
+    result = measure(index, get_variants([club["name"] for club in clubs.GA_CLUBS.get()]), args.runs)
+
+    print(f"{result['variants']} spelling variants of the GA clubs")
+    print(f"resolved by exact lookup   {result['before_resolved']:>6}")
+    print(f"resolved by n-gram index   {result['after_resolved']:>6}")
+    print(f"uncached lookup            {result['lookup'] * 1e6:>6.1f} us")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+import argparse
+import contextlib
+import multiprocessing
+import sys
+import tempfile
+import threading
+import time
+from contextlib import redirect_stdout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+from unittest import mock
+
+from flask import Flask
+
+from benchmarks import pages
+from common import aiofetch
+from common import fetch
+from common.extensions import cache
+from lib import topdrawer
+
+# The graduation years of the conference fixture; crawling all of them loads
+# every player profile linked from the page.
+YEARS = (2023, 2024, 2025, 2026)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Serves the conference fixture and the player profile fixture for every other path, after a delay."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        time.sleep(self.server.latency)
+
+        if self.path.startswith("/conference"):
+            body = self.server.conference
+        else:
+            body = self.server.profile
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 512
+
+
+def _serve(latency: float, ports):
+    server = StubServer(("127.0.0.1", 0), _Handler)
+    server.latency = latency
+    server.conference = pages.PageType("conference", "tds_conference_commitments.html", None).load()
+    server.profile = pages.PageType("profile", "tds_player_profile.html", None).load()
+
+    ports.put(server.server_port)
+    server.serve_forever()
+
+
+@contextlib.contextmanager
+def stub_server(latency: float):
+    """The url of a stub upstream served from another process, so it takes no threads or GIL from the crawl."""
+    ports = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_serve, args=(latency, ports), daemon=True)
+    process.start()
+
+    try:
+        yield f"http://127.0.0.1:{ports.get(timeout=30)}"
+    finally:
+        process.terminate()
+        process.join()
+
+
+def crawl():
+    """Every class of the conference with the profile of every player; returns the players loaded."""
+    players = 0
+
+    for year in YEARS:
+        schools = topdrawer.get_conference_details.__wrapped__("female", "Stub", 1, year)
+        players += sum(1 for school in schools for player in school["players"] if "error" not in player)
+
+    return players
+
+
+class ThreadSampler:
+    """The most threads alive at once while the sampler runs."""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.peak = threading.active_count()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self.peak = max(self.peak, threading.active_count())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stopped.set()
+        self._thread.join()
+
+
+def measure(url: str, engine: str, workers: int, concurrency: int):
+    """The players loaded, the seconds the crawl takes on the engine and the most threads it used, on a cold page store."""
+    with tempfile.TemporaryDirectory() as directory:
+        patchers = [
+            mock.patch("common.config.FETCH_ENGINE", engine),
+            mock.patch("common.config.PLAYER_DETAIL_WORKERS", workers),
+            mock.patch("common.config.PAGE_STORE_DIR", directory),
+            mock.patch("common.config.STORE_URL", ""),
+            # Only the engines are compared: the limiter lets every request through.
+            mock.patch("common.config.FETCH_RATE", 100000),
+            mock.patch("common.config.FETCH_MAX_RATE", 100000),
+            mock.patch("common.config.FETCH_BURST", 100000),
+            mock.patch("common.config.FETCH_MAX_CONCURRENCY", concurrency),
+            mock.patch("common.config.FETCH_ASYNC_CONNECTIONS", concurrency),
+            mock.patch.object(topdrawer, "PREFIX", url),
+            mock.patch.object(topdrawer, "_get_conference_details_url", lambda *args: url + "/conference"),
+        ]
+        for patcher in patchers:
+            patcher.start()
+
+        try:
+            baseline = threading.active_count()
+
+            started = time.perf_counter()
+            with redirect_stdout(StringIO()), ThreadSampler() as sampler:
+                players = crawl()
+            elapsed = time.perf_counter() - started
+        finally:
+            for patcher in reversed(patchers):
+                patcher.stop()
+
+            aiofetch.close()
+            fetch.close()
+
+    return players, elapsed, sampler.peak - baseline
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Crawl a conference from a local stub server, threaded and async.")
+    parser.add_argument("--latency", type=float, default=0.5, help="seconds the stub server takes per page")
+    parser.add_argument("--workers", type=int, nargs="+", default=[8, 64], help="threads of the threaded runs")
+    parser.add_argument("--concurrency", type=int, default=200, help="requests the async engine keeps in flight")
+    args = parser.parse_args()
+
+    # Nothing is cached, so every run loads every page.
+    app = Flask(__name__)
+    cache.init_app(app, {"CACHE_TYPE": "NullCache", "CACHE_NO_NULL_WARNING": True})
+
+    runs = [("threads", workers) for workers in args.workers] + [("async", args.workers[0])]
+
+    with pages.pinned_clubs(), stub_server(args.latency) as url, app.app_context():
+        print(f"conference crawl of {len(YEARS)} classes, {args.latency * 1000:.0f} ms per page")
+
+        for engine, workers in runs:
+            players, elapsed, threads = measure(url, engine, workers, args.concurrency)
+
+            label = f"{engine}, {workers} workers" if engine == "threads" else f"{engine}, {args.concurrency} in flight"
+            print(
+                f"{label:<24} {players:>4} profiles {elapsed:>7.2f} s {players / elapsed:>8.1f} pages/s"
+                f" {threads:>4} threads"
+            )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in a fresh interpreter so nothing is already imported or cached.
+PROBE = """
+import json
+import socket
+import time
+
+attempts = []
+
+def deny(*args, **kwargs):
+    attempts.append(repr(args[:2]))
+    raise OSError("network access is not allowed while importing")
+
+socket.socket.connect = deny
+socket.socket.connect_ex = deny
+socket.create_connection = deny
+socket.getaddrinfo = deny
+
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+
+print(json.dumps({{"seconds": elapsed, "attempts": attempts}}))
+"""
+
+
+def measure_import(module: str = "api"):
+    """Import the module in a fresh interpreter with the network blocked.
+
+    Returns a dict with the import time in seconds and every attempted
+    network call.  Any exception raised by the import is re-raised as a
+    RuntimeError with the child's stderr.
+    """
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE.format(module=module)],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr}")
+
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the time it takes to import the API.")
+    parser.add_argument("--module", default="api")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    samples = []
+    for _ in range(args.runs):
+        measurement = measure_import(args.module)
+
+        if len(measurement["attempts"]) > 0:
+            print(f"import {args.module} attempted network I/O: {measurement['attempts']}")
+            return 1
+
+        samples.append(measurement["seconds"])
+
+    print(f"import {args.module}: no network I/O")
+    print(f"  runs:   {len(samples)}")
+    print(f"  min:    {min(samples) * 1000:.1f} ms")
+    print(f"  median: {statistics.median(samples) * 1000:.1f} ms")
+    print(f"  max:    {max(samples) * 1000:.1f} ms")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
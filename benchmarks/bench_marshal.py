@@ -0,0 +1,84 @@
+import argparse
+import contextlib
+import importlib
+import io
+import itertools
+import json
+import statistics
+import sys
+import time
+
+import flask_restx
+
+from benchmarks import pages
+from common import marshalling
+
+
+def _time(func, runs: int):
+    samples = []
+
+    for _ in range(runs):
+        started = time.process_time()
+        func()
+        samples.append(time.process_time() - started)
+
+    return statistics.median(samples)
+
+
+def get_cases(records: int):
+    """(name, records, model) for the large list responses, repeated to the given length."""
+    nwsl = importlib.import_module("api.nwsl")
+    tds = importlib.import_module("api.tds")
+    ncaa = importlib.import_module("api.ncaa")
+
+    with pages.offline(), contextlib.redirect_stdout(io.StringIO()):
+        players = pages.JSON_PAGES[1].parse_targeted(pages.JSON_PAGES[1].load())
+        schools = pages.HTML_PAGES[1].parse_targeted(pages.HTML_PAGES[1].load())
+        directory = pages.JSON_PAGES[0].parse_targeted(pages.JSON_PAGES[0].load())
+
+    def repeat(data):
+        return list(itertools.islice(itertools.cycle(data), records))
+
+    return [
+        ("nwsl_players", repeat(players), nwsl.player_model),
+        ("tds_conference_commits", repeat(schools), tds.school_model),
+        ("ncaa_schools", repeat(directory), ncaa.ncaa_school_model),
+    ]
+
+
+def measure(data, model, runs: int = 20):
+    """CPU seconds per response: marshalling alone and marshalling plus the JSON encoding."""
+    if flask_restx.marshal(data, model) != marshalling.marshal(data, model):
+        raise AssertionError("the compiled serializer disagrees with marshal()")
+
+    return {
+        "before_marshal": _time(lambda: flask_restx.marshal(data, model), runs),
+        "after_marshal": _time(lambda: marshalling.marshal(data, model), runs),
+        "before_response": _time(lambda: json.dumps(flask_restx.marshal(data, model)), runs),
+        "after_response": _time(lambda: json.dumps(marshalling.marshal(data, model)), runs),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare flask-restx marshalling with the compiled serializers.")
+    parser.add_argument("--records", type=int, default=2000)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'response':<24} {'records':>8} {'marshal ms':>11} {'compiled ms':>12} {'speedup':>8} {'+json ms':>9} {'+json ms':>12} {'saved':>6}")
+
+    for name, data, model in get_cases(args.records):
+        result = measure(data, model, args.runs)
+        print(
+            f"{name:<24} {len(data):>8}"
+            f" {result['before_marshal'] * 1000:>11.2f} {result['after_marshal'] * 1000:>12.2f}"
+            f" {result['before_marshal'] / result['after_marshal']:>7.1f}x"
+            f" {result['before_response'] * 1000:>9.2f} {result['after_response'] * 1000:>12.2f}"
+            f" {1 - result['after_response'] / result['before_response']:>6.0%}"
+        )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,199 @@
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from io import StringIO
+
+from benchmarks import pages
+from common import parsing
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# Allowed slowdown (or memory growth) against the baseline before a page fails.
+DEFAULT_THRESHOLD = 0.5
+
+
+def _calibrate(runs: int = 31):
+    """Median time of a fixed pure-Python workload.
+
+    Latencies are stored relative to it, so that a baseline recorded on one
+    machine can be compared on another.
+    """
+    records = [{"id": i, "name": f"Player {i}", "club": f"Club {i % 97}"} for i in range(2000)]
+
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        sorted(json.loads(json.dumps(records)), key=lambda record: (record["club"], record["name"]))
+        samples.append(time.perf_counter() - started)
+
+    return statistics.median(samples)
+
+
+def _percentile(samples: list, percent: float):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(percent / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _allocations(func, content):
+    tracemalloc.start()
+    try:
+        result = func(content)
+        retained, peak = tracemalloc.get_traced_memory()
+        del result
+    finally:
+        tracemalloc.stop()
+
+    return peak, retained
+
+
+def measure(page, min_runs: int = 20, min_time: float = 0.5):
+    """Throughput, per-call latency percentiles and allocations of a page parser."""
+    content = page.load()
+
+    # The parsers print warnings for unknown clubs; keep the report readable.
+    with redirect_stdout(StringIO()):
+        page.parse_targeted(content)
+
+        samples = []
+        started = time.perf_counter()
+        while len(samples) < min_runs or time.perf_counter() - started < min_time:
+            call_started = time.perf_counter()
+            page.parse_targeted(content)
+            samples.append(time.perf_counter() - call_started)
+
+        peak, retained = _allocations(page.parse_targeted, content)
+
+    return {
+        "runs": len(samples),
+        "ops": len(samples) / sum(samples),
+        "p50": _percentile(samples, 50),
+        "p90": _percentile(samples, 90),
+        "p99": _percentile(samples, 99),
+        "peak": peak,
+        "retained": retained,
+    }
+
+
+def load_baseline(path: str):
+    if not os.path.exists(path):
+        return None
+
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(path: str, results: dict, calibration: float):
+    baseline = {
+        "parser": parsing.get_parser_name(),
+        "calibration": calibration,
+        "pages": {
+            name: {"p50": result["p50"] / calibration, "peak": result["peak"]}
+            for name, result in results.items()
+        },
+    }
+
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def compare(baseline: dict, results: dict, calibration: float, threshold: float = DEFAULT_THRESHOLD):
+    """Returns the (page, metric, change) regressions beyond the threshold."""
+    regressions = []
+
+    for name, result in results.items():
+        expected = baseline["pages"].get(name)
+
+        if expected is None:
+            continue
+
+        changes = {
+            "p50": (result["p50"] / calibration) / expected["p50"] - 1,
+            "peak": result["peak"] / expected["peak"] - 1 if expected["peak"] else 0,
+        }
+
+        for metric, change in changes.items():
+            if change > threshold:
+                regressions.append((name, metric, change))
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every upstream page parser against recorded fixtures.")
+    parser.add_argument("--page", action="append", help="only run the named page (repeatable)")
+    parser.add_argument("--min-runs", type=int, default=20)
+    parser.add_argument("--min-time", type=float, default=0.5, help="minimum seconds spent timing each page")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="allowed regression, 0.5 = 50%%")
+    parser.add_argument("--save-baseline", action="store_true", help="record these results as the new baseline")
+    args = parser.parse_args()
+
+    selected = [page for page in pages.PAGES if not args.page or page.name in args.page]
+
+    calibration = _calibrate()
+
+    print(f"parser: {parsing.get_parser_name()}, calibration: {calibration * 1000:.2f} ms")
+    print(
+        f"{'page':<28} {'runs':>6} {'ops/s':>9} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8}"
+        f" {'peak KiB':>9} {'kept KiB':>9}"
+    )
+
+    results = {}
+
+    with pages.offline():
+        for page in selected:
+            result = measure(page, args.min_runs, args.min_time)
+            results[page.name] = result
+
+            print(
+                f"{page.name:<28} {result['runs']:>6} {result['ops']:>9.1f}"
+                f" {result['p50'] * 1000:>8.2f} {result['p90'] * 1000:>8.2f} {result['p99'] * 1000:>8.2f}"
+                f" {result['peak'] // 1024:>9} {result['retained'] // 1024:>9}"
+            )
+
+    if args.save_baseline:
+        save_baseline(args.baseline, results, calibration)
+        print(f"baseline saved to {args.baseline}")
+        return 0
+
+    baseline = load_baseline(args.baseline)
+
+    if baseline is None:
+        print(f"no baseline at {args.baseline}, run with --save-baseline to record one")
+        return 0
+
+    if baseline["parser"] != parsing.get_parser_name():
+        print(f"baseline was recorded with {baseline['parser']}, skipping the comparison")
+        return 0
+
+    regressions = compare(baseline, results, calibration, args.threshold)
+
+    if regressions:
+        # Timings are noisy, so confirm a regression with a second, longer run.
+        retry = [page for page in selected if page.name in {name for name, _, _ in regressions}]
+        calibration = _calibrate()
+
+        with pages.offline():
+            results = {page.name: measure(page, args.min_runs * 2, args.min_time * 2) for page in retry}
+
+        regressions = compare(baseline, results, calibration, args.threshold)
+
+    for name, metric, change in regressions:
+        print(f"REGRESSION {name} {metric}: {change:+.0%}")
+
+    if regressions:
+        return 1
+
+    print(f"no regressions beyond {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
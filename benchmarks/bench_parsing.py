@@ -0,0 +1,73 @@
+import argparse
+import statistics
+import sys
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from io import StringIO
+
+from benchmarks import pages
+from common import parsing
+
+
+def _time(func, content, runs: int):
+    samples = []
+
+    for _ in range(runs):
+        started = time.perf_counter()
+        func(content)
+        samples.append(time.perf_counter() - started)
+
+    return statistics.median(samples)
+
+
+def _peak_memory(func, content):
+    tracemalloc.start()
+    try:
+        func(content)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return peak
+
+
+def measure(page, runs: int = 20):
+    """Time and peak memory of the full html.parser tree vs the targeted parse."""
+    content = page.load()
+
+    # The parsers print warnings for unknown clubs; keep the report readable.
+    with redirect_stdout(StringIO()):
+        return {
+            "name": page.name,
+            "bytes": len(content),
+            "before_seconds": _time(page.parse_full, content, runs),
+            "after_seconds": _time(page.parse_targeted, content, runs),
+            "before_peak": _peak_memory(page.parse_full, content),
+            "after_peak": _peak_memory(page.parse_targeted, content),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare full and targeted parsing of upstream pages.")
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"parser: {parsing.get_parser_name()}")
+    print(f"{'page':<28} {'size':>8} {'before ms':>10} {'after ms':>10} {'speedup':>8} {'before KiB':>11} {'after KiB':>10}")
+
+    with pages.offline():
+        for page in pages.HTML_PAGES:
+            result = measure(page, args.runs)
+            print(
+                f"{result['name']:<28} {result['bytes'] // 1024:>6}Ki"
+                f" {result['before_seconds'] * 1000:>10.2f} {result['after_seconds'] * 1000:>10.2f}"
+                f" {result['before_seconds'] / result['after_seconds']:>7.1f}x"
+                f" {result['before_peak'] // 1024:>11} {result['after_peak'] // 1024:>10}"
+            )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+import argparse
+import contextlib
+import io
+import pickle
+import sys
+
+from benchmarks import pages
+from common.records import Record
+
+
+def _as_dicts(value):
+    """The value as the plain dicts the parsers produced before the record types."""
+    if isinstance(value, Record):
+        return value.to_dict()
+
+    if isinstance(value, list):
+        return [_as_dicts(item) for item in value]
+
+    return value
+
+
+def _deep_size(value, seen: set):
+    """The bytes of value and everything it references, counting shared objects once."""
+    if id(value) in seen:
+        return 0
+
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+
+    if isinstance(value, dict):
+        size += sum(_deep_size(key, seen) + _deep_size(item, seen) for key, item in value.items())
+    elif isinstance(value, list):
+        size += sum(_deep_size(item, seen) for item in value)
+    elif isinstance(value, Record):
+        size += sum(_deep_size(getattr(value, name), seen) for name in value.__slots__)
+
+    return size
+
+
+def _resident(entries: list):
+    """Bytes held by a worker that read every cache entry back, in total.
+
+    Measured by walking the objects rather than with tracemalloc, which
+    also counts the interpreter's free lists.
+    """
+    values = [pickle.loads(entry) for entry in entries]
+    seen = set()
+
+    return sum(_deep_size(value, seen) for value in values)
+
+
+def get_conferences(copies: int):
+    """Conference commitments lists, one per copy, parsed from the fixture."""
+    page = next(page for page in pages.HTML_PAGES if page.name == "tds_conference_commitments")
+    content = page.load()
+
+    with pages.offline(), contextlib.redirect_stdout(io.StringIO()):
+        return [page.parse_targeted(content) for _ in range(copies)]
+
+
+def measure(conferences: list):
+    """Bytes per conference, each one pickled as its own cache entry."""
+    before = [pickle.dumps(_as_dicts(schools), pickle.HIGHEST_PROTOCOL) for schools in conferences]
+    after = [pickle.dumps(schools, pickle.HIGHEST_PROTOCOL) for schools in conferences]
+
+    return {
+        "players": sum(len(school["players"]) for schools in conferences for school in schools),
+        "before_pickled": sum(map(len, before)) / len(conferences),
+        "after_pickled": sum(map(len, after)) / len(conferences),
+        "before_resident": _resident(before) / len(conferences),
+        "after_resident": _resident(after) / len(conferences),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the memory of cached conferences as dicts and as records.")
+    parser.add_argument("--conferences", type=int, default=50)
+    args = parser.parse_args()
+
+    result = measure(get_conferences(args.conferences))
+
+    print(f"{args.conferences} cached conferences, {result['players'] // args.conferences} players each")
+    print(f"{'bytes per conference':<24} {'dicts':>10} {'records':>10} {'saved':>6}")
+
+    for name in ("pickled", "resident"):
+        before, after = result[f"before_{name}"], result[f"after_{name}"]
+        print(f"{name:<24} {before:>10.0f} {after:>10.0f} {1 - after / before:>6.0%}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+import contextlib
+import json
+import os
+
+from bs4 import BeautifulSoup
+
+from common import config
+from common import parsing
+from lib import clubs
+from lib import ncaa
+from lib import nwsl
+from lib import topdrawer
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+class PageType:
+    """An upstream page type: a fixture, the parser entry point and its strainer."""
+
+    def __init__(self, name: str, fixture: str, extract, strainer=None):
+        self.name = name
+        self.fixture = fixture
+        self.extract = extract
+        self.strainer = strainer
+
+    def load(self):
+        with open(os.path.join(FIXTURES, self.fixture), "rb") as f:
+            return f.read()
+
+    def parse_full(self, content):
+        """The original approach: a complete html.parser tree of the page."""
+        return self.extract(BeautifulSoup(content, "html.parser"))
+
+    def parse_targeted(self, content):
+        """The configured parser, building only the strained elements."""
+        return self.extract(parsing.parse(content, self.strainer))
+
+
+class JsonPageType(PageType):
+    """An upstream JSON document: there is only one way to parse it."""
+
+    def parse_full(self, content):
+        return self.extract(json.loads(content))
+
+    def parse_targeted(self, content):
+        return self.extract(json.loads(content))
+
+
+def _extract_player(soup, player):
+    topdrawer._extract_player_details(soup, player)
+    return player
+
+
+HTML_PAGES = [
+    PageType(
+        "tds_conferences", "tds_conferences.html",
+        lambda soup: topdrawer._extract_conferences(soup, "female"),
+        topdrawer.CONFERENCES_STRAINER,
+    ),
+    PageType(
+        "tds_conference_commitments", "tds_conference_commitments.html",
+        lambda soup: topdrawer._extract_conference_commits(soup, 2025, max_workers=1),
+        topdrawer.CONFERENCE_COMMITMENTS_STRAINER,
+    ),
+    PageType(
+        "tds_player_profile", "tds_player_profile.html",
+        lambda soup: _extract_player(soup, {"name": "Olivia Shippee"}),
+        topdrawer.PLAYER_STRAINER,
+    ),
+    PageType(
+        "tds_search_results", "tds_search_results.html",
+        lambda soup: (topdrawer._get_searched_players(soup), topdrawer._get_search_pages(soup)),
+        topdrawer.SEARCH_STRAINER,
+    ),
+    PageType(
+        "tds_transfer_tracker", "tds_transfer_tracker.html",
+        topdrawer._extract_transfers,
+        topdrawer.TRANSFERS_STRAINER,
+    ),
+    PageType(
+        "tds_club_commitments", "tds_club_commitments.html",
+        topdrawer._extract_commitments_by_club,
+        topdrawer.CLUB_COMMITMENTS_STRAINER,
+    ),
+    PageType(
+        "tds_college_details", "tds_college_details.html",
+        topdrawer._extract_college_details,
+        topdrawer.COLLEGE_STRAINER,
+    ),
+    PageType(
+        "ncaa_rpi", "ncaa_rpi.html",
+        lambda soup: ncaa._extract_rankings(soup.find("table"), ncaa._get_rpi_ranking),
+        ncaa.RANKINGS_STRAINER,
+    ),
+    # The USC Division I poll is published in the same table layout as the RPI.
+    PageType(
+        "usc_d1_rankings", "ncaa_rpi.html",
+        lambda soup: ncaa._extract_rankings(soup.find("table"), ncaa._get_rpi_ranking),
+        ncaa.RANKINGS_STRAINER,
+    ),
+    PageType(
+        "usc_d2_rankings", "usc_d2_rankings.html",
+        lambda soup: ncaa._extract_rankings(soup.find("table", class_="rankingsTable"), ncaa._get_usc_2d_ranking),
+        ncaa.USC_RANKINGS_STRAINER,
+    ),
+]
+
+JSON_PAGES = [
+    JsonPageType("ncaa_directory", "ncaa_directory.json", ncaa._extract_schools),
+    JsonPageType("nwsl_players", "nwsl_players.json", nwsl._extract_players),
+    JsonPageType("nwsl_standings", "nwsl_standings.json", nwsl._extract_standings),
+]
+
+PAGES = HTML_PAGES + JSON_PAGES
+
+
+@contextlib.contextmanager
+def pinned_clubs():
+    """Keep the club registries on their snapshots (or an empty list) instead of loading the clubs."""
+    saved_registries = [(registry, registry.loader, registry._clubs) for registry in (clubs.ECNL_CLUBS, clubs.GA_CLUBS)]
+
+    for registry in (clubs.ECNL_CLUBS, clubs.GA_CLUBS):
+        registry.loader = None
+        if registry._clubs is None and not os.path.exists(registry.snapshot_path):
+            registry._set([], 0)
+
+    try:
+        yield
+    finally:
+        for registry, loader, registry_clubs in saved_registries:
+            registry.loader = loader
+            registry._clubs = registry_clubs
+
+
+@contextlib.contextmanager
+def offline():
+    """Keep the parsers from reaching the network while they run over fixtures.
+
+    The club registries are pinned to their snapshots (or an empty list) and
+    player profile fetches become no-ops, on the threaded engine.
+    """
+    saved_loader, saved_engine = topdrawer.load_player_details, config.FETCH_ENGINE
+
+    topdrawer.load_player_details = lambda player: None
+    config.FETCH_ENGINE = "threads"
+
+    try:
+        with pinned_clubs():
+            yield
+    finally:
+        topdrawer.load_player_details = saved_loader
+        config.FETCH_ENGINE = saved_engine
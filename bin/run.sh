@@ -1,3 +1,9 @@
 #!/usr/bin/env bash
 
+# Share one cache between all of the workers instead of one per worker.
+export SOCCER_API_CACHE_TYPE="${SOCCER_API_CACHE_TYPE:-sqlite}"
+
+# Set SOCCER_API_WARMUP=1 to precompute the conference commitments before
+# users ask for them; it is off unless asked for.
+
 gunicorn wsgi:app --bind 0.0.0.0:8080 --log-level=info --workers=10 --timeout 600
@@ -0,0 +1,317 @@
+import asyncio
+import functools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import aiohttp
+import requests
+
+from common import config
+from common import fetch
+from common import pagestore
+
+# How long a request waiting for a busy host looks again, in seconds, in case
+# the slot was freed by a threaded request.
+SLOT_POLL = 0.05
+
+_lock = threading.Lock()
+_engine = None
+
+
+class Response(pagestore.StoredPage):
+    """An upstream response read by aiohttp, usable wherever a parser expects a requests.Response."""
+
+    def __init__(self, url: str, status_code: int, content: bytes, headers: dict):
+        super().__init__(url, content, headers, time.time())
+
+        self.status_code = status_code
+        self.ok = status_code < 400
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error for url: {self.url}", response=self)
+
+
+def _get_timeout(timeout):
+    if timeout is None:
+        timeout = (config.FETCH_CONNECT_TIMEOUT, config.FETCH_READ_TIMEOUT)
+
+    if isinstance(timeout, (int, float)):
+        timeout = (timeout, timeout)
+
+    return aiohttp.ClientTimeout(sock_connect=timeout[0], sock_read=timeout[1])
+
+
+class Engine:
+    """An event loop on a thread of its own, loading pages for any number of callers.
+
+    Requests share one aiohttp session, so a crawl keeps hundreds of pages
+    in flight from a single thread instead of one thread per page.  Every
+    request goes through the same per-host rate limiters, retries, page
+    store and counters as common.fetch.  Parsers run on FETCH_WORKERS
+    threads so the loop keeps reading responses while pages are parsed.
+    """
+
+    def __init__(self):
+        self.pid = os.getpid()
+        self.loop = asyncio.new_event_loop()
+        self.workers = ThreadPoolExecutor(max_workers=config.FETCH_WORKERS, thread_name_prefix="aiofetch-parse")
+        self.thread = threading.Thread(target=self._run, name="aiofetch", daemon=True)
+
+        self._session = None
+        self._released = {}
+
+        self.thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coroutine):
+        """Schedule the coroutine on the loop; returns a concurrent.futures.Future."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+    def run(self, coroutine):
+        """Run the coroutine on the loop and wait for its result."""
+        if threading.current_thread() is self.thread:
+            coroutine.close()
+            raise RuntimeError("The fetch engine cannot wait for itself; await the coroutine instead.")
+
+        return self.submit(coroutine).result()
+
+    def get_session(self):
+        # The session is bound to the loop, so it is created on it.
+        if self._session is None:
+            connector = aiohttp.TCPConnector(limit=config.FETCH_ASYNC_CONNECTIONS)
+            self._session = aiohttp.ClientSession(
+                connector=connector, headers={"User-Agent": fetch.USER_AGENT}
+            )
+
+        return self._session
+
+    async def in_worker(self, func, *args):
+        return await self.loop.run_in_executor(self.workers, func, *args)
+
+    async def acquire(self, url: str):
+        """Wait for the host's rate limiter without blocking the loop; returns the limiter and the start time."""
+        limiter = fetch.get_limiter(url)
+        released = self._released.setdefault(fetch.get_host(url), asyncio.Condition())
+
+        while True:
+            started, delay = limiter.try_acquire()
+            if started is not None:
+                return limiter, started
+
+            async with released:
+                try:
+                    await asyncio.wait_for(released.wait(), SLOT_POLL if delay is None else min(delay, SLOT_POLL))
+                except asyncio.TimeoutError:
+                    pass
+
+    async def release(self, url: str, limiter, started: float, status_code: int = None, retry_after: str = None):
+        limiter.release(started, status_code, retry_after)
+
+        released = self._released.get(fetch.get_host(url))
+        if released is not None:
+            async with released:
+                released.notify_all()
+
+    async def _close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def close(self):
+        self.run(self._close())
+
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+        self.workers.shutdown(wait=False)
+
+
+def get_engine():
+    """Return the engine of this process, starting it on first use."""
+    global _engine
+
+    with _lock:
+        # The loop thread does not survive a fork.
+        if _engine is None or _engine.pid != os.getpid():
+            _engine = Engine()
+
+        return _engine
+
+
+async def load(url: str, **kwargs):
+    """The coroutine behind get(); awaited on the engine's loop."""
+    engine = get_engine()
+    store = pagestore.get_store()
+
+    if config.FETCH_OFFLINE:
+        page = await engine.in_worker(store.get, url) if store is not None else None
+        if page is None:
+            raise requests.ConnectionError(f"{url} is not in the page store")
+
+        return page
+
+    timeout = _get_timeout(kwargs.pop("timeout", None))
+    host = fetch.get_host(url)
+
+    for attempt in range(config.FETCH_RETRIES + 1):
+        limiter, acquired = await engine.acquire(url)
+
+        started = time.perf_counter()
+        try:
+            async with engine.get_session().get(url, timeout=timeout, **kwargs) as reply:
+                content = await reply.read()
+                response = Response(str(reply.url), reply.status, content, dict(reply.headers))
+        except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+            await engine.release(url, limiter, acquired)
+            fetch._record(host, time.perf_counter() - started, 0, True)
+
+            if attempt == config.FETCH_RETRIES:
+                if isinstance(err, asyncio.TimeoutError):
+                    raise requests.Timeout(f"{url} timed out") from err
+
+                raise requests.ConnectionError(f"Unable to load {url}: {err}") from err
+
+            await asyncio.sleep(config.FETCH_BACKOFF * (2 ** attempt))
+            continue
+
+        await engine.release(url, limiter, acquired, response.status_code, response.headers.get("Retry-After"))
+        fetch._record(host, time.perf_counter() - started, len(content), response.status_code >= 400)
+
+        if response.status_code not in fetch.RETRY_STATUSES or attempt == config.FETCH_RETRIES:
+            break
+
+        await asyncio.sleep(config.FETCH_BACKOFF * (2 ** attempt))
+
+    if store is not None and response.status_code == 200 and not kwargs.get("params"):
+        try:
+            await engine.in_worker(store.put, url, response.content, response.headers)
+        except OSError as err:
+            print(f"Unable to store the page {url}: {err}")
+
+    return response
+
+
+async def _revalidate_stored(url: str, **kwargs):
+    engine = get_engine()
+    store = pagestore.get_store()
+    record = await engine.in_worker(store.get_record, url) if store is not None else None
+
+    if record is not None:
+        validators = record["headers"]
+        kwargs["headers"] = fetch._conditional_headers(
+            kwargs.get("headers"), validators.get("ETag"), validators.get("Last-Modified")
+        )
+
+    response = await load(url, **kwargs)
+
+    if record is not None and response.status_code == 304:
+        page = await engine.in_worker(store.get, url)
+
+        if page is not None:
+            fetch._record_saved(fetch.get_host(url), len(page.content), 0.0)
+            return page
+
+        kwargs["headers"].pop("If-None-Match", None)
+        kwargs["headers"].pop("If-Modified-Since", None)
+        response = await load(url, **kwargs)
+
+    return response
+
+
+async def load_parsed(url: str, parse, *args, **kwargs):
+    """The coroutine behind get_parsed(), revalidating a previous result like fetch.get_parsed."""
+    engine = get_engine()
+    store = fetch._get_cache()
+    key = f"fetch:{url}:{parse.__module__}.{parse.__qualname__}:{args!r}"
+    # The cache and the page store block on disk or the network, so they are
+    # used from the worker threads like the parsers.
+    entry = await engine.in_worker(store.get, key) if store is not None else None
+
+    if entry is None:
+        response = await _revalidate_stored(url, **kwargs)
+    else:
+        kwargs["headers"] = fetch._conditional_headers(kwargs.get("headers"), entry["etag"], entry["last_modified"])
+        response = await load(url, **kwargs)
+
+        if response.status_code == 304:
+            fetch._record_saved(fetch.get_host(url), entry["bytes"], entry["parse_seconds"])
+            return entry["result"]
+
+    response.raise_for_status()
+
+    started = time.perf_counter()
+    result = await engine.in_worker(parse, response, *args)
+    parse_seconds = time.perf_counter() - started
+
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+
+    if store is not None and (etag or last_modified):
+        entry = {
+            "etag": etag,
+            "last_modified": last_modified,
+            "result": result,
+            "bytes": len(response.content),
+            "parse_seconds": parse_seconds,
+        }
+        await engine.in_worker(functools.partial(store.set, key, entry, timeout=config.FETCH_VALIDATOR_TIMEOUT))
+
+    return result
+
+
+def get(url: str, **kwargs):
+    """fetch.get on the engine: the same arguments, retries, limits and page store, from any thread."""
+    return get_engine().run(load(url, **kwargs))
+
+
+def get_parsed(url: str, parse, *args, **kwargs):
+    """fetch.get_parsed on the engine."""
+    return get_engine().run(load_parsed(url, parse, *args, **kwargs))
+
+
+async def _capture(coroutine):
+    try:
+        return await coroutine, None
+    except Exception as err:
+        return None, err
+
+
+def iter_parsed(urls, parse, *args):
+    """Load and parse every url at once, yielding (parse(response, *args), error) in the order of urls.
+
+    All the pages are requested together; how many are in flight is left to
+    the host's rate limiter and FETCH_ASYNC_CONNECTIONS.  Closing the
+    generator early cancels the pages that have not loaded.  Parsers run on
+    the engine's worker threads and must not wait for the engine themselves.
+    """
+    engine = get_engine()
+    futures = [engine.submit(_capture(load_parsed(url, parse, *args))) for url in urls]
+
+    try:
+        for future in futures:
+            yield future.result()
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+def map_parsed(urls, parse, *args):
+    """Like iter_parsed, returning a list of (result, error) tuples like concurrency.fan_out."""
+    return list(iter_parsed(urls, parse, *args))
+
+
+def close():
+    """Stop the engine and close its session."""
+    global _engine
+
+    with _lock:
+        engine, _engine = _engine, None
+
+    if engine is not None and engine.pid == os.getpid():
+        engine.close()
@@ -0,0 +1,327 @@
+import fnmatch
+import os
+import pickle
+import sqlite3
+import tempfile
+import threading
+import time
+
+from flask_caching.backends.base import BaseCache
+from flask_caching.backends.rediscache import RedisCache as FlaskRedisCache
+from werkzeug.utils import import_string
+
+# Short names accepted in SOCCER_API_CACHE_TYPE.
+CACHE_TYPES = {
+    "simple": "SimpleCache",
+    "filesystem": "FileSystemCache",
+    "sqlite": "common.cache_backends.SQLiteCache",
+    "redis": "common.cache_backends.RedisCache",
+}
+
+
+def get_cache_config():
+    """Build the Flask-Caching settings from the SOCCER_API_CACHE_* environment.
+
+    The default is the per-process SimpleCache.  Multi-worker deployments
+    should select one of the shared backends (sqlite, filesystem or redis) so
+    every memoized scrape is filled once instead of once per worker.
+    """
+    cache_type = os.environ.get("SOCCER_API_CACHE_TYPE", "simple")
+    cache_type = CACHE_TYPES.get(cache_type.strip().lower(), cache_type)
+
+    settings = {"CACHE_TYPE": cache_type}
+
+    if cache_type == "FileSystemCache":
+        settings["CACHE_DIR"] = os.environ.get(
+            "SOCCER_API_CACHE_DIR", os.path.join(tempfile.gettempdir(), "soccer-api-cache")
+        )
+    elif cache_type == CACHE_TYPES["sqlite"]:
+        settings["CACHE_SQLITE_PATH"] = os.environ.get(
+            "SOCCER_API_CACHE_PATH", os.path.join(tempfile.gettempdir(), "soccer-api-cache.sqlite")
+        )
+    elif cache_type == CACHE_TYPES["redis"]:
+        settings["CACHE_REDIS_URL"] = os.environ.get("SOCCER_API_CACHE_URL", "redis://localhost:6379/0")
+
+        client = os.environ.get("SOCCER_API_CACHE_REDIS_CLIENT")
+        if client:
+            settings["CACHE_REDIS_CLIENT"] = client
+
+    return settings
+
+
+class SQLiteCache(BaseCache):
+    """A cache shared by every process on the box, stored in one SQLite file.
+
+    Each thread of each process opens its own connection, so the cache is
+    safe to use from gunicorn workers forked after the app was created.
+    """
+
+    _PRUNE_INTERVAL = 500
+
+    def __init__(self, path: str, default_timeout: int = 300):
+        super().__init__(default_timeout=default_timeout)
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY,"
+            " value BLOB NOT NULL,"
+            " expires REAL NOT NULL)"
+        )
+
+    @classmethod
+    def factory(cls, app, config, args, kwargs):
+        path = config.get(
+            "CACHE_SQLITE_PATH", os.path.join(tempfile.gettempdir(), "soccer-api-cache.sqlite")
+        )
+        return cls(path, *args, **kwargs)
+
+    def _connection(self):
+        pid = os.getpid()
+
+        if getattr(self._local, "pid", None) != pid:
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+
+            self._local.connection = connection
+            self._local.pid = pid
+
+        return self._local.connection
+
+    def _expires(self, timeout):
+        timeout = self._normalize_timeout(timeout)
+
+        if timeout == 0:
+            return 0
+
+        return time.time() + timeout
+
+    def _prune(self):
+        self._writes += 1
+
+        if self._writes % self._PRUNE_INTERVAL == 0:
+            self._connection().execute(
+                "DELETE FROM entries WHERE expires != 0 AND expires <= ?", (time.time(),)
+            )
+
+    def get(self, key):
+        row = self._connection().execute(
+            "SELECT value FROM entries WHERE key = ? AND (expires = 0 OR expires > ?)",
+            (key, time.time()),
+        ).fetchone()
+
+        if row is None:
+            return None
+
+        return pickle.loads(row[0])
+
+    def set(self, key, value, timeout=None):
+        self._connection().execute(
+            "INSERT OR REPLACE INTO entries (key, value, expires) VALUES (?, ?, ?)",
+            (key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), self._expires(timeout)),
+        )
+        self._prune()
+
+        return True
+
+    def add(self, key, value, timeout=None):
+        cursor = self._connection().execute(
+            "INSERT INTO entries (key, value, expires) VALUES (?, ?, ?)"
+            " ON CONFLICT(key) DO UPDATE SET value = excluded.value, expires = excluded.expires"
+            " WHERE entries.expires != 0 AND entries.expires <= ?",
+            (key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), self._expires(timeout), time.time()),
+        )
+
+        return cursor.rowcount > 0
+
+    def delete(self, key):
+        cursor = self._connection().execute("DELETE FROM entries WHERE key = ?", (key,))
+
+        return cursor.rowcount > 0
+
+    def has(self, key):
+        row = self._connection().execute(
+            "SELECT 1 FROM entries WHERE key = ? AND (expires = 0 OR expires > ?)",
+            (key, time.time()),
+        ).fetchone()
+
+        return row is not None
+
+    def clear(self):
+        self._connection().execute("DELETE FROM entries")
+
+        return True
+
+    def inc(self, key, delta=1):
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+
+        try:
+            value = (self.get(key) or 0) + delta
+            row = connection.execute("SELECT expires FROM entries WHERE key = ?", (key,)).fetchone()
+            expires = row[0] if row is not None and (row[0] == 0 or row[0] > time.time()) else self._expires(None)
+
+            connection.execute(
+                "INSERT OR REPLACE INTO entries (key, value, expires) VALUES (?, ?, ?)",
+                (key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), expires),
+            )
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+
+        return value
+
+    def dec(self, key, delta=1):
+        return self.inc(key, -delta)
+
+
+class RedisCache(FlaskRedisCache):
+    """Flask-Caching's Redis backend, with an injectable client.
+
+    Setting CACHE_REDIS_CLIENT to a client object or to the import path of a
+    client class lets tests and single-box setups use a stand-in such as
+    LocalRedis instead of a real server.
+    """
+
+    @classmethod
+    def factory(cls, app, config, args, kwargs):
+        client = config.get("CACHE_REDIS_CLIENT")
+
+        if client is None:
+            return super().factory(app, config, args, kwargs)
+
+        if isinstance(client, str):
+            client = import_string(client)()
+
+        key_prefix = config.get("CACHE_KEY_PREFIX")
+        if key_prefix:
+            kwargs["key_prefix"] = key_prefix
+
+        return cls(client, *args, **kwargs)
+
+
+def _now():
+    # LocalRedis mirrors redis-py, whose "time" arguments shadow the module.
+    return time.time()
+
+
+class LocalRedis:
+    """An in-process stand-in for the subset of redis-py used by RedisCache."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._values = {}
+        self._expires = {}
+
+    @staticmethod
+    def _encode(value):
+        if isinstance(value, bytes):
+            return value
+
+        return str(value).encode("utf-8")
+
+    def _alive(self, name):
+        expires = self._expires.get(name)
+
+        if expires is not None and expires <= _now():
+            self._values.pop(name, None)
+            self._expires.pop(name, None)
+
+        return name in self._values
+
+    def get(self, name):
+        with self._lock:
+            if not self._alive(name):
+                return None
+
+            return self._values[name]
+
+    def mget(self, names):
+        return [self.get(name) for name in names]
+
+    def set(self, name, value):
+        with self._lock:
+            self._values[name] = self._encode(value)
+            self._expires.pop(name, None)
+
+        return True
+
+    def setex(self, name, time, value):
+        with self._lock:
+            self.set(name, value)
+            self.expire(name, time)
+
+        return True
+
+    def setnx(self, name, value):
+        with self._lock:
+            if self._alive(name):
+                return False
+
+            return self.set(name, value)
+
+    def expire(self, name, time):
+        with self._lock:
+            if not self._alive(name):
+                return False
+
+            self._expires[name] = _now() + time
+
+        return True
+
+    def exists(self, *names):
+        with self._lock:
+            return sum(1 for name in names if self._alive(name))
+
+    def delete(self, *names):
+        with self._lock:
+            deleted = 0
+            for name in names:
+                if self._alive(name):
+                    deleted += 1
+                self._values.pop(name, None)
+                self._expires.pop(name, None)
+
+        return deleted
+
+    unlink = delete
+
+    def keys(self, pattern="*"):
+        with self._lock:
+            return [name for name in list(self._values) if self._alive(name) and fnmatch.fnmatchcase(name, pattern)]
+
+    def flushdb(self):
+        with self._lock:
+            self._values.clear()
+            self._expires.clear()
+
+        return True
+
+    def incr(self, name, amount=1):
+        with self._lock:
+            value = int(self.get(name) or 0) + amount
+            self._values[name] = self._encode(value)
+
+        return value
+
+    def pipeline(self, transaction=True):
+        return _LocalPipeline(self)
+
+
+class _LocalPipeline:
+    def __init__(self, client):
+        self._client = client
+        self._commands = []
+
+    def set(self, name, value):
+        self._commands.append(lambda: self._client.set(name, value))
+
+    def setex(self, name, time, value):
+        self._commands.append(lambda: self._client.setex(name, time, value))
+
+    def execute(self):
+        return [command() for command in self._commands]
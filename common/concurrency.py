@@ -0,0 +1,74 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from common import config
+
+
+def _capture(func):
+    def call(item):
+        try:
+            return func(item), None
+        except Exception as err:
+            return None, err
+
+    return call
+
+
+def fan_out(func, items, max_workers: int = None):
+    """Apply func to every item using a bounded pool of worker threads.
+
+    Returns a list of (result, error) tuples in the same order as items.  A
+    failure for one item is captured in its error slot instead of aborting
+    the remaining items.
+    """
+    items = list(items)
+
+    if len(items) == 0:
+        return []
+
+    if max_workers is None:
+        max_workers = config.FETCH_WORKERS
+
+    max_workers = max(1, min(max_workers, len(items)))
+
+    call = _capture(func)
+
+    if max_workers == 1:
+        return [call(item) for item in items]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(call, items))
+
+
+def fan_out_iter(func, items, max_workers: int = None):
+    """Like fan_out, but yields each (result, error) in order as soon as it is ready.
+
+    Closing the generator early cancels the items that have not started.
+    """
+    items = list(items)
+
+    if len(items) == 0:
+        return
+
+    if max_workers is None:
+        max_workers = config.FETCH_WORKERS
+
+    max_workers = max(1, min(max_workers, len(items)))
+
+    call = _capture(func)
+
+    if max_workers == 1:
+        for item in items:
+            yield call(item)
+        return
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    futures = [executor.submit(call, item) for item in items]
+
+    try:
+        for future in futures:
+            yield future.result()
+    finally:
+        for future in futures:
+            future.cancel()
+
+        executor.shutdown(wait=False)
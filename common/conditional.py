@@ -0,0 +1,79 @@
+import hashlib
+
+from flask import current_app, g, has_request_context, request
+from werkzeug.http import http_date
+
+from common import memo
+
+
+def get_validators():
+    """(etag, last_modified, max_age) of the cached values behind the current response, or None.
+
+    The ETag changes whenever one of those values is recomputed.
+    Last-Modified is when the newest of them was computed, and max_age
+    is how long the oldest one remains fresh.
+    """
+    if not has_request_context() or request.method not in ("GET", "HEAD"):
+        return None
+
+    entries = g.get("cache_entries")
+    if not entries:
+        return None
+
+    now = memo._now()
+    versions = sorted({(key, created) for key, created, _ in entries})
+    representation = (request.full_path, request.headers.get(current_app.config.get("RESTX_MASK_HEADER", "X-Fields")))
+
+    etag = hashlib.sha1(repr((representation, versions)).encode("utf-8")).hexdigest()
+    last_modified = max(created for _, created, _ in entries)
+    max_age = max(0, int(min(created + timeout - now for _, created, timeout in entries)))
+
+    return etag, last_modified, max_age
+
+
+def _set_headers(response, validators):
+    etag, last_modified, max_age = validators
+
+    response.set_etag(etag, weak=True)
+    response.headers["Last-Modified"] = http_date(last_modified)
+    response.headers["Cache-Control"] = f"public, max-age={max_age}"
+
+
+def not_modified():
+    """A 304 response when the client already has the current representation, else None.
+
+    Called once the cached values are in hand, so an unchanged response is
+    answered without serializing it.
+    """
+    validators = get_validators()
+
+    if validators is None or not request.if_none_match.contains_weak(validators[0]):
+        return None
+
+    response = current_app.response_class(status=304)
+    _set_headers(response, validators)
+
+    return response
+
+
+def add_validators(response):
+    """after_request hook that adds ETag, Last-Modified and Cache-Control to cacheable responses.
+
+    Responses built from memoized values are validated by the versions of
+    those values; other JSON responses by a hash of their body.  Either
+    way a matching If-None-Match turns the response into a 304.
+    """
+    if request.method not in ("GET", "HEAD") or response.status_code != 200 or response.is_streamed:
+        return response
+
+    validators = get_validators()
+
+    if validators is not None:
+        _set_headers(response, validators)
+    elif response.mimetype == "application/json" and "ETag" not in response.headers:
+        response.add_etag(weak=True)
+        response.headers.setdefault("Cache-Control", "no-cache")
+    else:
+        return response
+
+    return response.make_conditional(request)
@@ -1,4 +1,9 @@
+import functools
 import json
+import os
+import tempfile
+
+DATA_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
 
 def load_club_translations(path: str):
     translations = {}
@@ -32,13 +37,111 @@ def translate_club_name(club_name: str):
     if len(club_name) == 0:
         return ''
 
-    if club_name in CLUB_TRANSLATIONS:
-        club_name = CLUB_TRANSLATIONS[club_name]
+    translations = get_club_translations()
+    if club_name in translations:
+        club_name = translations[club_name]
 
     return club_name
 
-GA_CLUBS = load_ga_clubs("data/ga_clubs.json")
-CLUB_TRANSLATIONS = load_club_translations("data/club_translations.json")
+@functools.lru_cache(maxsize=None)
+def get_ga_clubs():
+    return load_ga_clubs(os.path.join(DATA_DIRECTORY, "ga_clubs.json"))
+
+@functools.lru_cache(maxsize=None)
+def get_club_translations():
+    return load_club_translations(os.path.join(DATA_DIRECTORY, "club_translations.json"))
+
+def __getattr__(name: str):
+    # GA_CLUBS and CLUB_TRANSLATIONS are read from disk on first use, not at import.
+    if name == "GA_CLUBS":
+        return get_ga_clubs()
+
+    if name == "CLUB_TRANSLATIONS":
+        return get_club_translations()
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# The number of concurrent upstream requests a single crawl may issue.
+FETCH_WORKERS = int(os.environ.get("SOCCER_API_FETCH_WORKERS", "8"))
+PLAYER_DETAIL_WORKERS = int(os.environ.get("SOCCER_API_PLAYER_DETAIL_WORKERS", str(FETCH_WORKERS)))
+
+# Outbound HTTP settings shared by every scraper (see common.fetch).
+FETCH_CONNECT_TIMEOUT = float(os.environ.get("SOCCER_API_FETCH_CONNECT_TIMEOUT", "5"))
+FETCH_READ_TIMEOUT = float(os.environ.get("SOCCER_API_FETCH_READ_TIMEOUT", "30"))
+FETCH_RETRIES = int(os.environ.get("SOCCER_API_FETCH_RETRIES", "3"))
+FETCH_BACKOFF = float(os.environ.get("SOCCER_API_FETCH_BACKOFF", "0.5"))
+FETCH_POOL_SIZE = int(os.environ.get("SOCCER_API_FETCH_POOL_SIZE", str(max(10, FETCH_WORKERS))))
+
+# "threads" loads the pages of a crawl on FETCH_WORKERS threads; "async" loads
+# them all from the event loop of common.aiofetch, over at most
+# FETCH_ASYNC_CONNECTIONS connections, leaving the pace to the rate limiter.
+FETCH_ENGINE = os.environ.get("SOCCER_API_FETCH_ENGINE", "threads").lower()
+FETCH_ASYNC_CONNECTIONS = int(os.environ.get("SOCCER_API_FETCH_ASYNC_CONNECTIONS", "100"))
+
+# The per-host rate limiter (see common.ratelimit): requests per second it
+# starts at and stays between, the burst of tokens, how much a healthy
+# response raises the rate, the parallel requests allowed, the latency above
+# which the host is considered slow and the longest Retry-After honored.
+FETCH_RATE = float(os.environ.get("SOCCER_API_FETCH_RATE", "5"))
+FETCH_MIN_RATE = float(os.environ.get("SOCCER_API_FETCH_MIN_RATE", "0.5"))
+FETCH_MAX_RATE = float(os.environ.get("SOCCER_API_FETCH_MAX_RATE", "25"))
+FETCH_BURST = float(os.environ.get("SOCCER_API_FETCH_BURST", "5"))
+FETCH_RATE_STEP = float(os.environ.get("SOCCER_API_FETCH_RATE_STEP", "0.25"))
+FETCH_MAX_CONCURRENCY = int(os.environ.get("SOCCER_API_FETCH_MAX_CONCURRENCY", str(FETCH_WORKERS)))
+FETCH_TARGET_LATENCY = float(os.environ.get("SOCCER_API_FETCH_TARGET_LATENCY", "2"))
+FETCH_MAX_PAUSE = float(os.environ.get("SOCCER_API_FETCH_MAX_PAUSE", "120"))
+
+# Where raw upstream responses are kept (see common.pagestore); empty disables the store.
+# With FETCH_OFFLINE set, every fetch is served from the store instead of the network.
+PAGE_STORE_DIR = os.environ.get("SOCCER_API_PAGE_STORE_DIR", os.path.join(tempfile.gettempdir(), "soccer-api-pages"))
+PAGE_STORE_COMPRESSION = int(os.environ.get("SOCCER_API_PAGE_STORE_COMPRESSION", "6"))
+# The most bytes of compressed bodies kept and the most seconds a page is kept
+# after it was fetched; the oldest pages are dropped first and 0 is no limit.
+PAGE_STORE_MAX_BYTES = int(os.environ.get("SOCCER_API_PAGE_STORE_MAX_BYTES", str(512 * 1024 * 1024)))
+PAGE_STORE_MAX_AGE = int(os.environ.get("SOCCER_API_PAGE_STORE_MAX_AGE", "2592000"))
+FETCH_OFFLINE = os.environ.get("SOCCER_API_FETCH_OFFLINE", "").lower() in ("1", "true", "yes")
+
+# The SQLite database scraped players, colleges, conferences, clubs and rankings
+# are kept in (see lib.store), as an SQLAlchemy URL; empty disables the store.
+STORE_URL = os.environ.get(
+    "SOCCER_API_STORE_URL", "sqlite:///" + os.path.join(tempfile.gettempdir(), "soccer-api-store.sqlite")
+)
+
+# How long the validators and parsed result of an upstream page are kept for revalidation.
+FETCH_VALIDATOR_TIMEOUT = int(os.environ.get("SOCCER_API_FETCH_VALIDATOR_TIMEOUT", "2592000"))
+
+# The BeautifulSoup tree builder: "auto" (lxml when installed), "lxml" or "html.parser".
+HTML_PARSER = os.environ.get("SOCCER_API_HTML_PARSER", "auto")
+
+# How long past its timeout a memoized scrape is still served while it is
+# refreshed in the background, and how long that refresh's lease lasts
+# without being renewed.
+MEMO_MAX_STALE = int(os.environ.get("SOCCER_API_MEMO_MAX_STALE", "604800"))
+MEMO_REFRESH_LEASE = int(os.environ.get("SOCCER_API_MEMO_REFRESH_LEASE", "900"))
+
+# How long one worker's claim to compute a missing entry lasts while the
+# others wait for it (renewed while it computes, so it only runs out when
+# the worker dies), and how often they check whether it has arrived.
+MEMO_FLIGHT_LEASE = int(os.environ.get("SOCCER_API_MEMO_FLIGHT_LEASE", "900"))
+MEMO_FLIGHT_POLL = float(os.environ.get("SOCCER_API_MEMO_FLIGHT_POLL", "0.25"))
+
+# The background warm-up of the conference commitments (see lib.warmup).
+# WARMUP_YEARS is a comma separated list; by default this year and the next three.
+WARMUP_ENABLED = os.environ.get("SOCCER_API_WARMUP", "").lower() in ("1", "true", "yes")
+WARMUP_INTERVAL = int(os.environ.get("SOCCER_API_WARMUP_INTERVAL", "21600"))
+WARMUP_WORKERS = int(os.environ.get("SOCCER_API_WARMUP_WORKERS", "2"))
+WARMUP_YEARS = os.environ.get("SOCCER_API_WARMUP_YEARS", "")
+
+# How long a club registry snapshot is served before it is refreshed in the background.
+CLUB_REGISTRY_MAX_AGE = int(os.environ.get("SOCCER_API_CLUB_REGISTRY_MAX_AGE", "604800"))
+# How long after a failed load a club registry tries again; doubled with every failure.
+CLUB_REGISTRY_RETRY = int(os.environ.get("SOCCER_API_CLUB_REGISTRY_RETRY", "60"))
+
+# The lowest score at which a fuzzy club name match is taken (see lib.clubs.LeagueIndex).
+CLUB_MATCH_THRESHOLD = float(os.environ.get("SOCCER_API_CLUB_MATCH_THRESHOLD", "0.8"))
+
+# The largest page a paginated list endpoint returns (see common.listing).
+LIST_MAX_LIMIT = int(os.environ.get("SOCCER_API_LIST_MAX_LIMIT", "1000"))
 
 DIVISION_MAPPING = {
     "di": "/di/divisionid-1",
@@ -157,4 +260,4 @@ STATE_LOOKUP = {
 
 
 if __name__ == "__main__":
-    print(GA_CLUBS)
+    print(get_ga_clubs())
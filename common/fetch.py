@@ -0,0 +1,339 @@
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from common import concurrency
+from common import config
+from common import pagestore
+from common import ratelimit
+from common.extensions import cache
+
+USER_AGENT = "soccer-api (+https://github.com/ocrosby/soccer-api)"
+
+_lock = threading.Lock()
+_sessions = {}
+_limiters = {}
+_stats = {}
+_pid = os.getpid()
+
+
+def get_host(url: str):
+    return urlsplit(url).netloc.lower()
+
+
+# Responses retried by get() after the host's limiter has backed off.
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def _new_session():
+    # Connection failures are retried here; throttling responses are retried
+    # by get() so that every attempt goes through the rate limiter.
+    retry = Retry(
+        total=config.FETCH_RETRIES,
+        backoff_factor=config.FETCH_BACKOFF,
+        allowed_methods=("GET", "HEAD"),
+        raise_on_status=False,
+        respect_retry_after_header=False,
+    )
+
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=config.FETCH_POOL_SIZE,
+        max_retries=retry,
+    )
+
+    session = requests.Session()
+    session.headers["User-Agent"] = USER_AGENT
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    return session
+
+
+def get_session(url: str):
+    """Return the pooled session for the host of the given url."""
+    global _pid
+
+    host = get_host(url)
+
+    with _lock:
+        # Connections must not be shared with a parent process after a fork.
+        if _pid != os.getpid():
+            _sessions.clear()
+            _limiters.clear()
+            _stats.clear()
+            _pid = os.getpid()
+
+        session = _sessions.get(host)
+        if session is None:
+            session = _new_session()
+            _sessions[host] = session
+            _limiters[host] = ratelimit.HostLimiter()
+            _stats[host] = {
+                "requests": 0, "errors": 0, "bytes": 0, "seconds": 0.0,
+                "not_modified": 0, "bytes_saved": 0, "parse_seconds_saved": 0.0,
+            }
+
+    return session
+
+
+def get_limiter(url: str):
+    """Return the rate limiter for the host of the given url."""
+    get_session(url)
+
+    with _lock:
+        return _limiters[get_host(url)]
+
+
+def _record(host: str, elapsed: float, size: int, failed: bool):
+    with _lock:
+        counters = _stats.get(host)
+        if counters is None:
+            return
+
+        counters["requests"] += 1
+        counters["seconds"] += elapsed
+        counters["bytes"] += size
+        if failed:
+            counters["errors"] += 1
+
+
+def get(url: str, **kwargs):
+    """GET the url through the pooled, keep-alive session for its host.
+
+    Failed connections and 429/5xx responses are retried with exponential
+    backoff.  Accepts the same keyword arguments as requests.get; the timeout defaults
+    to (config.FETCH_CONNECT_TIMEOUT, config.FETCH_READ_TIMEOUT).
+
+    Every attempt waits for the host's rate limiter, which slows down on
+    429/5xx responses (honoring Retry-After) and speeds up while the host
+    answers quickly.
+
+    Successful responses are kept in the page store.  With
+    config.FETCH_OFFLINE set, the stored response is returned instead.
+
+    With config.FETCH_ENGINE set to "async" the request is made by the
+    event loop of common.aiofetch.
+    """
+    if config.FETCH_ENGINE == "async":
+        from common import aiofetch
+        return aiofetch.get(url, **kwargs)
+
+    kwargs.setdefault("timeout", (config.FETCH_CONNECT_TIMEOUT, config.FETCH_READ_TIMEOUT))
+
+    store = pagestore.get_store()
+
+    if config.FETCH_OFFLINE:
+        page = store.get(url) if store is not None else None
+        if page is None:
+            raise requests.ConnectionError(f"{url} is not in the page store")
+
+        return page
+
+    session = get_session(url)
+    limiter = get_limiter(url)
+    host = get_host(url)
+
+    for attempt in range(config.FETCH_RETRIES + 1):
+        acquired = limiter.acquire()
+
+        started = time.perf_counter()
+        try:
+            response = session.get(url, **kwargs)
+        except requests.RequestException:
+            limiter.release(acquired)
+            _record(host, time.perf_counter() - started, 0, True)
+            raise
+
+        limiter.release(acquired, response.status_code, response.headers.get("Retry-After"))
+        _record(host, time.perf_counter() - started, len(response.content), response.status_code >= 400)
+
+        if response.status_code not in RETRY_STATUSES or attempt == config.FETCH_RETRIES:
+            break
+
+        time.sleep(config.FETCH_BACKOFF * (2 ** attempt))
+
+    if store is not None and response.status_code == 200 and not kwargs.get("params"):
+        try:
+            store.put(url, response.content, response.headers)
+        except OSError as err:
+            print(f"Unable to store the page {url}: {err}")
+
+    return response
+
+
+def _get_cache():
+    # Validators and parsed results live in the shared cache once the app
+    # has configured it; without it every fetch is unconditional.
+    try:
+        return cache.cache
+    except (AttributeError, KeyError, RuntimeError):
+        return None
+
+
+def _record_saved(host: str, size: int, parse_seconds: float):
+    with _lock:
+        counters = _stats.get(host)
+        if counters is None:
+            return
+
+        counters["not_modified"] += 1
+        counters["bytes_saved"] += size
+        counters["parse_seconds_saved"] += parse_seconds
+
+
+def _conditional_headers(headers: dict, etag: str, last_modified: str):
+    headers = dict(headers or {})
+
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+
+    return headers
+
+
+def _revalidate_stored(url: str, **kwargs):
+    """GET the url, answering a 304 with the page store's copy of the page."""
+    store = pagestore.get_store()
+    record = store.get_record(url) if store is not None else None
+
+    if record is not None:
+        validators = record["headers"]
+        kwargs["headers"] = _conditional_headers(
+            kwargs.get("headers"), validators.get("ETag"), validators.get("Last-Modified")
+        )
+
+    response = get(url, **kwargs)
+
+    if record is not None and response.status_code == 304:
+        page = store.get(url)
+
+        if page is not None:
+            _record_saved(get_host(url), len(page.content), 0.0)
+            return page
+
+        # The stored body is gone; fetch the page unconditionally.
+        kwargs["headers"].pop("If-None-Match", None)
+        kwargs["headers"].pop("If-Modified-Since", None)
+        response = get(url, **kwargs)
+
+    return response
+
+
+def get_content(url: str, **kwargs):
+    """Return the body of url, downloading it only when it changed since it was stored."""
+    response = _revalidate_stored(url, **kwargs)
+    response.raise_for_status()
+
+    return response.content
+
+
+def get_parsed(url: str, parse, *args, **kwargs):
+    """GET the url and return parse(response, *args), revalidating a previous result.
+
+    The ETag and Last-Modified of the response are stored together with the
+    parsed result.  The next call sends them back as If-None-Match and
+    If-Modified-Since; when upstream answers 304 Not Modified, the stored
+    result is returned without downloading or parsing the page again.
+    Without a stored result (a cold worker), the page store's copy is
+    revalidated instead and parsed from disk.
+    """
+    store = _get_cache()
+    key = f"fetch:{url}:{parse.__module__}.{parse.__qualname__}:{args!r}"
+    entry = store.get(key) if store is not None else None
+
+    if entry is None:
+        response = _revalidate_stored(url, **kwargs)
+    else:
+        kwargs["headers"] = _conditional_headers(kwargs.get("headers"), entry["etag"], entry["last_modified"])
+        response = get(url, **kwargs)
+
+        if response.status_code == 304:
+            _record_saved(get_host(url), entry["bytes"], entry["parse_seconds"])
+            return entry["result"]
+
+    response.raise_for_status()
+
+    started = time.perf_counter()
+    result = parse(response, *args)
+    parse_seconds = time.perf_counter() - started
+
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+
+    if store is not None and (etag or last_modified):
+        entry = {
+            "etag": etag,
+            "last_modified": last_modified,
+            "result": result,
+            "bytes": len(response.content),
+            "parse_seconds": parse_seconds,
+        }
+        store.set(key, entry, timeout=config.FETCH_VALIDATOR_TIMEOUT)
+
+    return result
+
+
+def iter_parsed(urls, parse, *args, max_workers: int = None):
+    """Yields (get_parsed(url, parse, *args), error) for every url, in order, loading the pages concurrently.
+
+    The pages are loaded on max_workers threads, or all at once by the
+    event loop of common.aiofetch when config.FETCH_ENGINE is "async".
+    """
+    if config.FETCH_ENGINE == "async":
+        from common import aiofetch
+        return aiofetch.iter_parsed(urls, parse, *args)
+
+    return concurrency.fan_out_iter(lambda url: get_parsed(url, parse, *args), urls, max_workers)
+
+
+def map_parsed(urls, parse, *args, max_workers: int = None):
+    """Like iter_parsed, returning a list of (result, error) tuples like concurrency.fan_out."""
+    return list(iter_parsed(urls, parse, *args, max_workers=max_workers))
+
+
+def get_stats():
+    """Return a snapshot of the per-host counters.
+
+    "connections" is the number of connections the pool has opened, so a
+    value much lower than "requests" means keep-alive is doing its job.
+    "not_modified" counts revalidated responses, and "bytes_saved" and
+    "parse_seconds_saved" what they would have cost to download and parse.
+    "rate", "concurrency", "queue" and the rest come from the host's rate
+    limiter: the requests per second and parallel requests it currently
+    allows, and how many requests are waiting for it.
+    """
+    with _lock:
+        snapshot = {}
+
+        for host, counters in _stats.items():
+            record = dict(counters)
+            record["connections"] = 0
+
+            session = _sessions[host]
+            for adapter in set(session.adapters.values()):
+                for key in adapter.poolmanager.pools.keys():
+                    record["connections"] += adapter.poolmanager.pools[key].num_connections
+
+            record.update(_limiters[host].get_stats())
+
+            snapshot[host] = record
+
+        return snapshot
+
+
+def close():
+    """Close every pooled session."""
+    with _lock:
+        for session in _sessions.values():
+            session.close()
+
+        _sessions.clear()
+        _limiters.clear()
+        _stats.clear()
@@ -0,0 +1,147 @@
+import base64
+import binascii
+import functools
+from http import HTTPStatus
+
+from flask import current_app, request
+from flask_restx.mask import Mask, MaskError, ParseError
+
+from common import conditional
+from common import config
+from common.marshalling import marshal
+
+
+def encode_cursor(offset: int):
+    return base64.urlsafe_b64encode(str(offset).encode("ascii")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    padded = cursor + "=" * (-len(cursor) % 4)
+
+    try:
+        offset = int(base64.urlsafe_b64decode(padded.encode("ascii")).decode("ascii"))
+    except (binascii.Error, UnicodeError, ValueError):
+        raise ValueError(f"bad cursor {cursor!r}")
+
+    if offset < 0:
+        raise ValueError(f"bad cursor {cursor!r}")
+
+    return offset
+
+
+def _values(record: dict, getter):
+    if callable(getter):
+        value = getter(record)
+    else:
+        value = record
+        for name in getter.split("."):
+            value = value.get(name) if isinstance(value, dict) else None
+
+    if isinstance(value, (list, tuple, set)):
+        return value
+
+    return (value,)
+
+
+def _matches(record: dict, criteria: list):
+    for getter, wanted in criteria:
+        if not any(value is not None and str(value).lower() == wanted for value in _values(record, getter)):
+            return False
+
+    return True
+
+
+def _parse_limit():
+    limit = request.args.get("limit")
+
+    if limit is None:
+        return None
+
+    limit = int(limit)
+    if limit < 1:
+        raise ValueError("limit must be positive")
+
+    return min(limit, config.LIST_MAX_LIMIT)
+
+
+def _parse_mask(model):
+    projection = request.args.get("fields") or request.headers.get(current_app.config["RESTX_MASK_HEADER"])
+
+    if not projection:
+        return None
+
+    mask = Mask(projection)
+    unknown = sorted(set(mask) - set(model))
+    if unknown:
+        raise ValueError(f"unknown fields {', '.join(unknown)}")
+
+    return mask
+
+
+def select(records: list, criteria: list, offset: int, limit: int = None):
+    """The page of the records matching every (getter, value) criterion, and the matching count."""
+    if criteria:
+        records = [record for record in records if _matches(record, criteria)]
+
+    end = len(records) if limit is None else offset + limit
+
+    return records[offset:end], len(records)
+
+
+def marshal_list_with(ns, model, filters: dict = None):
+    """ns.marshal_list_with(model), with pagination, filters and a field projection.
+
+    The decorated method returns the whole (cached) list; only the
+    requested page of the matching records is marshalled.
+
+    - limit and cursor page through the records; when more remain, the
+      X-Next-Cursor header holds the cursor of the next page.
+    - filters maps a query argument to the record key (dotted for nested
+      records) or function whose value it must equal, ignoring case.
+    - fields (or the X-Fields header) lists the fields to return, e.g.
+      fields=name,state or fields=firstName,team{shortname}.
+
+    X-Total-Count is the number of matching records.
+    """
+    filters = filters or {}
+
+    params = {
+        "limit": {"description": f"The number of records to return (at most {config.LIST_MAX_LIMIT})", "type": "int"},
+        "cursor": {"description": "The X-Next-Cursor of the previous page"},
+        "fields": {"description": "A comma separated list of the fields to return"},
+    }
+    for name in filters:
+        params[name] = {"description": f"Only the records with this {name}"}
+
+    def decorator(func):
+        documented = ns.marshal_list_with(model)(func)
+
+        @functools.wraps(documented)
+        def wrapper(resource, *args, **kwargs):
+            try:
+                limit = _parse_limit()
+                offset = decode_cursor(request.args["cursor"]) if request.args.get("cursor") else 0
+                mask = _parse_mask(model)
+            except (ValueError, MaskError, ParseError) as err:
+                return ns.abort(HTTPStatus.BAD_REQUEST.value, f"Invalid list query: {err}")
+
+            criteria = [
+                (getter, request.args[name].lower()) for name, getter in filters.items() if request.args.get(name)
+            ]
+
+            records = func(resource, *args, **kwargs)
+            page, total = select(records, criteria, offset, limit)
+
+            not_modified = conditional.not_modified()
+            if not_modified is not None:
+                return not_modified
+
+            headers = {"X-Total-Count": str(total)}
+            if offset + len(page) < total:
+                headers["X-Next-Cursor"] = encode_cursor(offset + len(page))
+
+            return marshal(page, model, mask=mask), HTTPStatus.OK.value, headers
+
+        return ns.doc(params=params)(wrapper)
+
+    return decorator
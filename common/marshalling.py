@@ -0,0 +1,205 @@
+import functools
+import threading
+from http import HTTPStatus
+
+import flask_restx
+from flask import current_app, has_app_context, request
+from flask_restx import fields
+from flask_restx.model import Model
+from flask_restx.utils import unpack
+
+from common import conditional
+from common.records import Record
+
+# The field types whose formatting is a plain conversion of the value.
+_CONVERSIONS = {
+    fields.String: "str",
+    fields.Integer: "int",
+    fields.Float: "float",
+    fields.Boolean: "bool",
+    fields.Raw: "",
+}
+
+_compiled = {}
+_compiled_lock = threading.Lock()
+
+
+class Unsupported(Exception):
+    """A model, or a value, the compiled serializer does not handle the way marshal() would."""
+
+
+def _list(serialize, values):
+    if type(values) is not list and type(values) is not tuple:
+        raise Unsupported()
+
+    return [serialize(value) for value in values]
+
+
+class _Compiler:
+    """Generates one function per model that builds exactly what marshal() returns for a dict or a Record."""
+
+    def __init__(self):
+        self.namespace = {"_EMPTY": {}, "_Record": Record, "_Unsupported": Unsupported, "_list": _list}
+        self.sources = []
+        self.names = {}
+
+    def constant(self, value):
+        name = f"_c{len(self.namespace)}"
+        self.namespace[name] = value
+        return name
+
+    def model(self, model):
+        if id(model) in self.names:
+            return self.names[id(model)]
+
+        name = f"_m{len(self.names)}"
+        self.names[id(model)] = name
+
+        lines = [
+            f"def {name}(obj):",
+            "    if obj is None:",
+            "        obj = _EMPTY",
+            "    elif type(obj) is not dict and not isinstance(obj, _Record):",
+            "        raise _Unsupported()",
+            "    get = obj.get",
+        ]
+        values = []
+
+        for index, (key, field) in enumerate(model.items()):
+            if not isinstance(key, str) or "." in key or hasattr(dict, key):
+                raise Unsupported()
+
+            lines.append(f"    _{index} = get({key!r})")
+            values.append(f"{key!r}: {self.field(key, field, f'_{index}')}")
+
+        lines.append("    return {" + ", ".join(values) + "}")
+        self.sources.append("\n".join(lines))
+
+        return name
+
+    def nested(self, field):
+        if field.skip_none or field.allow_null or field.default is not None or getattr(field, "as_list", False):
+            raise Unsupported()
+
+        nested = field.nested
+        if not isinstance(nested, dict) or getattr(nested, "__parent__", None):
+            raise Unsupported()
+
+        return self.model(nested)
+
+    def field(self, key, field, value):
+        if isinstance(field, type):
+            field = field()
+
+        if field.attribute is not None or callable(field.default) or getattr(field, "mask", None):
+            raise Unsupported()
+
+        if type(field) is fields.Nested:
+            return f"{self.nested(field)}({value})"
+
+        if type(field) is fields.List:
+            if type(field.container) is not fields.Nested:
+                raise Unsupported()
+
+            serialize = self.nested(field.container)
+            return f"({self.constant(field.output(key, {}))} if {value} is None else _list({serialize}, {value}))"
+
+        conversion = _CONVERSIONS.get(type(field))
+        if conversion is None:
+            raise Unsupported()
+
+        # What the field outputs for a missing value, e.g. 0 for an Integer.
+        missing = self.constant(field.output(key, {}))
+
+        return f"({missing} if {value} is None else {conversion}({value}))"
+
+    def compile(self, model):
+        name = self.model(model)
+        exec("\n\n".join(self.sources), self.namespace)
+
+        return self.namespace[name]
+
+
+def compile_model(model):
+    """Return a function that serializes a dict or Record as marshal(record, model) would, or None.
+
+    The function is generated once per model; None means the model uses
+    a feature (an attribute, a custom field, a mask, ...) that only
+    marshal() handles.
+    """
+    with _compiled_lock:
+        if id(model) in _compiled:
+            return _compiled[id(model)][1]
+
+    try:
+        serialize = _Compiler().compile(model)
+    except Unsupported:
+        serialize = None
+
+    with _compiled_lock:
+        # Keep the model alive so its id is not reused by another one.
+        _compiled[id(model)] = (model, serialize)
+
+    return serialize
+
+
+def marshal(data, model, envelope=None, skip_none=False, mask=None, ordered=False):
+    """flask_restx.marshal, through the compiled serializer of the model when it can be used."""
+    serialize = None
+    if isinstance(model, Model) and not (envelope or skip_none or mask or ordered):
+        serialize = compile_model(model)
+
+    if serialize is not None:
+        try:
+            if isinstance(data, (list, tuple)):
+                return [serialize(record) for record in data]
+
+            return serialize(data)
+        except (Unsupported, ValueError, TypeError):
+            # Let marshal() report (or handle) the value the way it always has.
+            pass
+
+    return flask_restx.marshal(data, model, envelope, skip_none, mask, ordered)
+
+
+class marshal_with(flask_restx.marshal_with):
+    """flask_restx.marshal_with using the compiled serializers.
+
+    An unchanged response (see common.conditional) is answered with a 304
+    before it is serialized.
+    """
+
+    def __call__(self, f):
+        @functools.wraps(f)
+        def wrapper(*args, **kwargs):
+            resp = f(*args, **kwargs)
+
+            not_modified = conditional.not_modified()
+            if not_modified is not None:
+                return not_modified
+
+            mask = self.mask
+            if has_app_context():
+                mask = request.headers.get(current_app.config["RESTX_MASK_HEADER"]) or mask
+
+            if isinstance(resp, tuple):
+                data, code, headers = unpack(resp)
+                return marshal(data, self.fields, self.envelope, self.skip_none, mask, self.ordered), code, headers
+
+            return marshal(resp, self.fields, self.envelope, self.skip_none, mask, self.ordered)
+
+        return wrapper
+
+
+class Namespace(flask_restx.Namespace):
+    """A flask_restx.Namespace whose marshal_with and marshal_list_with use the compiled serializers."""
+
+    def marshal_with(self, fields, as_list=False, code=HTTPStatus.OK, description=None, **kwargs):
+        documented = super().marshal_with(fields, as_list, code, description, **kwargs)
+
+        def wrapper(func):
+            # The parent documents the response model on func; only the marshalling differs.
+            documented(func)
+            return marshal_with(fields, ordered=self.ordered, **kwargs)(func)
+
+        return wrapper
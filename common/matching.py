@@ -0,0 +1,104 @@
+import re
+import unicodedata
+
+# Words that do not tell one club from another ("Tennessee SC" is "Tennessee Soccer Club").
+NOISE_WORDS = frozenset((
+    "academy", "and", "association", "club", "fc", "football", "futbol", "sa", "sc", "soccer", "the", "youth",
+))
+
+# A parenthesized suffix such as the state in "Internationals SC (OH)".
+PARENTHESES = re.compile(r"\([^)]*\)")
+
+WORD = re.compile(r"[a-z0-9]+")
+
+
+def club_key(club_name: str):
+    """The club name reduced to what tells clubs apart.
+
+    Accents, case, punctuation, spacing, parenthesized suffixes and noise
+    words are dropped and the remaining words joined, so "So Cal Blues SC"
+    and "SoCal Blues" have the same key.  A name made only of noise words
+    keeps them.
+    """
+    if club_name is None:
+        return ""
+
+    name = unicodedata.normalize("NFKD", club_name).encode("ascii", "ignore").decode("ascii").lower()
+    words = WORD.findall(PARENTHESES.sub(" ", name.replace("&", " and ")))
+    kept = [word for word in words if word not in NOISE_WORDS]
+
+    return "".join(kept or words)
+
+
+def get_trigrams(key: str):
+    padded = f"${key}$"
+
+    return {padded[start:start + 3] for start in range(max(1, len(padded) - 2))}
+
+
+class NgramIndex:
+    """Club names indexed by the trigrams of their club_key, for fuzzy lookups.
+
+    A lookup first tries the exact key, then scores every indexed name
+    sharing a trigram with it by the Dice coefficient of the two trigram
+    sets: 1.0 for the same key, 0 for nothing in common.  Only the names
+    sharing a trigram are looked at, so a lookup takes microseconds.
+
+    Names are added in order of precedence: a name whose key is already
+    indexed is ignored, and on equal scores the earlier name wins.
+    """
+
+    def __init__(self):
+        self._values = []
+        self._sizes = []
+        self._keys = {}
+        self._postings = {}
+
+    def __len__(self):
+        return len(self._values)
+
+    def add(self, club_name: str, value):
+        key = club_key(club_name)
+
+        if not key or key in self._keys:
+            return
+
+        entry = len(self._values)
+        trigrams = get_trigrams(key)
+
+        self._keys[key] = entry
+        self._values.append(value)
+        self._sizes.append(len(trigrams))
+
+        for trigram in trigrams:
+            self._postings.setdefault(trigram, []).append(entry)
+
+    def search(self, club_name: str):
+        """The value of the closest name and its score, or (None, 0.0) when nothing is alike."""
+        key = club_key(club_name)
+
+        if not key:
+            return None, 0.0
+
+        entry = self._keys.get(key)
+        if entry is not None:
+            return self._values[entry], 1.0
+
+        trigrams = get_trigrams(key)
+
+        shared = {}
+        for trigram in trigrams:
+            for entry in self._postings.get(trigram, ()):
+                shared[entry] = shared.get(entry, 0) + 1
+
+        best, best_score = None, 0.0
+        for entry, count in shared.items():
+            score = 2 * count / (len(trigrams) + self._sizes[entry])
+
+            if score > best_score or (score == best_score and entry < best):
+                best, best_score = entry, score
+
+        if best is None:
+            return None, 0.0
+
+        return self._values[best], best_score
@@ -0,0 +1,326 @@
+import contextlib
+import functools
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+from flask import g, has_request_context
+
+from common import config
+from common.extensions import cache as default_cache
+
+# Keys with a background refresh running in this process.
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+
+# The computation in flight for each key in this process, as a Future that
+# every concurrent caller of the same key waits on.
+_flights = {}
+_flights_lock = threading.Lock()
+
+# Lookups of every memoized function in this process, by qualified name.
+_stats = {}
+_stats_lock = threading.Lock()
+
+# While set, entries older than their timeout minus this horizon are
+# recomputed in the calling thread.  A refresh thread sets it to 0 so that
+# the memoized functions it calls do not feed it stale data.
+_local = threading.local()
+
+
+def _now():
+    return time.time()
+
+
+@contextlib.contextmanager
+def refreshing(horizon: float = 0):
+    """Recompute, in this thread, entries that are stale or will be within horizon seconds."""
+    previous = getattr(_local, "horizon", None)
+    _local.horizon = horizon
+    try:
+        yield
+    finally:
+        _local.horizon = previous
+
+
+def get_horizon():
+    """The horizon of the refreshing() this thread runs under, or None outside of one."""
+    return getattr(_local, "horizon", None)
+
+
+@contextlib.contextmanager
+def _holding(store, lease: str, value, timeout: float):
+    """Renew a lease every third of its timeout until the block ends, however long it runs."""
+    done = threading.Event()
+
+    def renew():
+        while not done.wait(timeout / 3):
+            try:
+                store.set(lease, value, timeout=timeout)
+            except Exception as err:
+                print(f"Unable to renew the lease {lease}: {err}")
+
+    thread = threading.Thread(target=renew, name="memo-lease", daemon=True)
+    thread.start()
+
+    try:
+        yield
+    finally:
+        done.set()
+        thread.join()
+
+
+def make_key(func, args: tuple, kwargs: dict):
+    name = f"{func.__module__}.{func.__qualname__}"
+    arguments = repr((args, sorted(kwargs.items())))
+
+    return "memo:" + name + ":" + hashlib.md5(arguments.encode("utf-8")).hexdigest()
+
+
+def _count(name: str, outcome: str):
+    with _stats_lock:
+        counters = _stats.get(name)
+        if counters is None:
+            counters = _stats[name] = {"hits": 0, "stale": 0, "misses": 0}
+
+        counters[outcome] += 1
+
+
+def get_stats():
+    """Return the lookups of every memoized function in this process, by qualified name.
+
+    "hits" were served fresh from the cache, "stale" from an expired entry
+    while it was refreshed and "misses" waited for the function.  "ratio"
+    is the share of lookups answered from the cache.
+    """
+    with _stats_lock:
+        snapshot = {}
+
+        for name, counters in _stats.items():
+            lookups = sum(counters.values())
+            snapshot[name] = dict(
+                counters, lookups=lookups, ratio=round((counters["hits"] + counters["stale"]) / lookups, 3)
+            )
+
+        return snapshot
+
+
+def note_entry(key: str, created: float, timeout: float):
+    """Record a cached value used to build the current response: its key, creation time and timeout."""
+    if not has_request_context():
+        return
+
+    g.setdefault("cache_entries", []).append((key, created, timeout))
+    g.cache_age = max(_now() - created, g.get("cache_age", 0))
+
+
+def add_age_header(response):
+    """after_request hook that reports the oldest cached value in the Age header."""
+    age = g.get("cache_age")
+
+    if age is not None and "Age" not in response.headers:
+        response.headers["Age"] = str(int(age))
+
+    return response
+
+
+def iterate(memoized, load, *args, **kwargs):
+    """Yields the records of memoized(*args, **kwargs) without waiting for all of them.
+
+    A cached list is replayed.  Otherwise the records come from the
+    generator returned by load(*args, **kwargs), and the complete list is
+    cached once the last one has been yielded.
+    """
+    records = memoized.peek(*args, **kwargs)
+
+    if records is not None:
+        yield from records
+        return
+
+    records = []
+    for record in load(*args, **kwargs):
+        records.append(record)
+        yield record
+
+    memoized.put(records, *args, **kwargs)
+
+
+def memoize(timeout: int, max_stale: int = None, cache=None, key=None):
+    """Memoize a scrape, serving expired values while they are refreshed.
+
+    A value younger than timeout is fresh.  Once it is older, it is still
+    returned immediately for up to max_stale more seconds while a single
+    background thread recomputes it; only a missing (or too stale) value
+    makes the caller wait for the function.
+
+    Concurrent callers waiting for the same key share one computation: in
+    this process they wait on its result (or exception), and other workers
+    sharing the cache wait for its lease to produce the entry.
+
+    With key, entries are keyed on key(*args, **kwargs) instead of the
+    arguments, so calls naming the same record differently ("Female" and
+    "women", a club spelled two ways, ...) share one entry.  It must return
+    the same value only for calls the function answers alike.
+    """
+    if max_stale is None:
+        max_stale = config.MEMO_MAX_STALE
+
+    def decorator(func):
+        name = f"{func.__module__}.{func.__qualname__}"
+
+        def get_key(args, kwargs):
+            if key is None:
+                return make_key(func, args, kwargs)
+
+            return make_key(func, (key(*args, **kwargs),), {})
+
+        def get_cache():
+            return (cache or default_cache).cache
+
+        def compute(key, args, kwargs):
+            entry = {"value": func(*args, **kwargs), "created": _now()}
+            get_cache().set(key, entry, timeout=timeout + max_stale)
+            return entry
+
+        def wait_for_worker(key, lease, previous):
+            # Another worker holds the lease; wait for its entry or for the lease to go.
+            while True:
+                time.sleep(config.MEMO_FLIGHT_POLL)
+
+                entry = get_cache().get(key)
+                if entry is not None and (previous is None or entry["created"] > previous["created"]):
+                    return entry
+
+                if get_cache().get(lease) is None:
+                    return None
+
+        def compute_shared(key, args, kwargs, previous):
+            lease = key + ":flight"
+
+            while True:
+                if get_cache().add(lease, os.getpid(), timeout=config.MEMO_FLIGHT_LEASE):
+                    try:
+                        # A crawl may outlast the lease; the waiting workers must not start another.
+                        with _holding(get_cache(), lease, os.getpid(), config.MEMO_FLIGHT_LEASE):
+                            return compute(key, args, kwargs)
+                    finally:
+                        get_cache().delete(lease)
+
+                entry = wait_for_worker(key, lease, previous)
+                if entry is not None:
+                    return entry
+
+        def compute_once(key, args, kwargs, previous=None):
+            with _flights_lock:
+                flight = _flights.get(key)
+                leader = flight is None
+
+                if leader:
+                    flight = Future()
+                    _flights[key] = flight
+
+            if not leader:
+                return flight.result()
+
+            try:
+                entry = compute_shared(key, args, kwargs, previous)
+            except BaseException as err:
+                flight.set_exception(err)
+                raise
+            else:
+                flight.set_result(entry)
+                return entry
+            finally:
+                with _flights_lock:
+                    _flights.pop(key, None)
+
+        def refresh(key, args, kwargs):
+            # One refresh per process, and one across workers sharing the cache.
+            with _refreshing_lock:
+                if key in _refreshing:
+                    return
+
+                _refreshing.add(key)
+
+            if not get_cache().add(key + ":refresh", True, timeout=config.MEMO_REFRESH_LEASE):
+                with _refreshing_lock:
+                    _refreshing.discard(key)
+                return
+
+            def run():
+                try:
+                    with _holding(get_cache(), key + ":refresh", True, config.MEMO_REFRESH_LEASE), refreshing():
+                        compute(key, args, kwargs)
+                except Exception as err:
+                    print(f"Unable to refresh {func.__qualname__}: {err}")
+                finally:
+                    get_cache().delete(key + ":refresh")
+                    with _refreshing_lock:
+                        _refreshing.discard(key)
+
+            thread = threading.Thread(target=run, name=f"refresh-{func.__qualname__}", daemon=True)
+            thread.start()
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = get_key(args, kwargs)
+            entry = get_cache().get(key)
+
+            if entry is None:
+                _count(name, "misses")
+                entry = compute_once(key, args, kwargs)
+            else:
+                age = _now() - entry["created"]
+                horizon = getattr(_local, "horizon", None)
+
+                if age > timeout + max_stale or (horizon is not None and age > timeout - horizon):
+                    _count(name, "misses")
+                    entry = compute_once(key, args, kwargs, entry)
+                elif age > timeout:
+                    _count(name, "stale")
+                    refresh(key, args, kwargs)
+                else:
+                    _count(name, "hits")
+
+            note_entry(key, entry["created"], timeout)
+            return entry["value"]
+
+        def peek(*args, **kwargs):
+            """Return the value if it can be served from the cache, without computing it."""
+            key = get_key(args, kwargs)
+            entry = get_cache().get(key)
+
+            if entry is None:
+                _count(name, "misses")
+                return None
+
+            age = _now() - entry["created"]
+
+            if age > timeout + max_stale:
+                _count(name, "misses")
+                return None
+
+            if age > timeout:
+                _count(name, "stale")
+                refresh(key, args, kwargs)
+            else:
+                _count(name, "hits")
+
+            note_entry(key, entry["created"], timeout)
+            return entry["value"]
+
+        def put(value, *args, **kwargs):
+            """Store a value computed outside of the wrapper, e.g. by a streaming variant."""
+            key = get_key(args, kwargs)
+            get_cache().set(key, {"value": value, "created": _now()}, timeout=timeout + max_stale)
+
+        wrapper.make_key = lambda *args, **kwargs: get_key(args, kwargs)
+        wrapper.peek = peek
+        wrapper.put = put
+        wrapper.uncached = func
+
+        return wrapper
+
+    return decorator
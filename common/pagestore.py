@@ -0,0 +1,263 @@
+import hashlib
+import json
+import mmap
+import os
+import threading
+import time
+import zlib
+
+from requests.structures import CaseInsensitiveDict
+
+from common import config
+
+_lock = threading.Lock()
+_stores = {}
+
+
+class StoredPage:
+    """A stored upstream response, usable wherever a parser expects a requests.Response."""
+
+    status_code = 200
+    ok = True
+
+    def __init__(self, url: str, content: bytes, headers: dict, fetched: float):
+        self.url = url
+        self.content = content
+        self.headers = CaseInsensitiveDict(headers)
+        self.fetched = fetched
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        pass
+
+
+class PageStore:
+    """Compressed upstream responses on disk, addressed by their SHA-256.
+
+    Identical bodies are stored once under objects/, and urls/ maps every
+    url to the digest of its latest body along with the headers needed to
+    revalidate and parse it.  Bodies are read through a memory map.
+
+    The store is pruned in a background thread every PRUNE_INTERVAL seconds
+    or once a tenth of max_bytes has been written since the last time (see
+    prune()).
+    """
+
+    HEADERS = ("Content-Type", "ETag", "Last-Modified")
+
+    # The most seconds between two prunes of a store being written to.
+    PRUNE_INTERVAL = 3600
+
+    # Bodies no url refers to are only removed once they are this old, so
+    # one being stored while the store is pruned is kept.
+    ORPHAN_GRACE = 300
+
+    def __init__(self, root: str, max_bytes: int = None, max_age: int = None):
+        self.root = root
+        self.max_bytes = config.PAGE_STORE_MAX_BYTES if max_bytes is None else max_bytes
+        self.max_age = config.PAGE_STORE_MAX_AGE if max_age is None else max_age
+
+        self._lock = threading.Lock()
+        self._pruning = False
+        self._pruned_at = time.time()
+        self._written = 0
+
+        os.makedirs(os.path.join(root, "objects"), exist_ok=True)
+        os.makedirs(os.path.join(root, "urls"), exist_ok=True)
+
+    def _object_path(self, digest: str):
+        return os.path.join(self.root, "objects", digest[:2], digest[2:])
+
+    def _record_path(self, url: str):
+        return os.path.join(self.root, "urls", hashlib.sha1(url.encode("utf-8")).hexdigest() + ".json")
+
+    def _write(self, path: str, data: bytes):
+        temporary_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+        with open(temporary_path, "wb") as f:
+            f.write(data)
+
+        os.replace(temporary_path, path)
+
+    def put(self, url: str, content: bytes, headers: dict = None):
+        """Store the body of url and return its digest."""
+        digest = hashlib.sha256(content).hexdigest()
+        path = self._object_path(digest)
+
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            compressed = zlib.compress(content, config.PAGE_STORE_COMPRESSION)
+            self._write(path, compressed)
+            self._note_written(len(compressed))
+
+        headers = CaseInsensitiveDict(headers or {})
+        record = {
+            "url": url,
+            "digest": digest,
+            "size": len(content),
+            "fetched": time.time(),
+            "headers": {name: headers[name] for name in self.HEADERS if name in headers},
+        }
+        self._write(self._record_path(url), json.dumps(record).encode("utf-8"))
+
+        return digest
+
+    def read(self, digest: str):
+        """Return the body with the given digest."""
+        with open(self._object_path(digest), "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return zlib.decompress(mapped)
+
+    def get_record(self, url: str):
+        try:
+            with open(self._record_path(url)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def get(self, url: str):
+        """Return the latest stored response for url, or None."""
+        record = self.get_record(url)
+
+        if record is None:
+            return None
+
+        try:
+            content = self.read(record["digest"])
+        except (OSError, zlib.error):
+            return None
+
+        return StoredPage(url, content, record["headers"], record["fetched"])
+
+    def _iter_records(self):
+        directory = os.path.join(self.root, "urls")
+
+        for name in sorted(os.listdir(directory)):
+            if not name.endswith(".json"):
+                continue
+
+            path = os.path.join(directory, name)
+            try:
+                with open(path) as f:
+                    yield path, json.load(f)
+            except (OSError, ValueError):
+                continue
+
+    def records(self):
+        """Iterate over the records of every stored url."""
+        for _, record in self._iter_records():
+            yield record
+
+    def _note_written(self, size: int):
+        with self._lock:
+            self._written += size
+
+            due = time.time() - self._pruned_at > self.PRUNE_INTERVAL
+            if self.max_bytes and self._written > self.max_bytes // 10:
+                due = True
+
+            if not due or self._pruning:
+                return
+
+            self._pruning = True
+
+        def run():
+            try:
+                self.prune()
+            except OSError as err:
+                print(f"Unable to prune the page store {self.root}: {err}")
+            finally:
+                with self._lock:
+                    self._pruning = False
+
+        thread = threading.Thread(target=run, name="pagestore-prune", daemon=True)
+        thread.start()
+
+    def _remove(self, path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def prune(self):
+        """Drop the urls fetched more than max_age seconds ago, then the oldest until the bodies fit in max_bytes.
+
+        Bodies no remaining url refers to are removed with them.  A zero
+        max_age or max_bytes is no limit.  Returns the number of urls dropped.
+        """
+        now = time.time()
+
+        with self._lock:
+            self._pruned_at = now
+            self._written = 0
+
+        # Oldest first, with the size on disk of every body.
+        records = sorted(self._iter_records(), key=lambda item: item[1].get("fetched", 0))
+        references = {}
+        for _, record in records:
+            references[record["digest"]] = references.get(record["digest"], 0) + 1
+
+        sizes = {}
+        for digest in references:
+            try:
+                sizes[digest] = os.path.getsize(self._object_path(digest))
+            except OSError:
+                sizes[digest] = 0
+
+        total = sum(sizes.values())
+        dropped = 0
+
+        for path, record in records:
+            expired = self.max_age and now - record.get("fetched", 0) > self.max_age
+            if not expired and (not self.max_bytes or total <= self.max_bytes):
+                break
+
+            self._remove(path)
+            dropped += 1
+
+            digest = record["digest"]
+            references[digest] -= 1
+            if references[digest] == 0:
+                del references[digest]
+                self._remove(self._object_path(digest))
+                total -= sizes[digest]
+
+        # Bodies left behind when a url's body changed.
+        objects = os.path.join(self.root, "objects")
+        for directory, _, names in os.walk(objects):
+            for name in names:
+                path = os.path.join(directory, name)
+                digest = os.path.basename(directory) + name
+
+                if digest in references:
+                    continue
+
+                try:
+                    if now - os.path.getmtime(path) > self.ORPHAN_GRACE:
+                        os.remove(path)
+                except OSError:
+                    continue
+
+        return dropped
+
+
+def get_store():
+    """Return the configured page store, or None when it is disabled."""
+    root = config.PAGE_STORE_DIR
+
+    if not root:
+        return None
+
+    with _lock:
+        store = _stores.get(root)
+        if store is None:
+            store = PageStore(root)
+            _stores[root] = store
+
+    return store
@@ -0,0 +1,51 @@
+import importlib.util
+
+from bs4 import BeautifulSoup
+
+from common import config
+
+
+def get_parser_name():
+    """Returns the BeautifulSoup tree builder selected by config.HTML_PARSER.
+
+    "auto" picks lxml when it is installed and falls back to the standard
+    library's html.parser otherwise.
+    """
+    parser = config.HTML_PARSER
+
+    if parser == "auto":
+        if importlib.util.find_spec("lxml") is not None:
+            return "lxml"
+
+        return "html.parser"
+
+    return parser
+
+
+def has_class(*class_names):
+    """Returns a SoupStrainer matcher for elements with any of the given classes.
+
+    While a page is being parsed the class attribute is still a single string,
+    so class_="table-striped" alone would not match class="table table-striped".
+    """
+    wanted = set(class_names)
+
+    def match(value):
+        if value is None:
+            return False
+
+        if isinstance(value, str):
+            value = value.split()
+
+        return not wanted.isdisjoint(value)
+
+    return match
+
+
+def parse(content, parse_only=None):
+    """Parse an upstream page.
+
+    Pass a SoupStrainer as parse_only to build the tree for just the
+    elements a scraper reads instead of the whole page.
+    """
+    return BeautifulSoup(content, get_parser_name(), parse_only=parse_only)
@@ -0,0 +1,139 @@
+import email.utils
+import threading
+import time
+
+from common import config
+
+
+def parse_retry_after(value: str):
+    """Returns the seconds to wait from a Retry-After header, or None."""
+    if not value:
+        return None
+
+    value = value.strip()
+
+    if value.isdigit():
+        return float(value)
+
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    if retry_at is None:
+        return None
+
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class HostLimiter:
+    """A token bucket and an adaptive concurrency limit for one upstream host.
+
+    Requests take a token (refilled at rate per second, up to burst) and a
+    concurrency slot.  Healthy, fast responses raise the rate and, once a
+    full window of them has completed, the concurrency.  A 429, a 5xx or a
+    failed connection halves both, and a Retry-After header pauses the host.
+    """
+
+    def __init__(self, rate: float = None, burst: float = None, max_concurrency: int = None):
+        self.rate = config.FETCH_RATE if rate is None else rate
+        self.burst = config.FETCH_BURST if burst is None else burst
+        self.max_concurrency = config.FETCH_MAX_CONCURRENCY if max_concurrency is None else max_concurrency
+        self.concurrency = self.max_concurrency
+
+        self._tokens = self.burst
+        self._refilled = time.monotonic()
+        self._paused_until = 0.0
+        self._in_flight = 0
+        self._waiting = 0
+        self._healthy = 0
+        self._throttled = 0
+        self._condition = threading.Condition()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled) * self.rate)
+        self._refilled = now
+
+    def _take(self):
+        """Take a token and a slot if both are free.
+
+        Returns (start time, None), or (None, seconds until a token is
+        refilled or the pause ends) and (None, None) while every slot is busy.
+        """
+        now = time.monotonic()
+        self._refill(now)
+
+        if now < self._paused_until:
+            return None, self._paused_until - now
+
+        if self._in_flight >= self.concurrency:
+            return None, None
+
+        if self._tokens >= 1:
+            self._tokens -= 1
+            self._in_flight += 1
+            return now, None
+
+        return None, (1 - self._tokens) / self.rate
+
+    def acquire(self):
+        """Wait for a token and a free slot; returns the start time to pass to release()."""
+        with self._condition:
+            self._waiting += 1
+            try:
+                while True:
+                    started, timeout = self._take()
+                    if started is not None:
+                        return started
+
+                    self._condition.wait(timeout)
+            finally:
+                self._waiting -= 1
+
+    def try_acquire(self):
+        """Like acquire, without waiting: (start time, None) or (None, seconds to wait) as _take returns them."""
+        with self._condition:
+            return self._take()
+
+    def release(self, started: float, status_code: int = None, retry_after: str = None):
+        """Free the slot and adapt to how the request went; status_code is None when it failed."""
+        now = time.monotonic()
+        elapsed = now - started
+
+        with self._condition:
+            self._in_flight -= 1
+
+            if status_code is None or status_code == 429 or status_code >= 500:
+                self._throttled += 1
+                self._healthy = 0
+                self.rate = max(config.FETCH_MIN_RATE, self.rate / 2)
+                self.concurrency = max(1, self.concurrency // 2)
+
+                pause = parse_retry_after(retry_after)
+                if pause:
+                    self._paused_until = max(self._paused_until, now + min(pause, config.FETCH_MAX_PAUSE))
+                    self._tokens = 0
+            elif elapsed > config.FETCH_TARGET_LATENCY:
+                # Slow answers are the first sign of an overloaded upstream.
+                self._healthy = 0
+                self.rate = max(config.FETCH_MIN_RATE, self.rate * 0.9)
+            else:
+                self.rate = min(config.FETCH_MAX_RATE, self.rate + config.FETCH_RATE_STEP)
+
+                self._healthy += 1
+                if self._healthy >= self.concurrency:
+                    self._healthy = 0
+                    self.concurrency = min(self.max_concurrency, self.concurrency + 1)
+
+            self._condition.notify_all()
+
+    def get_stats(self):
+        with self._condition:
+            return {
+                "rate": round(self.rate, 3),
+                "concurrency": self.concurrency,
+                "in_flight": self._in_flight,
+                "queue": self._waiting,
+                "throttled": self._throttled,
+                "paused": round(max(0.0, self._paused_until - time.monotonic()), 3),
+            }
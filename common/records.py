@@ -0,0 +1,97 @@
+import sys
+
+
+class Record:
+    """A scraped record kept in slots instead of a dict.
+
+    Subclasses list their fields in __slots__.  Records read and update
+    like the dicts they replace (record["name"], record.get("url"),
+    "url" in record, record["league"] = ...), where an unset field is a
+    missing key, so parsers and resources handle both alike.
+
+    The fields in INTERNED repeat across records (positions, states,
+    leagues, ...) and share one string per value, also once a record is
+    read back from the cache.
+    """
+
+    __slots__ = ()
+
+    INTERNED = ()
+
+    def __init__(self, **values):
+        for name in self.__slots__:
+            setattr(self, name, None)
+
+        for name, value in values.items():
+            self[name] = value
+
+    def __getitem__(self, name):
+        if name not in self.__slots__ or getattr(self, name) is None:
+            raise KeyError(name)
+
+        return getattr(self, name)
+
+    def __setitem__(self, name, value):
+        if name not in self.__slots__:
+            raise KeyError(name)
+
+        if name in self.INTERNED and type(value) is str:
+            value = sys.intern(value)
+
+        setattr(self, name, value)
+
+    def __contains__(self, name):
+        return name in self.__slots__ and getattr(self, name) is not None
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def __eq__(self, other):
+        if isinstance(other, Record):
+            return type(self) is type(other) and self.__getstate__() == other.__getstate__()
+
+        if isinstance(other, dict):
+            return self.to_dict() == {name: value for name, value in other.items() if value is not None}
+
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        values = ", ".join(f"{name}={value!r}" for name, value in self.items())
+        return f"{type(self).__name__}({values})"
+
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            self[name] = value
+
+    def get(self, name, default=None):
+        value = getattr(self, name, None) if name in self.__slots__ else None
+
+        return default if value is None else value
+
+    def keys(self):
+        return [name for name in self.__slots__ if getattr(self, name) is not None]
+
+    def items(self):
+        return [(name, getattr(self, name)) for name in self.keys()]
+
+    def to_dict(self):
+        """The record as the dict it replaces, with nested records converted too."""
+        return {name: _to_plain(value) for name, value in self.items()}
+
+
+def _to_plain(value):
+    if isinstance(value, Record):
+        return value.to_dict()
+
+    if isinstance(value, list):
+        return [_to_plain(item) for item in value]
+
+    return value
@@ -0,0 +1,68 @@
+import functools
+import json
+from http import HTTPStatus
+
+from flask import Response, request, stream_with_context
+from requests.exceptions import HTTPError
+
+from common.marshalling import marshal
+
+NDJSON = "application/x-ndjson"
+
+_END = object()
+
+
+def wants_stream():
+    """True when the client asked for NDJSON, with ?stream=true or an Accept header."""
+    if request.args.get("stream", "").lower() in ("1", "true", "yes"):
+        return True
+
+    return request.accept_mimetypes.best_match(["application/json", NDJSON]) == NDJSON
+
+
+def _lines(first, records, model):
+    record = first
+
+    try:
+        while record is not _END:
+            yield json.dumps(marshal(record, model)) + "\n"
+            record = next(records, _END)
+    except Exception as err:
+        # The status line is long gone; report the failure as the last record.
+        print(f"Streaming stopped: {err}")
+        yield json.dumps({"error": str(err)}) + "\n"
+
+
+def marshal_list_with(ns, model):
+    """ns.marshal_list_with(model), with an opt-in NDJSON stream of the same records.
+
+    When the client asks for NDJSON, the records come from the resource's
+    stream() method (called with the same arguments) and each one is sent
+    as soon as it is produced, instead of after the whole list is built.
+    """
+    def decorator(func):
+        marshalled = ns.marshal_list_with(model)(func)
+
+        @functools.wraps(marshalled)
+        def wrapper(resource, *args, **kwargs):
+            if not wants_stream():
+                return marshalled(resource, *args, **kwargs)
+
+            # Errors before the first record still get a proper status code.
+            try:
+                records = iter(resource.stream(*args, **kwargs))
+                first = next(records, _END)
+            except HTTPError as http_err:
+                return ns.abort(
+                    HTTPStatus.BAD_REQUEST.value, f"HTTP error occurred: {http_err}"
+                )
+            except Exception as err:
+                return ns.abort(
+                    HTTPStatus.BAD_REQUEST.value, f"Other error occurred: {err}"
+                )
+
+            return Response(stream_with_context(_lines(first, records, model)), mimetype=NDJSON)
+
+        return wrapper
+
+    return decorator
@@ -1,3 +1,4 @@
+from . import matching
 from .utils import cache
 
 def get_anchor_text(element):
@@ -33,6 +34,32 @@ def get_anchor_url(element, prefix = None):
     return prefix + url
 
 
+def normalize_club_name(club_name: str):
+    """Returns the club name in the form used for comparisons."""
+    if club_name is None:
+        return ""
+
+    return " ".join(club_name.split()).lower()
+
+
+# The spellings of each gender the scrapers and resources are called with.
+GENDERS = {
+    "female": "female", "f": "female", "w": "female", "women": "female", "womens": "female", "women's": "female",
+    "girls": "female",
+    "male": "male", "m": "male", "men": "male", "mens": "male", "men's": "male", "boys": "male",
+}
+
+
+def canonical_gender(gender: str):
+    """Returns "female" or "male" for any spelling of the gender, or the stripped lowercase value otherwise."""
+    if gender is None:
+        return None
+
+    gender = gender.strip().lower()
+
+    return GENDERS.get(gender, gender)
+
+
 def is_member_club(target_club_name: str, clubs: list):
     if target_club_name is None:
         return False
@@ -40,13 +67,13 @@ def is_member_club(target_club_name: str, clubs: list):
     if clubs is None:
         return False
 
-    temp = target_club_name.strip().lower()
+    temp = matching.club_key(target_club_name)
 
     if len(temp) == 0:
         return False
 
     for club in clubs:
-        current_club_name = club["name"].strip().lower()
+        current_club_name = matching.club_key(club["name"])
 
         if current_club_name == temp:
             return True
@@ -1,11 +1,11 @@
 import pprint
-import requests
-
-from bs4 import BeautifulSoup
 
 from common import config
+from common import fetch
+from common import parsing
 from common.extensions import cache
 
+import lib.clubs as club_registry
 import lib.topdrawer as topdrawer
 
 def get_conference_name_from_cell(cell):
@@ -58,45 +58,13 @@ def get_clubs_from_cell(cell):
 class ClubSearch:
     def __init__(self):
         """Constructor"""
-        self.ga_clubs = None
-        self.ecnl_clubs = None
 
-    # @cache.cached(timeout=604800)
     def get_ga_clubs(self):
-        return config.GA_CLUBS
+        return club_registry.get_ga_clubs()
 
-    @cache.cached(timeout=604800)
     def get_ecnl_clubs(self):
-        if self.ecnl_clubs is not None:
-            return self.ecnl_clubs
-
-        url = "https://public.totalglobalsports.com/api/Event/get-org-club-list-by-orgID/9"
-
-        response = requests.get(url)
-
-        response.raise_for_status()
-
-        json_response = response.json()
-
-        clubs = []
-
-        for item in json_response["data"]:
-            club = {}
-
-            club["id"] = item["clubID"]
-            club["orgId"] = item["orgID"]
-            club["name"] = item["clubFullName"].strip()
-            club["city"] = item["city"].strip()
-            club["state"] = item["stateCode"].strip()
-            club["logo"] = item["clubLogo"].strip()
-
-            club["name"] = club["name"].replace("  ", " ")
-
-            clubs.append(club)
-
-        self.ecnl_clubs = clubs
+        return club_registry.get_ecnl_clubs()
 
-        return clubs
 
 class TopDrawerSoccer:
     def __init__(self):
@@ -121,13 +89,13 @@ class TopDrawerSoccer:
         if division in config.DIVISION_MAPPING:
             suffix = config.DIVISION_MAPPING[division]
 
-        response = requests.get(url + suffix)
+        response = fetch.get(url + suffix)
 
         response.raise_for_status()
 
         conferences = []
 
-        soup = BeautifulSoup(response.content, "html.parser")
+        soup = parsing.parse(response.content, topdrawer.CONFERENCES_STRAINER)
 
         column_elements = soup.find_all("div", class_="col-lg-6")
 
@@ -0,0 +1,287 @@
+import re
+import threading
+from array import array
+
+from common import tools
+
+# The dimensions of a commitment, in the order of their columns.
+DIMENSIONS = ("gender", "division", "conference", "year", "school", "club", "league", "state", "position")
+
+# Dimensions with thousands of values keep a list of rows per value instead
+# of a bitmap, which would take a bit for every row of the table.
+SPARSE_DIMENSIONS = ("school", "club")
+
+
+def _popcount(bits: int):
+    return bin(bits).count("1")
+
+
+def _row_ids(bits: int):
+    """The positions of the set bits, lowest first."""
+    return [match.start() for match in re.finditer("1", bin(bits)[:1:-1])]
+
+
+def _bitmap(rows):
+    bits = 0
+    for row in rows:
+        bits |= 1 << row
+
+    return bits
+
+
+class CommitmentTable:
+    """Crawled commitments in columns, indexed on every dimension.
+
+    Each dimension is stored as a column of small integer codes.  Dense
+    dimensions keep a bitmap (a Python int) of the rows of every value and
+    sparse ones a list of rows, so a filter is a few bitwise ANDs and a
+    group-by counts the codes of the matching rows.
+
+    Rows come in partitions, one per crawled conference page (gender,
+    conference and graduation year), which are replaced whenever the page
+    is crawled again.  Replaced rows are dropped from the live rows and the
+    columns are compacted once most rows are dead.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clear()
+
+    def _clear(self):
+        self._values = {dimension: [] for dimension in DIMENSIONS}
+        self._codes = {dimension: {} for dimension in DIMENSIONS}
+        # Lower case value -> codes, for the case insensitive filters.
+        self._folded = {dimension: {} for dimension in DIMENSIONS}
+        self._columns = {dimension: array("l") for dimension in DIMENSIONS}
+        self._index = {dimension: [] for dimension in DIMENSIONS}
+        self._partitions = {}
+        self._size = 0
+        self._live = 0
+
+    def _encode(self, dimension: str, value):
+        codes = self._codes[dimension]
+        code = codes.get(value)
+
+        if code is None:
+            code = len(self._values[dimension])
+            codes[value] = code
+            self._values[dimension].append(value)
+            self._index[dimension].append(array("l") if dimension in SPARSE_DIMENSIONS else 0)
+            self._folded[dimension].setdefault(str(value).lower(), []).append(code)
+
+        return code
+
+    def _append(self, rows: list):
+        """Append the rows and return the bitmap of their positions."""
+        start = self._size
+        local = {dimension: {} for dimension in DIMENSIONS if dimension not in SPARSE_DIMENSIONS}
+
+        for offset, row in enumerate(rows):
+            for dimension in DIMENSIONS:
+                code = self._encode(dimension, row.get(dimension))
+                self._columns[dimension].append(code)
+
+                if dimension in SPARSE_DIMENSIONS:
+                    self._index[dimension][code].append(start + offset)
+                else:
+                    local[dimension][code] = local[dimension].get(code, 0) | 1 << offset
+
+        # Shifting the small per-partition bitmaps once keeps appends linear.
+        for dimension, bitmaps in local.items():
+            for code, bits in bitmaps.items():
+                self._index[dimension][code] |= bits << start
+
+        self._size += len(rows)
+        rows_bits = ((1 << len(rows)) - 1) << start
+        self._live |= rows_bits
+
+        return rows_bits
+
+    def _compact(self):
+        live = _row_ids(self._live)
+        columns = self._columns
+        partitions = self._partitions
+
+        positions = {}
+        for new, old in enumerate(live):
+            positions[old] = new
+
+        rows = [
+            {dimension: self._values[dimension][columns[dimension][old]] for dimension in DIMENSIONS} for old in live
+        ]
+
+        self._clear()
+        self._append(rows)
+
+        # The rows of a partition are appended together, so they stay contiguous.
+        for key, (fingerprint, bits) in partitions.items():
+            rows = _row_ids(bits)
+            start = positions[rows[0]] if rows else 0
+            self._partitions[key] = (fingerprint, ((1 << len(rows)) - 1) << start)
+
+    def replace(self, key: tuple, rows: list, fingerprint=None):
+        """Make rows the rows of the partition key; returns False when the fingerprint is unchanged."""
+        with self._lock:
+            previous = self._partitions.get(key)
+
+            if previous is not None:
+                if fingerprint is not None and previous[0] == fingerprint:
+                    return False
+
+                self._live &= ~previous[1]
+
+            self._partitions[key] = (fingerprint, self._append(rows))
+
+            if self._size > 1024 and _popcount(self._live) < self._size // 2:
+                self._compact()
+
+            return True
+
+    def get_fingerprint(self, key: tuple):
+        with self._lock:
+            partition = self._partitions.get(key)
+
+        return None if partition is None else partition[0]
+
+    def _select(self, filters: dict):
+        bits = self._live
+
+        for dimension, value in filters.items():
+            if dimension not in DIMENSIONS:
+                raise ValueError(f"unknown dimension {dimension}")
+
+            matching = 0
+            for code in self._folded[dimension].get(str(value).lower(), ()):
+                if dimension in SPARSE_DIMENSIONS:
+                    matching |= _bitmap(self._index[dimension][code])
+                else:
+                    matching |= self._index[dimension][code]
+
+            bits &= matching
+
+        return bits
+
+    def _count_bitmaps(self, bits: int, by: tuple, codes: tuple, counts: dict):
+        dimension = by[0]
+
+        for code, value_bits in enumerate(self._index[dimension]):
+            matching = bits & value_bits
+            if not matching:
+                continue
+
+            if len(by) == 1:
+                counts[codes + (code,)] = _popcount(matching)
+            else:
+                self._count_bitmaps(matching, by[1:], codes + (code,), counts)
+
+    def count(self, by=(), **filters):
+        """Count the rows matching every filter, grouped by the dimensions in by.
+
+        Filters compare values without regard to case; a None filter is
+        ignored.  Returns the number of matching rows and a list of
+        (values, count) pairs, values being a dict with a value for each
+        dimension of by, largest groups first.
+        """
+        by = tuple(by)
+        for dimension in by:
+            if dimension not in DIMENSIONS:
+                raise ValueError(f"unknown dimension {dimension}")
+
+        filters = {dimension: value for dimension, value in filters.items() if value is not None}
+
+        with self._lock:
+            bits = self._select(filters)
+            total = _popcount(bits)
+
+            if not by or not bits:
+                return total, ([({}, total)] if not by and total else [])
+
+            counts = {}
+            if not any(dimension in SPARSE_DIMENSIONS for dimension in by):
+                self._count_bitmaps(bits, by, (), counts)
+            else:
+                columns = [self._columns[dimension] for dimension in by]
+                for row in _row_ids(bits):
+                    codes = tuple(column[row] for column in columns)
+                    counts[codes] = counts.get(codes, 0) + 1
+
+            groups = [
+                ({dimension: self._values[dimension][code] for dimension, code in zip(by, codes)}, matching)
+                for codes, matching in counts.items()
+            ]
+
+        groups.sort(key=lambda group: (-group[1], [str(value) for value in group[0].values()]))
+
+        return total, groups
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                "rows": _popcount(self._live),
+                "partitions": len(self._partitions),
+                "values": {dimension: len(self._values[dimension]) for dimension in DIMENSIONS},
+            }
+
+
+COMMITMENTS = CommitmentTable()
+
+
+def _get_rows(schools, gender: str, division: str, conference: str, year: int):
+    rows = []
+
+    for school in schools or ():
+        for player in school["players"]:
+            rows.append({
+                "gender": gender,
+                "division": division,
+                "conference": conference,
+                "year": year,
+                "school": school["name"],
+                "club": player.get("club"),
+                "league": player.get("league"),
+                "state": player.get("state"),
+                "position": player.get("position"),
+            })
+
+    return rows
+
+
+def record_conference(schools, gender: str, division: str, conference: dict, year: int, table=None):
+    """Keep the crawled commitments of a conference and graduation year in the table.
+
+    conference is the conference as listed by topdrawer.get_conferences:
+    its id keys the partition, however the page was reached, and its name
+    is the value of the conference dimension.
+    """
+    table = table or COMMITMENTS
+    gender = tools.canonical_gender(gender)
+    key = (gender, int(conference["id"]), int(year))
+
+    division = division and division.lower()
+
+    rows = _get_rows(schools, gender, division, conference["name"], int(year))
+    fingerprint = tuple((row["school"], row["club"], row["league"], row["state"], row["position"]) for row in rows)
+
+    table.replace(key, rows, (division, fingerprint))
+
+
+def get_league_shares(gender: str, division: str, conference: str, year: int, table=None):
+    """The commitments of a conference and graduation year per league, as pie chart slices.
+
+    The division tells apart conferences of the same name, e.g. the
+    independents of every division; None counts them together.
+    """
+    total, groups = (table or COMMITMENTS).count(
+        ("league",), gender=tools.canonical_gender(gender), division=division and division.lower(),
+        conference=conference, year=year
+    )
+
+    records = []
+    for values, count in sorted(groups, key=lambda group: str(group[0]["league"])):
+        league = values["league"]
+        if league is None:
+            continue
+
+        records.append({"name": f"{league} {round(100 * (count / total))}%", "league": league, "value": count})
+
+    return records
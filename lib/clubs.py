@@ -0,0 +1,304 @@
+import json
+import os
+import threading
+import time
+
+from common import config
+from common import matching
+from common import memo
+from common import tools
+
+from . import ecnl
+from . import store
+
+
+class ClubRegistry:
+    """A lazily loaded list of clubs, seeded from an on-disk snapshot.
+
+    Nothing is read or fetched until the first call to get().  The snapshot,
+    or the clubs last loaded into the store when they are newer, is served
+    immediately and, once it is older than max_age, refreshed from the
+    loader in a background thread.  When there is neither, the list is
+    empty until that refresh has loaded it; the loader is never called in
+    the foreground.  An empty list that was never loaded is not reported
+    to the response cache, and a failed refresh is retried after
+    config.CLUB_REGISTRY_RETRY seconds, doubling with every failure.
+    """
+
+    def __init__(self, name: str, snapshot_path: str, loader=None, max_age: int = None):
+        self.name = name
+        self.snapshot_path = snapshot_path
+        self.loader = loader
+        self.max_age = config.CLUB_REGISTRY_MAX_AGE if max_age is None else max_age
+
+        # Incremented every time the list of clubs changes.
+        self.version = 0
+
+        self._clubs = None
+        self._loaded_at = 0
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._failures = 0
+        self._retry_at = 0
+
+    def get(self):
+        """Return the list of clubs, loading it on first use."""
+        if self._clubs is None:
+            with self._lock:
+                if self._clubs is None:
+                    self._load()
+
+        clubs = self._clubs
+
+        # Until a load has succeeded the empty list must not be cached as fresh.
+        if self._loaded_at:
+            memo.note_entry(f"clubs:{self.name}:{self.version}", self._loaded_at, self.max_age)
+
+        if self._is_stale():
+            self.refresh_in_background()
+
+        return clubs
+
+    def _load(self):
+        clubs, loaded_at = self._read_snapshot()
+
+        # The snapshot may not be writable, but the store keeps every load.
+        stored, stored_at = store.load_clubs(self.name)
+        if stored is not None and stored_at > loaded_at:
+            clubs, loaded_at = stored, stored_at
+
+        # Never loaded at all: empty, and stale so get() starts a refresh.
+        self._set(clubs or [], loaded_at)
+
+    def _set(self, clubs: list, loaded_at: float):
+        if clubs != self._clubs:
+            self.version += 1
+
+        self._clubs = clubs
+        self._loaded_at = loaded_at
+
+    def refresh_if_stale(self):
+        """Start a background refresh when the loaded clubs are older than max_age."""
+        if self._clubs is not None and self._is_stale():
+            self.refresh_in_background()
+
+    def _is_stale(self):
+        if self.loader is None or time.time() < self._retry_at:
+            return False
+
+        return time.time() - self._loaded_at > self.max_age
+
+    def _read_snapshot(self):
+        if not os.path.exists(self.snapshot_path):
+            return None, 0
+
+        with open(self.snapshot_path) as f:
+            container = json.load(f)
+
+        return container["data"], os.path.getmtime(self.snapshot_path)
+
+    def _write_snapshot(self, clubs: list):
+        temporary_path = self.snapshot_path + ".tmp"
+
+        try:
+            with open(temporary_path, "w") as f:
+                json.dump({"data": clubs}, f, indent=2)
+
+            os.replace(temporary_path, self.snapshot_path)
+        except OSError as err:
+            print(f"Unable to write the {self.name} club snapshot: {err}")
+
+    def refresh(self):
+        """Reload the clubs from the loader and update the snapshot."""
+        if self.loader is None:
+            return self.get()
+
+        clubs = self.loader()
+
+        with self._lock:
+            self._set(clubs, time.time())
+            self._failures = 0
+            self._retry_at = 0
+
+        self._write_snapshot(clubs)
+        store.save_clubs(self.name, clubs)
+
+        return clubs
+
+    def refresh_in_background(self):
+        """Start a refresh unless one is already running."""
+        with self._lock:
+            if self._refreshing:
+                return
+
+            self._refreshing = True
+
+        def run():
+            try:
+                self.refresh()
+            except Exception as err:
+                print(f"Unable to refresh the {self.name} clubs: {err}")
+
+                with self._lock:
+                    self._failures += 1
+                    delay = min(config.CLUB_REGISTRY_RETRY * 2 ** (self._failures - 1), self.max_age)
+                    self._retry_at = time.time() + delay
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        thread = threading.Thread(target=run, name=f"{self.name}-club-refresh", daemon=True)
+        thread.start()
+
+
+ECNL_CLUBS = ClubRegistry(
+    "ECNL", os.path.join(config.DATA_DIRECTORY, "ecnl_clubs.json"), loader=ecnl.get_clubs
+)
+
+GA_CLUBS = ClubRegistry("GA", os.path.join(config.DATA_DIRECTORY, "ga_clubs.json"))
+
+
+def get_ecnl_clubs():
+    return ECNL_CLUBS.get()
+
+
+def get_ga_clubs():
+    return GA_CLUBS.get()
+
+
+class LeagueIndex:
+    """Resolves club names, spelled however TopDrawerSoccer spells them, to a club and its league.
+
+    The index is built from the ECNL and GA registries plus the club name
+    translations, and rebuilt only when one of the registries changes.  A
+    name is looked up exactly (once normalized) and then in an n-gram index
+    (see common.matching), whose best match is taken when its score reaches
+    config.CLUB_MATCH_THRESHOLD.  Resolved names are remembered until the
+    next rebuild.
+    """
+
+    # The most resolved names remembered between rebuilds.
+    MAX_RESOLVED = 10000
+
+    def __init__(self, registries: list):
+        # (league, registry) pairs in precedence order.
+        self.registries = registries
+
+        self._index = None
+        self._matcher = None
+        self._resolved = {}
+        self._versions = None
+        self._lock = threading.Lock()
+
+    def _build(self):
+        # Normalized name -> (club name, league) and the same clubs by n-grams.
+        index = {}
+        matcher = matching.NgramIndex()
+
+        def add(club_name, club):
+            index.setdefault(tools.normalize_club_name(club_name), club)
+            matcher.add(club_name, club)
+
+        for league, registry in self.registries:
+            for club in registry.get():
+                add(club["name"], (club["name"], league))
+
+        # A translated name is the club it translates to, with or without a league.
+        for source, target in config.get_club_translations().items():
+            club = index.get(tools.normalize_club_name(target), (target, None))
+            add(source, club)
+            add(target, club)
+
+        index.pop("", None)
+
+        return index, matcher
+
+    def get_index(self):
+        # The index is only rebuilt from registry.get(), so the registries
+        # are asked here whether their clubs are due for a refresh.
+        for _, registry in self.registries:
+            registry.refresh_if_stale()
+
+        versions = tuple(registry.version for _, registry in self.registries)
+
+        if self._index is None or versions != self._versions:
+            with self._lock:
+                if self._index is None or versions != self._versions:
+                    index, matcher = self._build()
+                    self._versions = tuple(registry.version for _, registry in self.registries)
+                    self._matcher = matcher
+                    self._resolved = {}
+                    self._index = index
+
+        return self._index
+
+    def resolve(self, club_name: str):
+        """The club a name refers to as {"name", "league", "confidence"}, or None when none is close enough."""
+        index = self.get_index()
+        normalized = tools.normalize_club_name(club_name)
+
+        resolved = self._resolved
+        club, confidence = resolved.get(normalized, (None, None))
+
+        if confidence is None:
+            club = index.get(normalized)
+            confidence = 1.0
+
+            if club is None:
+                club, confidence = self._matcher.search(normalized)
+
+            if len(resolved) >= self.MAX_RESOLVED:
+                resolved.clear()
+
+            resolved[normalized] = (club, confidence)
+
+        if club is None or confidence < config.CLUB_MATCH_THRESHOLD:
+            return None
+
+        return {"name": club[0], "league": club[1], "confidence": round(confidence, 3)}
+
+    def resolve_many(self, club_names: list):
+        return [self.resolve(club_name) for club_name in club_names]
+
+    def get_league(self, club_name: str):
+        """Returns the league of the club or None when it is not a member of any."""
+        match = self.resolve(club_name)
+
+        return None if match is None else match["league"]
+
+    def get_leagues(self, club_names: list):
+        return [self.get_league(club_name) for club_name in club_names]
+
+
+LEAGUES = LeagueIndex([("ECNL", ECNL_CLUBS), ("GA", GA_CLUBS)])
+
+
+def resolve_club(club_name: str):
+    return LEAGUES.resolve(club_name)
+
+
+def resolve_clubs(club_names: list):
+    return LEAGUES.resolve_many(club_names)
+
+
+def get_club_name(club_name: str):
+    """The canonical name of the club, or the name as given when it cannot be resolved."""
+    match = LEAGUES.resolve(club_name)
+
+    if match is None:
+        return config.translate_club_name(club_name)
+
+    return match["name"]
+
+
+def get_league(club_name: str, default: str = "Other"):
+    league = LEAGUES.get_league(club_name)
+
+    if league is None:
+        return default
+
+    return league
+
+
+def get_leagues(club_names: list, default: str = "Other"):
+    return [default if league is None else league for league in LEAGUES.get_leagues(club_names)]
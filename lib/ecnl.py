@@ -1,14 +1,13 @@
-import requests
-
 from bs4 import BeautifulSoup
 
-from common.utils import cache
+from common import fetch
 
 def get_clubs():
     url = "https://public.totalglobalsports.com/api/Event/get-org-club-list-by-orgID/9"
 
-    response = requests.get(url)
-    response.raise_for_status()
+    return fetch.get_parsed(url, _parse_clubs)
+
+def _parse_clubs(response):
     json_response = response.json()
 
     clubs = []
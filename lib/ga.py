@@ -2,7 +2,7 @@ import requests
 
 from bs4 import BeautifulSoup
 
-from common.config import GA_CLUBS
+from common import config
 
 def get_clubs():
-    return GA_CLUBS
+    return config.get_ga_clubs()
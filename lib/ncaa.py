@@ -1,10 +1,26 @@
-import requests
+from bs4 import SoupStrainer
 
-from bs4 import BeautifulSoup
-
-from common.extensions import cache
+from common import fetch
+from common import memo
+from common import parsing
 from common import tools
 
+from . import store
+
+# The rankings pages only need their rankings table built into the tree.
+RANKINGS_STRAINER = SoupStrainer("table")
+USC_RANKINGS_STRAINER = SoupStrainer("table", class_=parsing.has_class("rankingsTable"))
+
+def _extract_rankings(table, get_ranking):
+    body = table.find("tbody")
+    rows = body.find_all("tr", recursive=False)
+
+    rankings = []
+    for row in rows:
+        rankings.append(get_ranking(row))
+
+    return rankings
+
 def _get_rpi_ranking(row):
     cells = row.findChildren("td")
     ranking = {
@@ -30,26 +46,27 @@ def _get_rpi_ranking(row):
 
     return ranking
 
-@cache.cached(timeout=604800, key_prefix='list_ncaa_rpi_rankings')
-def get_rpi_rankings():
-    url = "https://www.ncaa.com/rankings/soccer-women/d1/ncaa-womens-soccer-rpi"
+def _get_rankings(source: str, url: str, parse):
+    """A ranking from the store while it is younger than a week, scraped otherwise."""
+    rankings = store.load_rankings(source, 604800)
 
-    response = requests.get(url)
+    if rankings is None:
+        rankings = fetch.get_parsed(url, parse)
+        store.save_rankings(source, rankings)
 
-    response.raise_for_status()
+    return rankings
 
-    rankings = []
+@memo.memoize(timeout=604800)
+def get_rpi_rankings():
+    url = "https://www.ncaa.com/rankings/soccer-women/d1/ncaa-womens-soccer-rpi"
 
-    soup = BeautifulSoup(response.content, "html.parser")
+    return _get_rankings("rpi", url, _parse_rpi_rankings)
 
-    table = soup.find("table")
-    body = table.find("tbody")
-    rows = body.find_all("tr", recursive=False)
 
-    for row in rows:
-        rankings.append(_get_rpi_ranking(row))
+def _parse_rpi_rankings(response):
+    soup = parsing.parse(response.content, RANKINGS_STRAINER)
 
-    return rankings
+    return _extract_rankings(soup.find("table"), _get_rpi_ranking)
 
 
 def _get_usc_2d_ranking(row):
@@ -63,48 +80,24 @@ def _get_usc_2d_ranking(row):
 
     return ranking
 
-@cache.cached(timeout=604800, key_prefix='list_ncaa_coaches_di_rankings')
+@memo.memoize(timeout=604800)
 def get_usc_d1_rankings():
     url = "https://www.ncaa.com/rankings/soccer-women/d1/united-soccer-coaches"
 
-    response = requests.get(url)
+    return _get_rankings("usc_d1", url, _parse_rpi_rankings)
 
-    response.raise_for_status()
-
-    soup = BeautifulSoup(response.content, "html.parser")
-
-    table = soup.find("table")
-    body = table.find("tbody")
-    rows = body.find_all("tr", recursive=False)
-
-    rankings = []
-    for row in rows:
-        rankings.append(_get_rpi_ranking(row))
-
-    return rankings
-
-@cache.cached(timeout=604800, key_prefix='list_ncaa_coaches_dii_rankings')
+@memo.memoize(timeout=604800)
 def get_usc_d2_rankings():
     url = "https://unitedsoccercoaches.org/rankings/college-rankings/ncaa-dii-women/"
 
-    response = requests.get(url)
+    return _get_rankings("usc_d2", url, _parse_usc_d2_rankings)
 
-    response.raise_for_status()
+def _parse_usc_d2_rankings(response):
+    soup = parsing.parse(response.content, USC_RANKINGS_STRAINER)
 
-    rankings = []
-
-    soup = BeautifulSoup(response.content, "html.parser")
-
-    table = soup.find("table", class_="rankingsTable")
-    body = table.find("tbody")
-    rows = body.find_all("tr", recursive=False)
+    return _extract_rankings(soup.find("table", class_="rankingsTable"), _get_usc_2d_ranking)
 
-    for row in rows:
-        rankings.append(_get_usc_2d_ranking(row))
-
-    return rankings
-
-@cache.memoize(timeout=604800) # 1 week
+@memo.memoize(timeout=604800) # 1 week
 def get_schools(division: str):
     if division == "di":
         url = "https://web3.ncaa.org/directory/api/directory/memberList?type=12&division=I&_=1658873231181"
@@ -115,12 +108,12 @@ def get_schools(division: str):
     else:
         return []
 
-    response = requests.get(url)
-
-    response.raise_for_status()
+    return fetch.get_parsed(url, _parse_schools)
 
-    records = response.json()
+def _parse_schools(response):
+    return _extract_schools(response.json())
 
+def _extract_schools(records):
     schools = []
     for record in records:
         school = {
@@ -1,8 +1,9 @@
 from pprint import pprint
 
-import requests
+from bs4 import SoupStrainer
 
-from bs4 import BeautifulSoup
+from common import fetch
+from common import parsing
 
 #from common.extensions import cache
 
@@ -10,16 +11,21 @@ URLS = {
     'home': 'https://usclubsoccer.org/npl-member-leagues/'
 }
 
+# The elements each page parser reads; only these are built into the tree.
+MEMBER_LEAGUES_STRAINER = SoupStrainer(id="children-nav")
+LEAGUE_STRAINER = SoupStrainer("div", attrs={"data-widget_type": "text-editor.default"})
+DEMOSPHERE_STRAINER = SoupStrainer("table", id="cb-list-tbl-1")
+
 #@cache.memoize(timeout=604800) # 1 week (it shouldn't change frequently)
 def get_member_leagues():
     """Returns all the member leagues from the NPL"""
     member_leagues = []
 
-    response = requests.get(URLS['home'])
+    response = fetch.get(URLS['home'])
 
     response.raise_for_status()
 
-    soup = BeautifulSoup(response.content, "html.parser")
+    soup = parsing.parse(response.content, MEMBER_LEAGUES_STRAINER)
 
     nav = soup.find(id="children-nav")
     items = nav.find_all('li', class_=["page_item"])
@@ -56,22 +62,22 @@ def get_clubs_by_league_name(league_name: str, gender: str = None):
     if league is None:
         return None
 
-    response = requests.get(league["url"])
+    response = fetch.get(league["url"])
 
     response.raise_for_status()
 
-    soup = BeautifulSoup(response.content, "html.parser")
+    soup = parsing.parse(response.content, LEAGUE_STRAINER)
 
     container = soup.find('div', { "data-widget_type": "text-editor.default" })
 
     clubs = []
     if container is not None:
         if league["name"] == "SOCAL Discovery NPL":
-            response = requests.get("https://elements.demosphere.com/73496/teams/club/List.html?rand6=339879#is_embedded=true")
+            response = fetch.get("https://elements.demosphere.com/73496/teams/club/List.html?rand6=339879#is_embedded=true")
 
             response.raise_for_status()
 
-            soup = BeautifulSoup(response.content, "html.parser")
+            soup = parsing.parse(response.content, DEMOSPHERE_STRAINER)
 
             table = soup.find("table", {"id": "cb-list-tbl-1"})
             cells = table.find_all("td")
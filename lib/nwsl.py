@@ -1,28 +1,29 @@
-import requests
-
 from bs4 import BeautifulSoup
-from common.extensions import cache
+from common import fetch
+from common import memo
 
-@cache.cached(timeout=604800, key_prefix='nwsl_standings')
+@memo.memoize(timeout=604800)
 def get_standings():
     url = "https://d2nkt8hgeld8zj.cloudfront.net/services/nwsl.ashx/standings"
 
-    response = requests.get(url)
-    response.raise_for_status()
+    return fetch.get_parsed(url, _parse_standings)
 
-    json = response.json()
+def _parse_standings(response):
+    return _extract_standings(response.json())
 
+def _extract_standings(json):
     return json["data"]["divisions"][0]["rankings"]
 
-@cache.cached(timeout=604800, key_prefix='nwsl_players')
+@memo.memoize(timeout=604800)
 def get_players():
     url = "https://d2nkt8hgeld8zj.cloudfront.net/services/nwsl.ashx/players"
 
-    response = requests.get(url)
-    response.raise_for_status()
+    return fetch.get_parsed(url, _parse_players)
 
-    json = response.json()
+def _parse_players(response):
+    return _extract_players(response.json())
 
+def _extract_players(json):
     results = []
 
     for record in json["data"]:
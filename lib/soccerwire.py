@@ -1,8 +1,10 @@
 import pprint
 from urllib.error import HTTPError
-import requests
 
-from bs4 import BeautifulSoup
+from bs4 import SoupStrainer
+
+from common import fetch
+from common import parsing
 
 def get_commitments():
     """Retrieve commitments from SoccerWire"""
@@ -35,11 +37,11 @@ class SoccerWireController:
     def commitments(self, gender, year, team=None, club=None, positions=None, state=None):
         url = self.get_url(gender, year)
 
-        response = requests.get(url)
+        response = fetch.get(url)
 
         response.raise_for_status()
 
-        soup = BeautifulSoup(response.content, "html.parser")
+        soup = parsing.parse(response.content, SoupStrainer("table", id="players__table"))
 
         table = soup.find("table", {"id": "players__table"})
         body = table.find("tbody")
@@ -0,0 +1,695 @@
+import functools
+import inspect
+import json
+import os
+import re
+import threading
+import time
+
+from sqlalchemy import (
+    Boolean, Column, Float, Index, Integer, MetaData, String, Table, Text, create_engine, event, func, select
+)
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.pool import StaticPool
+
+from common import config
+from common import memo
+from common.records import Record
+
+_lock = threading.Lock()
+_stores = {}
+
+# SQLite allows 999 parameters per statement.
+CHUNK_SIZE = 500
+
+metadata = MetaData()
+
+# Indexed columns are copied out of data, which holds the whole record.
+players = Table(
+    "players", metadata,
+    Column("pid", Integer, primary_key=True),
+    Column("name", String),
+    Column("year", String),
+    Column("position", String),
+    Column("state", String),
+    Column("club", String),
+    Column("league", String),
+    Column("clgid", Integer),
+    Column("data", Text, nullable=False),
+    Column("updated", Float, nullable=False),
+    # When the profile page was last read into data.
+    Column("detailed", Float),
+    Index("ix_players_club", "club"),
+    Index("ix_players_year_position", "year", "position"),
+    Index("ix_players_clgid", "clgid"),
+)
+
+colleges = Table(
+    "colleges", metadata,
+    Column("clgid", Integer, primary_key=True),
+    Column("name", String),
+    Column("url", String),
+    Column("updated", Float, nullable=False),
+    Index("ix_colleges_name", "name"),
+)
+
+# The men's and women's programs of a college have pages of their own.
+college_details = Table(
+    "college_details", metadata,
+    Column("clgid", Integer, primary_key=True),
+    Column("gender", String, primary_key=True),
+    Column("conference", String),
+    Column("state", String),
+    Column("details", Text, nullable=False),
+    Column("updated", Float, nullable=False),
+    Index("ix_college_details_conference", "conference"),
+)
+
+conferences = Table(
+    "conferences", metadata,
+    Column("cfid", Integer, primary_key=True),
+    Column("gender", String, primary_key=True),
+    Column("division", String),
+    Column("name", String),
+    Column("url", String),
+    Column("updated", Float, nullable=False),
+    Index("ix_conferences_gender_division", "gender", "division"),
+)
+
+clubs = Table(
+    "clubs", metadata,
+    Column("league", String, primary_key=True),
+    Column("name", String, primary_key=True),
+    Column("city", String),
+    Column("state", String),
+    Column("data", Text, nullable=False),
+    Column("updated", Float, nullable=False),
+    Index("ix_clubs_name", "name"),
+)
+
+rankings = Table(
+    "rankings", metadata,
+    Column("source", String, primary_key=True),
+    Column("school", String, primary_key=True),
+    Column("rank", Integer),
+    Column("data", Text, nullable=False),
+    Column("updated", Float, nullable=False),
+    Index("ix_rankings_source_rank", "source", "rank"),
+)
+
+# The rows of the transfer trackers, keyed by tracker and player.  Every
+# change (an added, changed or removed row) takes the next sequence number.
+transfers = Table(
+    "transfers", metadata,
+    Column("key", String, primary_key=True),
+    Column("tracker", Integer, nullable=False),
+    Column("year", Integer),
+    Column("gender", String),
+    Column("division", String),
+    Column("url", String),
+    Column("data", Text, nullable=False),
+    Column("sequence", Integer, nullable=False),
+    Column("removed", Boolean, nullable=False),
+    Column("updated", Float, nullable=False),
+    Index("ix_transfers_sequence", "sequence"),
+    Index("ix_transfers_tracker", "tracker"),
+    Index("ix_transfers_url", "url"),
+)
+
+# The members of every scraped list, in page order, and when it was scraped.
+listings = Table(
+    "listings", metadata,
+    Column("name", String, primary_key=True),
+    Column("members", Text, nullable=False),
+    Column("updated", Float, nullable=False),
+)
+
+
+def _now():
+    return time.time()
+
+
+def _chunks(items: list):
+    for start in range(0, len(items), CHUNK_SIZE):
+        yield items[start:start + CHUNK_SIZE]
+
+
+def get_pid(player):
+    """The TopDrawerSoccer id of a player, from its id or the pid-<n> suffix of its url."""
+    if player.get("id") is not None:
+        return int(player["id"])
+
+    match = re.search(r"/pid-(\d+)", player.get("url") or "")
+
+    return int(match.group(1)) if match else None
+
+
+def _player_data(player):
+    data = player.to_dict() if isinstance(player, Record) else dict(player)
+
+    # The id is the key of the row and an error only concerns the scrape that hit it.
+    data.pop("id", None)
+    data.pop("error", None)
+
+    return data
+
+
+class Store:
+    """Scraped players, colleges, conferences, clubs and rankings in a SQLite database.
+
+    Every record is upserted when it is scraped, keyed by its upstream id
+    (pid, clgid, cfid) or name.  Upserting a player merges the new fields
+    into the ones already stored, so a search result does not erase the
+    details read from the profile page.
+
+    A scraped list (the conferences of a division, the commitments of a
+    conference, a ranking) is also kept as a listing: the keys of its
+    members in page order.  Loading it back reads the members through the
+    primary keys and answers only while the listing is younger than max_age.
+    """
+
+    def __init__(self, url: str):
+        self.url = url
+
+        if url in ("sqlite://", "sqlite:///:memory:"):
+            # One connection shared by every thread, or each would see its own empty database.
+            self.engine = create_engine(
+                url, future=True, poolclass=StaticPool, connect_args={"check_same_thread": False}
+            )
+        else:
+            self.engine = create_engine(url, future=True, connect_args={"timeout": 30})
+            event.listen(self.engine, "connect", _set_pragmas)
+
+        # Upserts that merge with the stored rows are read-modify-write.
+        self._write_lock = threading.Lock()
+
+        metadata.create_all(self.engine)
+
+    def _upsert(self, connection, table, rows: list):
+        if not rows:
+            return
+
+        keys = [column.name for column in table.primary_key.columns]
+
+        for chunk in _chunks(rows):
+            statement = insert(table).values(chunk)
+            statement = statement.on_conflict_do_update(
+                index_elements=keys,
+                set_={name: statement.excluded[name] for name in chunk[0] if name not in keys},
+            )
+            connection.execute(statement)
+
+    def _save_listing(self, connection, name: str, members: list, updated: float):
+        self._upsert(connection, listings, [{"name": name, "members": json.dumps(members), "updated": updated}])
+
+    def _load_listing(self, connection, name: str, max_age: float):
+        row = connection.execute(select(listings).where(listings.c.name == name)).first()
+
+        if row is None or _now() - row.updated > max_age:
+            return None
+
+        return json.loads(row.members)
+
+    def _select_players(self, connection, pids: list):
+        stored = {}
+
+        for chunk in _chunks(pids):
+            for row in connection.execute(select(players).where(players.c.pid.in_(chunk))):
+                stored[row.pid] = row
+
+        return stored
+
+    def _save_players(self, connection, items: list, clgid: int, detailed: bool, now: float):
+        by_pid = {}
+        for player in items:
+            pid = get_pid(player)
+            if pid is not None:
+                by_pid[pid] = player
+
+        stored = self._select_players(connection, list(by_pid))
+
+        rows = []
+        for pid, player in by_pid.items():
+            previous = stored.get(pid)
+            data = json.loads(previous.data) if previous is not None else {}
+
+            if detailed or previous is None or previous.detailed is None:
+                data.update(_player_data(player))
+            else:
+                # A search or listing row only adds to what the profile page
+                # said; the club and league of a commitment crawl stay.
+                data = dict(_player_data(player), **data)
+
+            if clgid is None and previous is not None:
+                player_clgid = previous.clgid
+            else:
+                player_clgid = clgid
+
+            if detailed and "error" not in player:
+                details_read = now
+            else:
+                details_read = previous.detailed if previous is not None else None
+
+            rows.append({
+                "pid": pid,
+                "name": data.get("name"),
+                "year": data.get("year"),
+                "position": data.get("position"),
+                "state": data.get("state"),
+                "club": data.get("club"),
+                "league": data.get("league"),
+                "clgid": player_clgid,
+                "data": json.dumps(data),
+                "updated": now,
+                "detailed": details_read,
+            })
+
+        self._upsert(connection, players, rows)
+
+        return len(rows)
+
+    def save_players(self, items: list, detailed: bool = False):
+        """Upsert the players that have a pid; detailed ones were read from their profile page."""
+        with self._write_lock, self.engine.begin() as connection:
+            return self._save_players(connection, items, None, detailed, _now())
+
+    def get_player(self, pid: int, max_age: float):
+        """The stored player, if its profile page was read within max_age seconds."""
+        with self.engine.connect() as connection:
+            row = connection.execute(select(players).where(players.c.pid == pid)).first()
+
+        if row is None or row.detailed is None or _now() - row.detailed > max_age:
+            return None
+
+        return json.loads(row.data)
+
+    def get_players(self, club: str = None, year: str = None, position: str = None, clgid: int = None):
+        """The stored players matching every given column, through their indexes."""
+        statement = select(players.c.pid, players.c.data)
+
+        for column, value in (("club", club), ("year", year), ("position", position), ("clgid", clgid)):
+            if value is not None:
+                statement = statement.where(players.c[column] == value)
+
+        with self.engine.connect() as connection:
+            rows = connection.execute(statement.order_by(players.c.pid)).all()
+
+        return [dict(json.loads(row.data), id=row.pid) for row in rows]
+
+    def save_commitments(self, name: str, schools: list):
+        """Upsert the colleges and players of a commitments page and keep it as the listing name."""
+        now = _now()
+        members = []
+
+        rows = []
+
+        with self._write_lock, self.engine.begin() as connection:
+            for school in schools:
+                clgid = school.get("clgid")
+                pids = [get_pid(player) for player in school["players"]]
+                members.append({"name": school["name"], "url": school.get("url"), "clgid": clgid, "players": pids})
+
+                # The players of a commitments page are loaded from their profile pages.
+                self._save_players(connection, school["players"], clgid, True, now)
+
+                if clgid is not None:
+                    rows.append({"clgid": clgid, "name": school["name"], "url": school.get("url"), "updated": now})
+
+            self._upsert(connection, colleges, rows)
+
+            # A player without a pid could not be read back.
+            if all(pid is not None for member in members for pid in member["players"]):
+                self._save_listing(connection, name, members, now)
+
+    def load_commitments(self, name: str, max_age: float):
+        """The schools of a commitments listing, each with the data of its players."""
+        with self.engine.connect() as connection:
+            members = self._load_listing(connection, name, max_age)
+            if members is None:
+                return None
+
+            stored = self._select_players(connection, [pid for member in members for pid in member["players"]])
+
+        if any(pid not in stored for member in members for pid in member["players"]):
+            return None
+
+        return [
+            dict(member, players=[json.loads(stored[pid].data) for pid in member["players"]]) for member in members
+        ]
+
+    def save_college_details(self, clgid: int, gender: str, name: str, details: dict):
+        now = _now()
+        row = {
+            "clgid": clgid,
+            "gender": gender,
+            "conference": details.get("conference"),
+            "state": details.get("state"),
+            "details": json.dumps(details),
+            "updated": now,
+        }
+
+        with self._write_lock, self.engine.begin() as connection:
+            self._upsert(connection, colleges, [{"clgid": clgid, "name": name, "updated": now}])
+            self._upsert(connection, college_details, [row])
+
+    def get_college_details(self, clgid: int, gender: str, max_age: float):
+        statement = select(college_details).where(
+            college_details.c.clgid == clgid, college_details.c.gender == gender
+        )
+
+        with self.engine.connect() as connection:
+            row = connection.execute(statement).first()
+
+        if row is None or _now() - row.updated > max_age:
+            return None
+
+        return json.loads(row.details)
+
+    def save_conferences(self, gender: str, division: str, items: list):
+        now = _now()
+        rows = [
+            {
+                "cfid": item["id"],
+                "gender": gender,
+                "division": division,
+                "name": item["name"],
+                "url": item.get("url"),
+                "updated": now,
+            }
+            for item in items if item.get("id") is not None
+        ]
+
+        with self._write_lock, self.engine.begin() as connection:
+            self._upsert(connection, conferences, rows)
+            self._save_listing(connection, f"conferences:{gender}:{division}", [row["cfid"] for row in rows], now)
+
+    def load_conferences(self, gender: str, division: str, max_age: float):
+        with self.engine.connect() as connection:
+            cfids = self._load_listing(connection, f"conferences:{gender}:{division}", max_age)
+            if cfids is None:
+                return None
+
+            rows = connection.execute(
+                select(conferences).where(conferences.c.gender == gender, conferences.c.cfid.in_(cfids))
+            )
+            by_cfid = {row.cfid: row for row in rows}
+
+        return [{"id": cfid, "name": by_cfid[cfid].name, "url": by_cfid[cfid].url} for cfid in cfids if cfid in by_cfid]
+
+    def save_clubs(self, league: str, items: list):
+        now = _now()
+        rows = {}
+        for item in items:
+            rows[item["name"]] = {
+                "league": league,
+                "name": item["name"],
+                "city": item.get("city"),
+                "state": item.get("state"),
+                "data": json.dumps(item),
+                "updated": now,
+            }
+
+        with self._write_lock, self.engine.begin() as connection:
+            self._upsert(connection, clubs, list(rows.values()))
+            self._save_listing(connection, f"clubs:{league}", list(rows), now)
+
+    def load_clubs(self, league: str):
+        """The stored clubs of a league and when they were scraped, or (None, 0)."""
+        with self.engine.connect() as connection:
+            row = connection.execute(select(listings).where(listings.c.name == f"clubs:{league}")).first()
+            if row is None:
+                return None, 0
+
+            rows = connection.execute(select(clubs.c.name, clubs.c.data).where(clubs.c.league == league))
+            by_name = {item.name: item.data for item in rows}
+
+        names = json.loads(row.members)
+
+        return [json.loads(by_name[name]) for name in names if name in by_name], row.updated
+
+    def save_rankings(self, source: str, items: list):
+        now = _now()
+        rows = {}
+        for item in items:
+            rows[item["school"]] = {
+                "source": source,
+                "school": item["school"],
+                "rank": item.get("rank"),
+                "data": json.dumps(item),
+                "updated": now,
+            }
+
+        with self._write_lock, self.engine.begin() as connection:
+            self._upsert(connection, rankings, list(rows.values()))
+            self._save_listing(connection, f"rankings:{source}", list(rows), now)
+
+    def load_rankings(self, source: str, max_age: float):
+        with self.engine.connect() as connection:
+            schools = self._load_listing(connection, f"rankings:{source}", max_age)
+            if schools is None:
+                return None
+
+            rows = connection.execute(select(rankings.c.school, rankings.c.data).where(rankings.c.source == source))
+            by_school = {row.school: row.data for row in rows}
+
+        return [json.loads(by_school[school]) for school in schools if school in by_school]
+
+    def save_transfers(self, tracker: dict, items: list):
+        """Record the rows of a tracker, returning the number added, changed and removed.
+
+        Only the rows whose data differs from the stored row are written,
+        each with the next sequence number; stored rows missing from items
+        are marked removed.
+        """
+        now = _now()
+        counts = {"added": 0, "changed": 0, "removed": 0}
+
+        with self._write_lock, self.engine.begin() as connection:
+            stored = {
+                row.key: row
+                for row in connection.execute(
+                    select(transfers.c.key, transfers.c.data, transfers.c.removed)
+                    .where(transfers.c.tracker == tracker["id"])
+                )
+            }
+            sequence = connection.execute(select(func.max(transfers.c.sequence))).scalar() or 0
+
+            def row(key, url, data, removed):
+                return {
+                    "key": key,
+                    "tracker": tracker["id"],
+                    "year": tracker.get("year"),
+                    "gender": tracker.get("gender"),
+                    "division": tracker.get("division"),
+                    "url": url,
+                    "data": data,
+                    "sequence": sequence,
+                    "removed": removed,
+                    "updated": now,
+                }
+
+            rows = []
+            seen = set()
+            for item in items:
+                item = item.to_dict() if isinstance(item, Record) else dict(item)
+                key = f"{tracker['id']}:{item.get('url') or item.get('name')}"
+
+                # A player listed twice keeps the first row.
+                if key in seen:
+                    continue
+
+                seen.add(key)
+                data = json.dumps(item, sort_keys=True)
+                previous = stored.get(key)
+
+                if previous is not None and not previous.removed and previous.data == data:
+                    continue
+
+                counts["changed" if previous is not None and not previous.removed else "added"] += 1
+                sequence += 1
+                rows.append(row(key, item.get("url"), data, False))
+
+            for key, previous in stored.items():
+                if key not in seen and not previous.removed:
+                    counts["removed"] += 1
+                    sequence += 1
+                    rows.append(row(key, json.loads(previous.data).get("url"), previous.data, True))
+
+            self._upsert(connection, transfers, rows)
+
+        return counts
+
+    def get_transfers(self, since: int = None, year: int = None, gender: str = None, division: str = None):
+        """The current transfers in the order they were recorded or, after since, every change since then.
+
+        A change is the transfer as it is now, with removed set when it is
+        no longer listed.
+        """
+        statement = select(transfers)
+
+        if since is None:
+            statement = statement.where(transfers.c.removed.is_(False))
+        else:
+            statement = statement.where(transfers.c.sequence > since)
+
+        for column, value in (("year", year), ("gender", gender), ("division", division)):
+            if value is not None:
+                statement = statement.where(transfers.c[column] == value)
+
+        with self.engine.connect() as connection:
+            rows = connection.execute(statement.order_by(transfers.c.sequence)).all()
+
+        return [
+            dict(
+                json.loads(row.data),
+                tracker=row.tracker,
+                year=row.year,
+                gender=row.gender,
+                division=row.division,
+                sequence=row.sequence,
+                removed=row.removed,
+            )
+            for row in rows
+        ]
+
+    def get_transfer_sequence(self):
+        """The sequence number of the latest transfer change, 0 before the first."""
+        with self.engine.connect() as connection:
+            return connection.execute(select(func.max(transfers.c.sequence))).scalar() or 0
+
+    def get_stats(self):
+        """The number of rows of every table."""
+        with self.engine.connect() as connection:
+            return {
+                table.name: connection.execute(select(func.count()).select_from(table)).scalar()
+                for table in (players, colleges, college_details, conferences, clubs, rankings, transfers, listings)
+            }
+
+
+def _set_pragmas(connection, record):
+    cursor = connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
+
+def get_store(fallback: bool = False):
+    """Return the configured store, or None when it is disabled.
+
+    With fallback, a disabled store is replaced by an in-memory database
+    private to this process, for the data that has nowhere else to go.
+    """
+    url = config.STORE_URL or ("sqlite://" if fallback else None)
+
+    if not url:
+        return None
+
+    # An engine's connections must not cross a fork, so each process opens its own.
+    key = (url, os.getpid())
+
+    with _lock:
+        store = _stores.get(key)
+        if store is None:
+            store = Store(url)
+            _stores[key] = store
+
+    return store
+
+
+def _guarded(default=None, read_through: bool = False):
+    """Run the function with the configured store; a missing store or a database error returns default.
+
+    The store only saves scrapes from being repeated, so a failure there
+    must never fail the scrape itself.  Under memo.refreshing(horizon), a
+    read_through load takes its max_age less the horizon: only rows that
+    are still fresh past the horizon are served, and the others are loaded
+    upstream instead of being saved again as new.  The memoized functions
+    read the store with their own timeout as max_age, so the row behind an
+    entry due for a refresh is never served.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            horizon = memo.get_horizon() if read_through else None
+
+            if horizon is not None:
+                arguments = signature.bind(None, *args, **kwargs)
+                arguments.arguments["max_age"] -= horizon
+                args, kwargs = arguments.args[1:], arguments.kwargs
+
+            try:
+                store = get_store()
+                if store is None:
+                    return default
+
+                return func(store, *args, **kwargs)
+            except SQLAlchemyError as err:
+                print(f"Unable to {func.__name__.replace('_', ' ')} in the store: {err}")
+                return default
+
+        return wrapper
+
+    return decorator
+
+
+@_guarded()
+def save_players(store, items: list, detailed: bool = False):
+    return store.save_players(items, detailed=detailed)
+
+
+@_guarded(read_through=True)
+def load_player(store, pid: int, max_age: float):
+    return store.get_player(pid, max_age)
+
+
+@_guarded()
+def save_commitments(store, name: str, schools: list):
+    store.save_commitments(name, schools)
+
+
+@_guarded(read_through=True)
+def load_commitments(store, name: str, max_age: float):
+    return store.load_commitments(name, max_age)
+
+
+@_guarded()
+def save_college_details(store, clgid: int, gender: str, name: str, details: dict):
+    store.save_college_details(clgid, gender, name, details)
+
+
+@_guarded(read_through=True)
+def load_college_details(store, clgid: int, gender: str, max_age: float):
+    return store.get_college_details(clgid, gender, max_age)
+
+
+@_guarded()
+def save_conferences(store, gender: str, division: str, items: list):
+    store.save_conferences(gender, division, items)
+
+
+@_guarded(read_through=True)
+def load_conferences(store, gender: str, division: str, max_age: float):
+    return store.load_conferences(gender, division, max_age)
+
+
+@_guarded()
+def save_clubs(store, league: str, items: list):
+    store.save_clubs(league, items)
+
+
+@_guarded(default=(None, 0))
+def load_clubs(store, league: str):
+    return store.load_clubs(league)
+
+
+@_guarded()
+def save_rankings(store, source: str, items: list):
+    store.save_rankings(source, items)
+
+
+@_guarded(read_through=True)
+def load_rankings(store, source: str, max_age: float):
+    return store.load_rankings(source, max_age)
@@ -1,20 +1,56 @@
 import re
-import requests
 
-from bs4 import BeautifulSoup
+from bs4 import SoupStrainer
 
-from common.extensions import cache
+from common import concurrency
+from common import fetch
+from common import memo
+from common import parsing
 from common import tools
 from common import config
+from common.records import Record
 from lib import topdrawer
 
-from . import ga
-from . import ecnl
+from . import analytics
+from . import clubs
+from . import store
 
 PREFIX = "https://www.topdrawersoccer.com"
 
-ECNL_CLUBS = ecnl.get_clubs()
-GA_CLUBS = ga.get_clubs()
+# The elements each page parser reads; only these are built into the tree.
+CONFERENCES_STRAINER = SoupStrainer("div", class_=parsing.has_class("col-lg-6"))
+CONFERENCE_COMMITMENTS_STRAINER = SoupStrainer(["table", "a"])
+PLAYER_STRAINER = SoupStrainer(class_=parsing.has_class("profile_grid", "rating", "player-position"))
+SEARCH_STRAINER = SoupStrainer(class_=parsing.has_class("item", "pagination"))
+TRANSFERS_STRAINER = SoupStrainer("tr")
+COLLEGE_STRAINER = SoupStrainer("table")
+CLUB_COMMITMENTS_STRAINER = SoupStrainer("table", class_=parsing.has_class("table-striped"))
+
+
+class Conference(Record):
+    __slots__ = ("id", "name", "url")
+
+
+class School(Record):
+    __slots__ = ("name", "url", "clgid", "players")
+
+
+class Player(Record):
+    """A player from a commitments table, a search result or a profile page."""
+
+    __slots__ = (
+        "id", "name", "url", "imageUrl", "year", "position", "city", "state", "club", "team", "jerseyNumber",
+        "highSchool", "region", "league", "rating", "commitment", "commitmentUrl", "error",
+    )
+
+    INTERNED = ("year", "position", "state", "club", "league", "region", "commitment", "commitmentUrl")
+
+
+class Transfer(Record):
+    __slots__ = ("name", "position", "url", "formerSchoolName", "formerSchoolUrl", "newSchoolName", "newSchoolUrl")
+
+    INTERNED = ("position", "formerSchoolName", "formerSchoolUrl", "newSchoolName", "newSchoolUrl")
+
 
 def get_identifier_from_url(url):
     if url is None:
@@ -33,7 +69,45 @@ def get_identifier_from_url(url):
 
     return identifier
 
-@cache.memoize(timeout=604800)
+def _get_gender_path(gender: str):
+    """The gender as TopDrawerSoccer urls spell it."""
+    return "men" if tools.canonical_gender(gender) == "male" else "women"
+
+
+# The cache keys of the memoized scrapers: the identifiers of what they
+# load, so that every spelling of a gender or name shares one entry.
+def _conferences_key(gender: str, division: str):
+    return tools.canonical_gender(gender), division
+
+
+def _conference_key(gender: str, division: str, conference_name: str, year: int = 0):
+    # The id of the conference when get_conferences lists it under any spelling of its name.
+    conference = _find_listed_conference(gender, division, conference_name)
+    identifier = conference_name.strip().lower() if conference is None else conference["id"]
+
+    return tools.canonical_gender(gender), division.lower(), identifier, int(year)
+
+
+def _college_key(gender: str, name: str, clgid: int):
+    return tools.canonical_gender(gender), int(clgid)
+
+
+def _conference_details_key(gender: str, name: str, cfid: int, year: int = 0):
+    return tools.canonical_gender(gender), int(cfid), int(year)
+
+
+def _club_commitments_key(gender: str, grad_year: int):
+    return tools.canonical_gender(gender), int(grad_year)
+
+
+def _player_key(name: str, pid: int):
+    return int(pid)
+
+
+def _profile_key(url: str):
+    return get_identifier_from_url(url)
+
+
 def get_conferences_content(division: str):
     """Returns the HTML from the college conferences page."""
     url = "https://www.topdrawersoccer.com/college-soccer/college-conferences"
@@ -44,71 +118,38 @@ def get_conferences_content(division: str):
         suffix = config.DIVISION_MAPPING[division]
 
     url = url + suffix
-    response = requests.get(url)
 
-    response.raise_for_status()
-
-    return response.content
+    return fetch.get_content(url)
 
 
-@cache.memoize(timeout=604800)
 def get_conference_commitments_content(gender: str, division: str, conference_name: str):
     """Returns the HTML from the given conferences commitments page."""
     conference = get_conference(gender, division, conference_name)
     url = conference["url"] + "/tab-commitments"
 
-    response = requests.get(url)
-
-    response.raise_for_status()
-
-    return response.content
+    return fetch.get_content(url)
 
 
-@cache.memoize(timeout=604800)
-def get_conferences(gender: str, division: str):
-    """Return a list of all conferences."""
-    conferences = []
-
-    content = get_conferences_content(division)
-    soup = BeautifulSoup(content, "html.parser")
-    columns = soup.find_all("div", class_=["col-lg-6"])
-
-    for column in columns:
-        heading = column.find("div", class_=["heading-rectangle"]).text.strip()
-
-        if gender == "male" and "Men's" not in heading:
-            continue
+def _find_listed_conference(gender: str, division: str, conference_name: str):
+    name = conference_name.strip().lower()
 
-        if gender == "female" and "Women's" not in heading:
-            continue
-
-        table = column.find("table", class_=["table_stripped", "tds_table"])
-        cells = table.find_all("td")
-
-        for cell in cells:
-            url = PREFIX + cell.find("a")["href"]
-            conferences.append({
-                "id": int(url.split('/')[-1].split('-')[-1]),
-                "name": cell.text.strip(),
-                "url": url
-            })
+    for conference in get_conferences(gender, division):
+        if conference["name"].strip().lower() == name:
+            return conference
 
-    return conferences
+    return None
 
 
-@cache.memoize(timeout=604800)
+@memo.memoize(timeout=604800, key=_conference_key)
 def get_conference(gender: str, division: str, conference_name: str):
     """Return a conference by name."""
-    conferences = get_conferences(gender, division)
+    return _find_listed_conference(gender, division, conference_name)
 
-    for conference in conferences:
-        if conference["name"] == conference_name:
-            return conference
 
-    return None
+# The club names already reported as unknown, so each is printed once.
+_unknown_clubs = set()
 
 
-@cache.memoize(timeout=604800)  # 1 week
 def _get_league(club_name: str):
     if club_name is None:
         return "Other"
@@ -116,16 +157,37 @@ def _get_league(club_name: str):
     if len(club_name) == 0:
         return "Other"
 
-    if tools.is_member_club(club_name, ECNL_CLUBS):
-        return "ECNL"
-    elif tools.is_member_club(club_name, GA_CLUBS):
-        return "GA"
-    else:
-        print("Could not find the club (" + club_name + ")")
+    league = clubs.get_league(club_name, None)
+
+    if league is None:
+        if club_name not in _unknown_clubs:
+            _unknown_clubs.add(club_name)
+            print("Could not find the club (" + club_name + ")")
+
         return "Other"
 
+    return league
+
+
+def _extract_conference_commits(element, year: int = 0, max_workers: int = None):
+    return list(_iter_conference_commits(element, year, max_workers))
+
 
-def _extract_conference_commits(element, year: int = 0):
+def _iter_conference_commits(element, year: int = 0, max_workers: int = None):
+    """Yields the schools of a commitments tab as soon as all of their players are loaded."""
+    schools, players = _extract_conference_schools(element, year)
+
+    loaded_players = _iter_players_details(players, max_workers)
+
+    for school in schools:
+        for _ in school["players"]:
+            next(loaded_players)
+
+        yield school
+
+
+def _extract_conference_schools(element, year: int = 0):
+    """Returns the schools of a commitments tab and all of their players, without player details."""
     tables = element.find_all("table", class_=["table-striped", "tds-table", "female"])
 
     body = None
@@ -135,7 +197,7 @@ def _extract_conference_commits(element, year: int = 0):
             body = table.find("tbody")
 
     if body is None:
-        return []
+        return [], []
 
     school_mapping = {}
     anchors = element.find_all("a", class_=["player-name"])
@@ -153,14 +215,12 @@ def _extract_conference_commits(element, year: int = 0):
         # Get the id out of the url
 
     schools = []
+    players = []
     rows = body.find_all("tr")
     for row in rows:
         columns = row.find_all("td")
         if len(columns) == 1:
-            school = {
-                "name": columns[0].text.strip(),
-                "players": []
-            }
+            school = School(name=columns[0].text.strip(), players=[])
 
             if school["name"] in school_mapping:
                 item = school_mapping[school["name"]]
@@ -173,66 +233,162 @@ def _extract_conference_commits(element, year: int = 0):
                 grad_year = columns[1].text.strip()
 
                 if int(grad_year) == year:
-                    player = {
-                        "name": columns[0].text.strip(),
-                        "url": PREFIX + columns[0].find("a")["href"],
-                        "year": grad_year,
-                        "position": columns[2].text.strip(),
-                        "city": columns[3].text.strip(),
-                        "state": columns[4].text.strip(),
-                        "club": columns[5].text.strip().replace("  ", " ")
-                    }
-
-                    # print(f"Loading details for player '{player['name']}' ...")
-                    topdrawer.load_player_details(player)
-                    # print("Details loaded successfully")
-
-                    player["club"] = config.translate_club_name(player["club"])
-                    player["league"] = _get_league(player["club"])
+                    player = Player(
+                        name=columns[0].text.strip(),
+                        url=PREFIX + columns[0].find("a")["href"],
+                        year=grad_year,
+                        position=columns[2].text.strip(),
+                        city=columns[3].text.strip(),
+                        state=columns[4].text.strip(),
+                        club=columns[5].text.strip().replace("  ", " ")
+                    )
 
                     # print(f"Adding '{player['name']}' to '{school['name']}' ...")
                     school["players"].append(player)
+                    players.append(player)
             else:
                 # If the year is less than or equal to 0 completely skip loading players,
                 # it just takes way too long.
                 pass
 
-    return schools
+    return schools, players
+
+
+def _load_players_details(players: list, max_workers: int = None):
+    """Load the profile details for every player concurrently.
+
+    The players are updated in place.  A player whose profile could not be
+    loaded keeps the values from the commitments table and gets an "error".
+    """
+    for _ in _iter_players_details(players, max_workers):
+        pass
+
+
+def _iter_players_details(players: list, max_workers: int = None):
+    """Like _load_players_details, yielding each player in order once it is loaded."""
+    if max_workers is None:
+        max_workers = config.PLAYER_DETAIL_WORKERS
+
+    if config.FETCH_ENGINE == "async":
+        outcomes = _iter_loaded_profiles(players)
+    else:
+        outcomes = concurrency.fan_out_iter(topdrawer.load_player_details, players, max_workers)
+
+    for player, (_, err) in zip(players, outcomes):
+        if err is not None:
+            print(f"Unable to load details for player '{player['name']}': {err}")
+            player["error"] = str(err)
+
+        player["club"] = clubs.get_club_name(player["club"])
+        player["league"] = _get_league(player["club"])
+
+        yield player
+
+
+def _iter_loaded_profiles(players: list):
+    """Load the profiles of the players all at once from the fetch engine's event loop, like load_player_details."""
+    profiles = [load_player_profile.peek(player["url"]) for player in players]
+    missing = [player["url"] for player, profile in zip(players, profiles) if profile is None]
+
+    outcomes = fetch.iter_parsed(missing, _parse_player_profile)
+
+    for player, profile in zip(players, profiles):
+        err = None
+
+        if profile is None:
+            profile, err = next(outcomes)
+
+            if err is None:
+                load_player_profile.put(profile, player["url"])
+
+        if err is None:
+            _set_player_profile(player, profile)
+
+        yield None, err
+
+
+def find_conference(gender: str, cfid: int):
+    """The division and the conference with the id, or (None, None) when no division lists it."""
+    for division in config.DIVISION_MAPPING:
+        for conference in get_conferences(gender, division):
+            if conference["id"] == int(cfid):
+                return division, conference
+
+    return None, None
+
 
-@cache.memoize(timeout=86400)  # 1 day
 def get_conference_commitment_chart_data(gender: str, name: str, cfid: int, year: int):
-    schools = get_conference_details(gender, name, cfid, year)
+    """The league shares of a conference's commitments, answered by the analytics table."""
+    division, conference = find_conference(gender, cfid)
 
-    leagues = []
-    players = []
-    for school in schools:
-        for player in school["players"]:
-            players.append(player)
-            if player["league"] not in leagues:
-                leagues.append(player["league"])
+    if conference is None:
+        conference = Conference(id=int(cfid), name=name)
+        schools = get_conference_details(gender, name, cfid, year)
+    else:
+        # The same crawl as the conference commits and the warm-up.
+        schools = get_conference_commits(gender, division, conference["name"], year)
 
-    leagues.sort()
+    analytics.record_conference(schools, gender, division, conference, year)
 
-    records = []
-    for league in leagues:
-        record = { "name": '', "league": league, "value": 0 };
-        for player in players:
-            if player["league"] == league:
-                record["value"] += 1
+    return analytics.get_league_shares(gender, division, conference["name"], year)
 
-        record["name"] = league + " " + str(round(100 * (record["value"] / len(players)))) + "%"
-        records.append(record)
 
-    return records
+def _load_stored_commits(listing: str, max_age: int):
+    """The schools of a commitments page kept in the store, or None."""
+    schools = store.load_commitments(listing, max_age)
+
+    if schools is None:
+        return None
+
+    return [
+        School(**dict(school, players=[Player(**player) for player in school["players"]])) for school in schools
+    ]
+
+
+def _saving(records, save):
+    """Yields the records and passes all of them to save after the last one."""
+    loaded = []
+
+    for record in records:
+        loaded.append(record)
+        yield record
+
+    save(loaded)
 
 
-@cache.memoize(timeout=604800)  # 1 week
+@memo.memoize(timeout=604800, key=_conference_key)  # 1 week
 def get_conference_commits(gender: str, division: str, conference_name: str, year: int = 0):
+    listing = "commits:{}:{}:{}:{}".format(*_conference_key(gender, division, conference_name, year))
+
+    schools = _load_stored_commits(listing, 604800)
+    if schools is not None:
+        return schools
+
     content = get_conference_commitments_content(gender, division, conference_name)
 
-    soup = BeautifulSoup(content, "html.parser")
+    soup = parsing.parse(content, CONFERENCE_COMMITMENTS_STRAINER)
+    schools = _extract_conference_commits(soup, year)
+
+    store.save_commitments(listing, schools)
+
+    return schools
+
 
-    return _extract_conference_commits(soup, year)
+def iter_conference_commits(gender: str, division: str, conference_name: str, year: int = 0):
+    """Yields the schools of get_conference_commits as they are loaded."""
+    def load(gender, division, conference_name, year):
+        listing = "commits:{}:{}:{}:{}".format(*_conference_key(gender, division, conference_name, year))
+
+        schools = _load_stored_commits(listing, 604800)
+        if schools is not None:
+            return iter(schools)
+
+        content = get_conference_commitments_content(gender, division, conference_name)
+        schools = _iter_conference_commits(parsing.parse(content, CONFERENCE_COMMITMENTS_STRAINER), year)
+
+        return _saving(schools, lambda loaded: store.save_commitments(listing, loaded))
+
+    return memo.iterate(get_conference_commits, load, gender, division, conference_name, year)
 
 
 def _get_player_rating(element):
@@ -341,7 +497,6 @@ def _load_profile_grid_settings(element, details):
             print("Unknown lvalue " + lvalue + " on player detail page.")
 
 
-@cache.memoize(timeout=86400)  # 1 day
 def load_player_details(player):
     if player is None:
         return
@@ -349,20 +504,47 @@ def load_player_details(player):
     if "url" not in player:
         return
 
-    response = requests.get(player["url"])
+    _set_player_profile(player, load_player_profile(player["url"]))
+
+
+@memo.memoize(timeout=86400, key=_profile_key)  # 1 day
+def load_player_profile(url: str):
+    """The values of the profile page at url, cached by player id."""
+    response = fetch.get(url)
 
     response.raise_for_status()
 
-    soup = BeautifulSoup(response.content, "html.parser")
+    return _parse_player_profile(response)
+
+
+def _parse_player_profile(response):
+    return _extract_player_profile(parsing.parse(response.content, PLAYER_STRAINER))
+
+
+def _extract_player_profile(element):
+    """The values of a profile page, without the league derived from the club."""
+    profile = {}
+
+    _load_profile_grid_settings(element, profile)
 
-    _load_profile_grid_settings(soup, player)
+    profile["year"] = _get_player_year(element)
+    profile["rating"] = _get_player_rating(element)
+    profile["position"] = _get_player_position(element)
+    profile["commitment"] = _get_player_commitment(element)
+    profile["commitmentUrl"] = _get_player_commitment_url(element)
+
+    return profile
+
+
+def _set_player_profile(player, profile):
+    for name, value in profile.items():
+        player[name] = value
 
     player["league"] = _get_league(player["club"])
-    player["year"] = _get_player_year(soup)
-    player["rating"] = _get_player_rating(soup)
-    player["position"] = _get_player_position(soup)
-    player["commitment"] = _get_player_commitment(soup)
-    player["commitmentUrl"] = _get_player_commitment_url(soup)
+
+
+def _extract_player_details(element, player):
+    _set_player_profile(player, _extract_player_profile(element))
 
 
 def _get_transfer_position(cell):
@@ -388,24 +570,17 @@ def _get_transfer_name(cell):
 
 
 def _get_transfer(row):
+    transfer = None
+
     try:
         cells = row.find_all("td")
 
         name = _get_transfer_name(cells[0])
-        print(f"Processing '{name}'")
 
         if name is None or len(name) == 0:
             return None
 
-        transfer = {
-            "name": name,
-            "position": None,
-            "url": None,
-            "formerSchoolName": None,
-            "formerSchoolUrl": None,
-            "newSchoolName": None,
-            "newSchoolUrl": None
-        }
+        transfer = Transfer(name=name)
 
         transfer["position"] = _get_transfer_position(cells[0])
         transfer["url"] = tools.get_anchor_url(cells[0], PREFIX)
@@ -419,23 +594,13 @@ def _get_transfer(row):
             transfer["newSchoolUrl"] = tools.get_anchor_url(cells[2], PREFIX)
 
     except Exception as err:
-        print(row.text)
-        print(err)
-
-    print(transfer)
+        print(f"Unable to read the transfer row '{row.text.strip()}': {err}")
 
     return transfer
 
 
-@cache.cached(timeout=86400, key_prefix='transfers')  # cache for 1 day
-def get_transfers():
-    url = "https://www.topdrawersoccer.com/college-soccer-articles/2022-womens-di-transfer-tracker_aid50187"
-
-    response = requests.get(url)
-    response.raise_for_status()
-
-    soup = BeautifulSoup(response.content, "html.parser")
-    rows = soup.find_all("tr")
+def _extract_transfers(element):
+    rows = element.find_all("tr")
 
     transfers = []
     for row in rows:
@@ -447,23 +612,35 @@ def get_transfers():
 
     return transfers
 
-@cache.memoize(timeout=604800) # 1 week
+@memo.memoize(timeout=604800, key=_conferences_key) # 1 week
 def get_conferences(gender: str, division: str):
+    gender = tools.canonical_gender(gender)
+
+    stored = store.load_conferences(gender, division, 604800)
+    if stored is not None:
+        return [Conference(**conference) for conference in stored]
+
     url = "https://www.topdrawersoccer.com/college-soccer/college-conferences"
 
     suffix = ""
     if division in config.DIVISION_MAPPING:
         suffix = config.DIVISION_MAPPING[division]
 
-    response = requests.get(url + suffix)
+    conferences = fetch.get_parsed(url + suffix, _parse_conferences, gender)
 
-    response.raise_for_status()
+    store.save_conferences(gender, division, conferences)
 
-    conferences = []
+    return conferences
+
+
+def _parse_conferences(response, gender: str):
+    return _extract_conferences(parsing.parse(response.content, CONFERENCES_STRAINER), gender)
 
-    soup = BeautifulSoup(response.content, "html.parser")
 
-    column_elements = soup.find_all("div", class_="col-lg-6")
+def _extract_conferences(element, gender: str):
+    conferences = []
+
+    column_elements = element.find_all("div", class_="col-lg-6")
 
     for column_element in column_elements:
         heading_element = column_element.find("div", class_="heading-rectangle")
@@ -483,12 +660,10 @@ def get_conferences(gender: str, division: str):
             conference_id = get_identifier_from_url(url)
 
             if gender == "male" and "Men's" in heading:
-                conferences.append(
-                    {"id": conference_id, "name": name, "url": url})
+                conferences.append(Conference(id=conference_id, name=name, url=url))
 
             if gender == "female" and "Women's" in heading:
-                conferences.append(
-                    {"id": conference_id, "name": name, "url": url})
+                conferences.append(Conference(id=conference_id, name=name, url=url))
 
     return conferences
 
@@ -599,20 +774,20 @@ def _extract_player_url(item):
     return PREFIX + name_anchor["href"]
 
 def _get_searched_player(element):
-    return {
-        "id": _extract_player_id(element),
-        "name": _extract_player_name(element),
-        "url": _extract_player_url(element),
-        "imageUrl": _extract_image_url(element),
-        "position": element.find("div", class_="col-position").text.strip(),
-        "club": _extract_club(element),
-        "highSchool": _extract_high_school(element),
-        "rating": _extract_rating(element),
-        "year": element.find("div", class_="col-grad").text.strip(),
-        "state": element.find("div", class_="col-state").text.strip(),
-        "commitment": _extract_commitment(element),
-        "commitmentUrl": _extract_commitment_url(element)
-    }
+    return Player(
+        id=_extract_player_id(element),
+        name=_extract_player_name(element),
+        url=_extract_player_url(element),
+        imageUrl=_extract_image_url(element),
+        position=element.find("div", class_="col-position").text.strip(),
+        club=_extract_club(element),
+        highSchool=_extract_high_school(element),
+        rating=_extract_rating(element),
+        year=element.find("div", class_="col-grad").text.strip(),
+        state=element.find("div", class_="col-state").text.strip(),
+        commitment=_extract_commitment(element),
+        commitmentUrl=_extract_commitment_url(element)
+    )
 
 def _get_searched_players(element):
     players = []
@@ -623,59 +798,103 @@ def _get_searched_players(element):
 
     return players
 
-@cache.memoize(timeout=86400)  # cache for 1 day
-def search_for_players(gender: str, position: str, grad_year: str, region: str, state: str):
-    suffix = _generate_player_suffix(gender, position, grad_year, region, state, 0)
+def _get_search_url(gender: str, position: str, grad_year: str, region: str, state: str, page: int):
+    suffix = _generate_player_suffix(gender, position, grad_year, region, state, page)
 
-    url = "https://www.topdrawersoccer.com/search/?query="
+    return "https://www.topdrawersoccer.com/search/?query=" + suffix
 
-    response = requests.get(url + suffix)
+def _load_search_page(gender: str, position: str, grad_year: str, region: str, state: str, page: int):
+    response = fetch.get(_get_search_url(gender, position, grad_year, region, state, page))
     response.raise_for_status()
 
-    soup = BeautifulSoup(response.content, "html.parser")
+    return parsing.parse(response.content, SEARCH_STRAINER)
 
-    players = _get_searched_players(soup)
+def _parse_search_page(response):
+    return _get_searched_players(parsing.parse(response.content, SEARCH_STRAINER))
 
-    pages = _get_search_pages(soup)
-    for page in pages:
-        suffix = _generate_player_suffix(gender, position, grad_year, region, state, page - 1)
+def _merge_searched_players(pages_of_players):
+    """Flatten the pages in order, keeping the first occurrence of every player id."""
+    return list(_iter_merged_players(pages_of_players))
 
-        response = requests.get(url + suffix)
-        response.raise_for_status()
 
-        soup = BeautifulSoup(response.content, "html.parser")
+def _iter_merged_players(pages_of_players):
+    seen = set()
 
-        players.extend(_get_searched_players(soup))
+    for page_of_players in pages_of_players:
+        for player in page_of_players:
+            if player["id"] in seen:
+                continue
+
+            seen.add(player["id"])
+            yield player
+
+@memo.memoize(timeout=86400)  # cache for 1 day
+def search_for_players(gender: str, position: str, grad_year: str, region: str, state: str):
+    players = _merge_searched_players(_iter_search_pages(gender, position, grad_year, region, state))
+
+    store.save_players(players)
 
     return players
 
 
+def iter_search_for_players(gender: str, position: str, grad_year: str, region: str, state: str):
+    """Yields the players of search_for_players page by page as the pages load."""
+    def load(*args):
+        return _saving(_iter_merged_players(_iter_search_pages(*args)), store.save_players)
+
+    return memo.iterate(search_for_players, load, gender, position, grad_year, region, state)
+
+
+def _iter_search_pages(gender: str, position: str, grad_year: str, region: str, state: str):
+    """Yields the players of every page of a search, in page order."""
+    soup = _load_search_page(gender, position, grad_year, region, state, 0)
+
+    # The pagination is 1-based while the pageNo query parameter is 0-based.
+    pages = sorted(set(_get_search_pages(soup)))
+
+    urls = [_get_search_url(gender, position, grad_year, region, state, page - 1) for page in pages]
+
+    yield _get_searched_players(soup)
+
+    for page_of_players, err in fetch.iter_parsed(urls, _parse_search_page, max_workers=config.FETCH_WORKERS):
+        if err is not None:
+            raise err
+
+        yield page_of_players
+
+
 def _extract_conference_standings(soup):
     heading = soup.find("h1", text=re.compile(r"Conference Standings"))
     parent = heading.parent.parent.parent;
     parent.find("table", class_=["table-striped", "tds_table"])
 
 
-@cache.memoize(timeout=86400)  # cache for 1 day
+@memo.memoize(timeout=86400, key=_college_key)  # cache for 1 day
 def get_college_details(gender: str, name: str, clgid: int):
-    gender = gender.strip().lower()
+    details = store.load_college_details(clgid, tools.canonical_gender(gender), 86400)
+    if details is not None:
+        return details
 
-    if gender == "male":
-        gender = "men"
-    elif gender == "female":
-        gender = "women"
+    slug = name.strip().lower().replace(" ", "-").replace(".", "").replace("'", "")
 
-    name = name.strip().lower().replace(" ", "-").replace(".", "").replace("'", "")
-    clgid = str(clgid)
+    url = (
+        "https://www.topdrawersoccer.com/college-soccer/college-soccer-details/"
+        f"{_get_gender_path(gender)}/{slug}/clgid-{clgid}"
+    )
 
-    url = f"https://www.topdrawersoccer.com/college-soccer/college-soccer-details/{gender}/{name}/clgid-{clgid}"
+    details = fetch.get_parsed(url, _parse_college_details)
 
-    response = requests.get(url)
-    response.raise_for_status()
+    store.save_college_details(clgid, tools.canonical_gender(gender), name, details)
+
+    return details
+
+
+def _parse_college_details(response):
+    return _extract_college_details(parsing.parse(response.content, COLLEGE_STRAINER))
 
-    soup = BeautifulSoup(response.content, "html.parser")
 
-    header = soup.find("th", text=re.compile(r"Program Information"))
+def _extract_college_details(element):
+    header = element.find("th", text=re.compile(r"Program Information"))
     table = header.parent.parent.parent
     body = table.find("tbody")
     rows = body.findChildren("tr")
@@ -712,9 +931,13 @@ def get_college_details(gender: str, name: str, clgid: int):
 
     return details
 
-@cache.memoize(timeout=86400)  # cache for 1 day
+@memo.memoize(timeout=86400, key=_player_key)  # cache for 1 day
 def get_player_details(name: str, pid: int):
-    player = { "id": pid, "name": name }
+    stored = store.load_player(pid, 86400)
+    if stored is not None:
+        return Player(**dict(stored, id=pid))
+
+    player = Player(id=pid, name=name)
     pid = str(pid)
 
     name = name.strip().lower().replace(" ", "-")
@@ -722,42 +945,77 @@ def get_player_details(name: str, pid: int):
 
     load_player_details(player)
 
+    store.save_players([player], detailed=True)
+
     return player
 
-@cache.memoize(timeout=86400)  # cache for 1 day
+@memo.memoize(timeout=86400, key=_conference_details_key)  # cache for 1 day
 def get_conference_details(gender: str, name: str, cfid: int, year: int = 0):
-    gender = gender.strip().lower()
+    listing = "conference:{}:{}:{}".format(*_conference_details_key(gender, name, cfid, year))
+
+    schools = _load_stored_commits(listing, 86400)
+    if schools is not None:
+        return schools
+
+    # Only the page is revalidated: the player details are loaded (and
+    # cached) on their own, so a page that is not modified keeps no stale
+    # profiles or failed loads.
+    schools = fetch.get_parsed(_get_conference_details_url(gender, name, cfid), _parse_conference_schools, year)
+
+    _load_players_details([player for school in schools for player in school["players"]])
+
+    store.save_commitments(listing, schools)
+
+    return schools
 
-    if gender == "male":
-        gender = "men"
-    elif gender == "female":
-        gender = "women"
 
+def iter_conference_details(gender: str, name: str, cfid: int, year: int = 0):
+    """Yields the schools of get_conference_details as they are loaded."""
+    def load(gender, name, cfid, year):
+        listing = "conference:{}:{}:{}".format(*_conference_details_key(gender, name, cfid, year))
+
+        schools = _load_stored_commits(listing, 86400)
+        if schools is not None:
+            return iter(schools)
+
+        content = fetch.get_content(_get_conference_details_url(gender, name, cfid))
+        schools = _iter_conference_commits(parsing.parse(content, CONFERENCE_COMMITMENTS_STRAINER), year)
+
+        return _saving(schools, lambda loaded: store.save_commitments(listing, loaded))
+
+    return memo.iterate(get_conference_details, load, gender, name, cfid, year)
+
+
+def _get_conference_details_url(gender: str, name: str, cfid: int):
+    gender = _get_gender_path(gender)
     name = name.strip().lower().replace(" ", "-")
     cfid = str(cfid)
 
-    url = f"https://www.topdrawersoccer.com/college-soccer/college-conferences/conference-details/{gender}/{name}/cfid-{cfid}/tab-commitments#commitments"
+    return f"https://www.topdrawersoccer.com/college-soccer/college-conferences/conference-details/{gender}/{name}/cfid-{cfid}/tab-commitments#commitments"
 
-    response = requests.get(url)
-    response.raise_for_status()
 
-    soup = BeautifulSoup(response.content, "html.parser")
+def _parse_conference_schools(response, year: int):
+    """The schools of a commitments page with the rows of their players, without player details."""
+    schools, _ = _extract_conference_schools(parsing.parse(response.content, CONFERENCE_COMMITMENTS_STRAINER), year)
 
-    return _extract_conference_commits(soup, year)
+    return schools
 
-@cache.memoize(timeout=86400)  # cache for 1 day
+@memo.memoize(timeout=86400, key=_club_commitments_key)  # cache for 1 day
 def get_commitments_by_club(gender: str, grad_year: int):
-    if gender == "female":
+    if tools.canonical_gender(gender) == "female":
         url = f"https://www.topdrawersoccer.com/commitments/club/women/{grad_year}"
     else:
         url = f"https://www.topdrawersoccer.com/commitments/club/men/{grad_year}"
 
-    response = requests.get(url)
-    response.raise_for_status()
+    return fetch.get_parsed(url, _parse_commitments_by_club)
+
+
+def _parse_commitments_by_club(response):
+    return _extract_commitments_by_club(parsing.parse(response.content, CLUB_COMMITMENTS_STRAINER))
 
-    soup = BeautifulSoup(response.content, "html.parser")
 
-    table = soup.find('table', class_=["table-striped"])
+def _extract_commitments_by_club(element):
+    table = element.find('table', class_=["table-striped"])
 
     if table is None:
         return []
@@ -0,0 +1,166 @@
+import re
+import threading
+
+from common import concurrency
+from common import config
+from common import fetch
+from common import memo
+from common import parsing
+
+from . import store
+from . import topdrawer
+
+# Pages linking to the transfer tracker articles, and the trackers known
+# beforehand in case a listing does not link them.
+LISTING_URLS = (
+    "https://www.topdrawersoccer.com/college-soccer-articles",
+    "https://www.topdrawersoccer.com/search/?query=transfer+tracker&area=article",
+)
+
+KNOWN_TRACKER_URLS = (
+    "https://www.topdrawersoccer.com/college-soccer-articles/2022-womens-di-transfer-tracker_aid50187",
+)
+
+_lock = threading.Lock()
+_ingesting = False
+
+TRACKER_PATH = re.compile(
+    r"/college-soccer-articles/(\d{4})-(mens|womens)-(di|dii|diii|naia|njcaa)-transfer-tracker_aid(\d+)", re.IGNORECASE
+)
+
+
+def find_trackers(text: str):
+    """The transfer trackers linked from text by article id, as dicts of id, year, gender, division and url."""
+    trackers = {}
+
+    for match in TRACKER_PATH.finditer(text):
+        year, gender, division, article_id = match.groups()
+
+        trackers[int(article_id)] = {
+            "id": int(article_id),
+            "year": int(year),
+            "gender": "male" if gender.lower() == "mens" else "female",
+            "division": division.lower(),
+            "url": topdrawer.PREFIX + match.group(0),
+        }
+
+    return trackers
+
+
+@memo.memoize(timeout=86400)  # cache for 1 day
+def get_trackers():
+    """Every transfer tracker article the listings link to, newest first."""
+    trackers = find_trackers(" ".join(KNOWN_TRACKER_URLS))
+
+    for url, (content, err) in zip(LISTING_URLS, concurrency.fan_out(fetch.get_content, LISTING_URLS)):
+        if err is not None:
+            print(f"Unable to look for transfer trackers on {url}: {err}")
+            continue
+
+        trackers.update(find_trackers(content.decode("utf-8", errors="replace")))
+
+    return _sorted(trackers.values())
+
+
+def _sorted(trackers):
+    return sorted(
+        trackers, key=lambda tracker: (-tracker["year"], tracker["gender"], tracker["division"], tracker["id"])
+    )
+
+
+def _parse_tracker(response):
+    """The transfers of a tracker article and the other trackers it links to."""
+    soup = parsing.parse(response.content, topdrawer.TRANSFERS_STRAINER)
+
+    return topdrawer._extract_transfers(soup), find_trackers(response.text)
+
+
+@memo.memoize(timeout=86400)  # cache for 1 day
+def ingest(max_workers: int = None):
+    """Fetch every transfer tracker concurrently and record the rows that changed.
+
+    Trackers linked from the fetched ones are fetched in turn.  A tracker
+    upstream reports unchanged is not parsed again (see fetch.get_parsed)
+    and only the new, changed and removed rows of the others are written,
+    each with the next sequence number of the change feed.  A tracker that
+    fails keeps its rows until it loads again.
+    """
+    if max_workers is None:
+        max_workers = config.FETCH_WORKERS
+
+    log = store.get_store(fallback=True)
+    trackers = {tracker["id"]: tracker for tracker in get_trackers()}
+    pending = list(trackers.values())
+
+    totals = {"trackers": 0, "failed": 0, "added": 0, "changed": 0, "removed": 0}
+
+    while pending:
+        linked = {}
+
+        outcomes = fetch.map_parsed([tracker["url"] for tracker in pending], _parse_tracker, max_workers=max_workers)
+
+        for tracker, (result, err) in zip(pending, outcomes):
+            if err is not None:
+                print(f"Unable to load the transfer tracker {tracker['url']}: {err}")
+                totals["failed"] += 1
+                continue
+
+            rows, links = result
+            totals["trackers"] += 1
+
+            for name, count in log.save_transfers(tracker, rows).items():
+                totals[name] += count
+
+            for article_id, link in links.items():
+                if article_id not in trackers:
+                    linked[article_id] = link
+
+        trackers.update(linked)
+        pending = _sorted(linked.values())
+
+    totals["sequence"] = log.get_transfer_sequence()
+
+    return totals
+
+
+def ingest_in_background():
+    """Start ingest() in a daemon thread unless it is already running."""
+    global _ingesting
+
+    with _lock:
+        if _ingesting:
+            return
+
+        _ingesting = True
+
+    def run():
+        global _ingesting
+
+        try:
+            ingest()
+        except Exception as err:
+            print(f"Unable to ingest the transfer trackers: {err}")
+        finally:
+            with _lock:
+                _ingesting = False
+
+    thread = threading.Thread(target=run, name="transfer-ingest", daemon=True)
+    thread.start()
+
+
+def get_transfers(since: int = None, year: int = None, gender: str = None, division: str = None):
+    """The transfers of every tracker, or the changes after the sequence number since.
+
+    Only the store is read: the trackers are ingested by the warm-up
+    scheduler, or in the background when no ingestion is cached (a stale
+    one is refreshed in the background by peek).  Returns the transfers and
+    the sequence number of the latest change, to pass as since for the next
+    changes.
+    """
+    if ingest.peek() is None:
+        ingest_in_background()
+
+    log = store.get_store(fallback=True)
+    sequence = log.get_transfer_sequence()
+
+    return log.get_transfers(since, year, gender, division), sequence
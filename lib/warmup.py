@@ -0,0 +1,199 @@
+import datetime
+import os
+import threading
+import time
+
+from common import concurrency
+from common import config
+from common import memo
+from common.extensions import cache
+
+from . import analytics
+from . import topdrawer
+from . import transfers
+
+GENDERS = ("female", "male")
+
+
+def get_active_years():
+    """The graduation years whose commitments are still changing."""
+    if config.WARMUP_YEARS:
+        return [int(year) for year in config.WARMUP_YEARS.split(",") if year.strip()]
+
+    this_year = datetime.date.today().year
+
+    return list(range(this_year, this_year + 4))
+
+
+class Job:
+    """One precomputed conference page: its commitments for a year, recorded for the charts."""
+
+    def __init__(self, gender: str, division: str, conference: dict, year: int):
+        self.gender = gender
+        self.division = division
+        self.conference = conference
+        self.year = year
+
+    @property
+    def name(self):
+        return f"{self.gender}/{self.division}/{self.conference['name']}/{self.year}"
+
+    def run(self):
+        schools = topdrawer.get_conference_commits(self.gender, self.division, self.conference["name"], self.year)
+        # One crawl per page: loading the chart data too would crawl every player again.
+        analytics.record_conference(schools, self.gender, self.division, self.conference, self.year)
+
+
+class WarmupScheduler:
+    """Precomputes the conference commitments and ingests the transfer trackers in the background.
+
+    Every interval seconds one round enumerates the conferences of every
+    gender and division, then runs one job per conference and active year on
+    a pool of workers.  Entries that are still fresh for the next interval
+    are served from the cache, so a round only recomputes what would
+    otherwise expire before the following one.  Only one process sharing
+    the cache runs a given round.
+    """
+
+    def __init__(self, interval: int = None, workers: int = None, years: list = None, divisions: list = None):
+        self.interval = config.WARMUP_INTERVAL if interval is None else interval
+        self.workers = config.WARMUP_WORKERS if workers is None else workers
+        self.years = years
+        self.divisions = list(config.DIVISION_MAPPING) if divisions is None else divisions
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._status = {"state": "idle", "rounds": 0}
+
+    def _update(self, **values):
+        with self._lock:
+            self._status.update(values)
+
+        self._publish()
+
+    def _publish(self):
+        # Share the progress with the workers that did not claim the round.
+        try:
+            cache.cache.set("warmup:status", self._snapshot(), timeout=2 * self.interval)
+        except (AttributeError, KeyError, RuntimeError):
+            pass
+
+    def _snapshot(self):
+        with self._lock:
+            status = dict(self._status)
+            status["jobs"] = [dict(job) for job in status.get("jobs", [])]
+
+        return status
+
+    def get_status(self):
+        """Progress of the current (or last) round and the timing of each of its jobs."""
+        try:
+            status = cache.cache.get("warmup:status")
+        except (AttributeError, KeyError, RuntimeError):
+            status = None
+
+        return status or self._snapshot()
+
+    def get_jobs(self):
+        years = self.years or get_active_years()
+        jobs = []
+
+        for gender in GENDERS:
+            for division in self.divisions:
+                with memo.refreshing(self.interval):
+                    conferences = topdrawer.get_conferences(gender, division)
+
+                for conference in conferences:
+                    for year in years:
+                        jobs.append(Job(gender, division, conference, year))
+
+        return jobs
+
+    def _run_job(self, job):
+        started = time.perf_counter()
+        error = None
+
+        try:
+            with memo.refreshing(self.interval):
+                job.run()
+        except Exception as err:
+            error = str(err)
+            print(f"Unable to warm {job.name}: {err}")
+
+        result = {"name": job.name, "seconds": round(time.perf_counter() - started, 3), "error": error}
+
+        with self._lock:
+            self._status["jobs"].append(result)
+            self._status["done"] += 1
+            if error is not None:
+                self._status["failed"] += 1
+
+        self._publish()
+
+        return result
+
+    def run_once(self):
+        """Run one round in the calling thread and return its status."""
+        started = time.time()
+        self._update(state="enumerating", started=started, finished=None, total=0, done=0, failed=0, jobs=[])
+
+        try:
+            jobs = self.get_jobs()
+        except Exception as err:
+            print(f"Unable to enumerate the warm-up jobs: {err}")
+            self._update(state="failed", finished=time.time(), error=str(err))
+            return self.get_status()
+
+        print(f"Warming {len(jobs)} conference pages with {self.workers} workers")
+        self._update(state="running", total=len(jobs), error=None)
+
+        concurrency.fan_out(self._run_job, jobs, self.workers)
+
+        try:
+            with memo.refreshing(self.interval):
+                transfers.ingest()
+        except Exception as err:
+            print(f"Unable to ingest the transfer trackers: {err}")
+
+        finished = time.time()
+        with self._lock:
+            self._status.update(state="idle", finished=finished, seconds=round(finished - started, 3))
+            self._status["rounds"] += 1
+            done, failed = self._status["done"], self._status["failed"]
+
+        self._publish()
+
+        print(f"Warmed {done} conference pages in {finished - started:.0f}s ({failed} failed)")
+
+        return self.get_status()
+
+    def _claim_round(self):
+        # One round per interval across every worker sharing the cache.
+        try:
+            return cache.cache.add("warmup:round", os.getpid(), timeout=self.interval)
+        except (AttributeError, KeyError, RuntimeError):
+            return True
+
+    def _loop(self):
+        while not self._stop.is_set():
+            if self._claim_round():
+                self.run_once()
+
+            self._stop.wait(self.interval)
+
+    def start(self):
+        """Start running a round every interval in a daemon thread."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="cache-warmup", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+SCHEDULER = WarmupScheduler()
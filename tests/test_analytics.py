@@ -0,0 +1,104 @@
+import unittest
+
+from lib import analytics
+from lib.topdrawer import Player, School
+
+
+ACC = {"id": 1, "name": "ACC"}
+PSAC = {"id": 2, "name": "PSAC"}
+BIG_TEN = {"id": 3, "name": "Big Ten"}
+ASUN = {"id": 22, "name": "ASUN"}
+
+
+def _schools(*players_by_school):
+    return [
+        School(name=f"School {number}", players=[Player(name=f"P{league}", club=club, league=league, state="CA")
+                                                 for club, league in players])
+        for number, players in enumerate(players_by_school)
+    ]
+
+
+class TestCommitmentTable(unittest.TestCase):
+    def setUp(self):
+        self.table = analytics.CommitmentTable()
+
+        analytics.record_conference(
+            _schools([("A", "ECNL"), ("B", "GA")], [("A", "ECNL")]), "Female", "DI", ACC, 2025, self.table
+        )
+        analytics.record_conference(_schools([("C", "Other")]), "female", "dii", PSAC, 2025, self.table)
+        analytics.record_conference(_schools([("A", "ECNL")]), "male", "di", ACC, 2024, self.table)
+
+    def test_count_and_group(self):
+        total, groups = self.table.count(("league",), gender="female", year=2025)
+
+        self.assertEqual(total, 4)
+        self.assertEqual(groups, [({"league": "ECNL"}, 2), ({"league": "GA"}, 1), ({"league": "Other"}, 1)])
+
+    def test_filters_ignore_case(self):
+        total, groups = self.table.count(("division", "club"), league="ecnl", year="2025")
+
+        self.assertEqual(total, 2)
+        self.assertEqual(groups, [({"division": "di", "club": "A"}, 2)])
+
+    def test_unknown_dimension(self):
+        with self.assertRaises(ValueError):
+            self.table.count(("team",))
+
+    def test_recrawled_conference_replaces_its_rows(self):
+        analytics.record_conference(_schools([("B", "GA")]), "female", "di", ACC, 2025, self.table)
+
+        total, groups = self.table.count(("division", "league"), conference="ACC", gender="female")
+
+        self.assertEqual(total, 1)
+        self.assertEqual(groups, [({"division": "di", "league": "GA"}, 1)])
+
+    def test_partitions_are_keyed_on_the_conference_id_and_canonical_gender(self):
+        # The same page reached as "Women" with another spelling of the name.
+        analytics.record_conference(
+            _schools([("B", "GA")]), "Women", "di", {"id": 1, "name": "ACC"}, "2025", self.table
+        )
+
+        self.assertEqual(self.table.count(conference="ACC", gender="female")[0], 1)
+        self.assertEqual(self.table.get_stats()["partitions"], 3)
+
+    def test_compaction(self):
+        for number in range(30):
+            analytics.record_conference(
+                _schools([("A", "ECNL")] * 100), "female", "di", BIG_TEN, 2020 + number % 2, self.table
+            )
+            analytics.record_conference(
+                _schools([("A", "GA")] * (100 + number)), "female", "di", BIG_TEN, 2020 + number % 2, self.table
+            )
+
+        self.assertLess(self.table._size, 2000)
+        self.assertEqual(self.table.count(("year",), conference="Big Ten")[1], [({"year": 2021}, 129), ({"year": 2020}, 128)])
+        self.assertEqual(self.table.count(conference="ACC")[0], 4)
+
+
+class TestLeagueShares(unittest.TestCase):
+    def test_chart_slices(self):
+        table = analytics.CommitmentTable()
+        analytics.record_conference(
+            _schools([("A", "GA"), ("B", "ECNL")], [("C", "ECNL")]), "female", "di", ASUN, 2023, table
+        )
+
+        self.assertEqual(analytics.get_league_shares("female", "di", "ASUN", 2023, table), [
+            {"name": "ECNL 67%", "league": "ECNL", "value": 2},
+            {"name": "GA 33%", "league": "GA", "value": 1},
+        ])
+        self.assertEqual(analytics.get_league_shares("female", "di", "ASUN", 2024, table), [])
+        self.assertEqual(len(analytics.get_league_shares("Women", "DI", "ASUN", 2023, table)), 2)
+
+    def test_same_named_conferences_of_other_divisions(self):
+        table = analytics.CommitmentTable()
+        independent = {"name": "Independent"}
+        analytics.record_conference(_schools([("A", "GA")]), "female", "di", dict(independent, id=30), 2023, table)
+        analytics.record_conference(_schools([("B", "ECNL")]), "female", "dii", dict(independent, id=31), 2023, table)
+
+        self.assertEqual(analytics.get_league_shares("female", "dii", "Independent", 2023, table), [
+            {"name": "ECNL 100%", "league": "ECNL", "value": 1},
+        ])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import contextlib
+import io
+import unittest
+
+from benchmarks import bench_parsers
+from benchmarks import pages
+
+
+class TestPages(unittest.TestCase):
+    def test_every_fixture_parses(self):
+        with pages.offline(), contextlib.redirect_stdout(io.StringIO()):
+            for page in pages.PAGES:
+                with self.subTest(page=page.name):
+                    self.assertTrue(page.parse_targeted(page.load()))
+
+    def test_nwsl_players_without_a_team_are_skipped(self):
+        players = pages.JSON_PAGES[1].parse_targeted(pages.JSON_PAGES[1].load())
+        self.assertTrue(all(player["team"] is not None for player in players))
+
+
+class TestCompare(unittest.TestCase):
+    def setUp(self):
+        self.baseline = {"pages": {"page": {"p50": 2.0, "peak": 1000}}}
+
+    def test_within_threshold(self):
+        results = {"page": {"p50": 0.022, "peak": 1100}, "new_page": {"p50": 1.0, "peak": 1}}
+        self.assertEqual(bench_parsers.compare(self.baseline, results, 0.01, 0.25), [])
+
+    def test_regression(self):
+        results = {"page": {"p50": 0.03, "peak": 2000}}
+        regressions = bench_parsers.compare(self.baseline, results, 0.01, 0.25)
+
+        self.assertEqual([(name, metric) for name, metric, _ in regressions], [("page", "p50"), ("page", "peak")])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,225 @@
+import io
+import json
+import os
+import tempfile
+import time
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+from flask import Flask, g
+
+from lib import clubs
+
+
+class TestClubRegistry(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "clubs.json")
+        self.calls = 0
+
+        store_url = "sqlite:///" + os.path.join(self.directory.name, "store.sqlite")
+        patcher = mock.patch("common.config.STORE_URL", store_url)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def loader(self):
+        self.calls += 1
+        return [{"name": f"Club {self.calls}"}]
+
+    def write_snapshot(self, data, age=0):
+        with open(self.path, "w") as f:
+            json.dump({"data": data}, f)
+
+        stamp = time.time() - age
+        os.utime(self.path, (stamp, stamp))
+
+    def wait_for_refresh(self, registry):
+        deadline = time.time() + 5
+        registry.get()
+
+        while registry._refreshing and time.time() < deadline:
+            time.sleep(0.01)
+
+    def test_nothing_loaded_until_first_use(self):
+        clubs.ClubRegistry("test", self.path, loader=self.loader)
+        self.assertEqual(self.calls, 0)
+
+    def test_fresh_snapshot_skips_loader(self):
+        self.write_snapshot([{"name": "Snapshot"}])
+        registry = clubs.ClubRegistry("test", self.path, loader=self.loader, max_age=60)
+
+        self.assertEqual(registry.get(), [{"name": "Snapshot"}])
+        self.assertEqual(self.calls, 0)
+
+    def test_missing_snapshot_is_loaded_in_the_background(self):
+        registry = clubs.ClubRegistry("test", self.path, loader=self.loader, max_age=60)
+
+        with mock.patch.object(registry, "refresh_in_background") as refresh:
+            self.assertEqual(registry.get(), [])
+            refresh.assert_called_once_with()
+
+        self.assertEqual(self.calls, 0)
+
+        self.wait_for_refresh(registry)
+
+        self.assertEqual(registry.get(), [{"name": "Club 1"}])
+        with open(self.path) as f:
+            self.assertEqual(json.load(f)["data"], [{"name": "Club 1"}])
+
+    def test_unloaded_clubs_are_not_cached_as_fresh(self):
+        app = Flask(__name__)
+        registry = clubs.ClubRegistry("test", self.path, loader=self.loader, max_age=60)
+
+        with app.test_request_context(), mock.patch.object(registry, "refresh_in_background"):
+            self.assertEqual(registry.get(), [])
+            self.assertIsNone(g.get("cache_entries"))
+
+        self.wait_for_refresh(registry)
+
+        with app.test_request_context():
+            registry.get()
+            self.assertEqual(len(g.cache_entries), 1)
+
+    def test_failed_loads_are_retried_soon(self):
+        def failing_loader():
+            self.calls += 1
+            raise ConnectionError("upstream is down")
+
+        registry = clubs.ClubRegistry("test", self.path, loader=failing_loader, max_age=3600)
+
+        with mock.patch("common.config.CLUB_REGISTRY_RETRY", 60), redirect_stdout(io.StringIO()):
+            self.wait_for_refresh(registry)
+            self.assertLess(registry._retry_at, time.time() + 61)
+            self.assertFalse(registry._is_stale())
+
+            registry._retry_at = 0
+            self.wait_for_refresh(registry)
+
+        self.assertEqual(self.calls, 2)
+        self.assertGreater(registry._retry_at, time.time() + 61)
+        self.assertEqual(registry.get(), [])
+
+    def test_loaded_clubs_outlive_an_unwritable_snapshot(self):
+        self.wait_for_refresh(clubs.ClubRegistry("test", self.path, loader=self.loader, max_age=60))
+        os.remove(self.path)
+
+        registry = clubs.ClubRegistry("test", self.path, loader=self.loader, max_age=60)
+
+        self.assertEqual(registry.get(), [{"name": "Club 1"}])
+        self.assertEqual(self.calls, 1)
+
+    def test_stale_snapshot_is_served_then_refreshed(self):
+        self.write_snapshot([{"name": "Snapshot"}], age=120)
+        registry = clubs.ClubRegistry("test", self.path, loader=self.loader, max_age=60)
+
+        self.assertEqual(registry.get(), [{"name": "Snapshot"}])
+
+        deadline = time.time() + 5
+        while registry.get() == [{"name": "Snapshot"}] and time.time() < deadline:
+            time.sleep(0.01)
+
+        self.assertEqual(registry.get(), [{"name": "Club 1"}])
+        self.assertEqual(registry.version, 2)
+
+        # Let the refresh finish writing before the directory is removed.
+        while registry._refreshing and time.time() < deadline:
+            time.sleep(0.01)
+
+    def test_league_lookups_refresh_stale_clubs(self):
+        self.write_snapshot([{"name": "Snapshot"}])
+        registry = clubs.ClubRegistry("test", self.path, loader=self.loader, max_age=60)
+        index = clubs.LeagueIndex([("ECNL", registry)])
+
+        self.assertEqual(index.get_league("snapshot"), "ECNL")
+
+        registry._loaded_at -= 120
+        with mock.patch.object(registry, "refresh_in_background") as refresh:
+            index.get_league("snapshot")
+
+        refresh.assert_called_once_with()
+
+    def test_without_loader_never_refreshes(self):
+        self.write_snapshot([{"name": "Snapshot"}], age=120)
+        registry = clubs.ClubRegistry("test", self.path, max_age=60)
+
+        self.assertEqual(registry.get(), [{"name": "Snapshot"}])
+        self.assertFalse(registry._refreshing)
+
+
+class _StaticRegistry:
+    def __init__(self, clubs):
+        self.clubs = clubs
+        self.version = 1
+
+    def get(self):
+        return self.clubs
+
+    def refresh_if_stale(self):
+        pass
+
+
+class TestLeagueIndex(unittest.TestCase):
+    def setUp(self):
+        self.ecnl = _StaticRegistry([{"name": "Sting Austin"}, {"name": "Both  Leagues"}])
+        self.ga = _StaticRegistry([{"name": "Beach FC"}, {"name": "Both Leagues"}])
+        self.index = clubs.LeagueIndex([("ECNL", self.ecnl), ("GA", self.ga)])
+
+    def test_lookup_is_normalized(self):
+        self.assertEqual(self.index.get_league("  sting   AUSTIN "), "ECNL")
+        self.assertEqual(self.index.get_league("beach fc"), "GA")
+
+    def test_earlier_registry_wins(self):
+        self.assertEqual(self.index.get_league("Both Leagues"), "ECNL")
+
+    def test_unknown_and_empty(self):
+        self.assertIsNone(self.index.get_league("Nobody FC"))
+        self.assertIsNone(self.index.get_league(""))
+        self.assertIsNone(self.index.get_league(None))
+
+    def test_translations_are_applied(self):
+        """
+        Test that a name from the translation table resolves to the league of its translation.
+        """
+        self.assertEqual(self.index.get_league("Austin Sting"), "ECNL")
+
+    def test_rebuilt_only_when_a_registry_changes(self):
+        first = self.index.get_index()
+        self.assertIs(self.index.get_index(), first)
+
+        self.ga.clubs = [{"name": "New Club"}]
+        self.ga.version += 1
+
+        self.assertEqual(self.index.get_league("new club"), "GA")
+        self.assertIsNone(self.index.get_league("Beach FC"))
+
+    def test_batch(self):
+        result = self.index.get_leagues(["Sting Austin", "Beach FC", "Nobody"])
+        self.assertEqual(result, ["ECNL", "GA", None])
+
+    def test_spelling_variants(self):
+        self.assertEqual(
+            self.index.resolve("Sting Austin SC (TX)"), {"name": "Sting Austin", "league": "ECNL", "confidence": 1.0}
+        )
+        self.assertEqual(self.index.resolve("Beach Futbol Club")["name"], "Beach FC")
+
+        match = self.index.resolve("Stng Austin")
+        self.assertEqual(match["name"], "Sting Austin")
+        self.assertLess(match["confidence"], 1.0)
+
+    def test_close_is_not_enough(self):
+        self.assertIsNone(self.index.resolve("Beach Town"))
+
+        with mock.patch("common.config.CLUB_MATCH_THRESHOLD", 0.1):
+            self.assertEqual(self.index.resolve("Beach Town")["name"], "Beach FC")
+
+    def test_batch_resolution(self):
+        result = self.index.resolve_many(["beach  fc", "Nobody"])
+        self.assertEqual(result, [{"name": "Beach FC", "league": "GA", "confidence": 1.0}, None])
+
+
+if __name__ == '__main__':
+    unittest.main()
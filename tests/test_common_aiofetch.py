@@ -0,0 +1,165 @@
+import tempfile
+import threading
+import time
+import unittest
+import unittest.mock
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from common import aiofetch
+from common import fetch
+from common import pagestore
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        with self.server.lock:
+            self.server.in_flight += 1
+            self.server.peak = max(self.server.peak, self.server.in_flight)
+
+        try:
+            self._respond()
+        finally:
+            with self.server.lock:
+                self.server.in_flight -= 1
+
+    def _respond(self):
+        if self.path == "/missing":
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        if self.path == "/throttled":
+            self.server.throttled += 1
+            if self.server.throttled == 1:
+                self.send_response(503)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+
+        if self.path.startswith("/slow"):
+            time.sleep(0.2)
+
+        body = self.path.encode()
+
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _Server(ThreadingHTTPServer):
+    request_queue_size = 128
+
+
+def _parse(response, suffix=""):
+    return response.text + suffix
+
+
+class TestEngine(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+        patchers = [
+            unittest.mock.patch("common.config.PAGE_STORE_DIR", self.directory.name),
+            unittest.mock.patch("common.config.FETCH_BACKOFF", 0),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        fetch.close()
+        self.server = _Server(("127.0.0.1", 0), _Handler)
+        self.server.lock = threading.Lock()
+        self.server.in_flight = 0
+        self.server.peak = 0
+        self.server.throttled = 0
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+
+    def tearDown(self):
+        aiofetch.close()
+        fetch.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_get(self):
+        response = aiofetch.get(self.url + "/page")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b"/page")
+        self.assertEqual(response.headers["content-length"], "5")
+
+        with self.assertRaises(requests.HTTPError):
+            aiofetch.get(self.url + "/missing").raise_for_status()
+
+    def test_throttled_requests_are_retried_through_the_limiter(self):
+        response = aiofetch.get(self.url + "/throttled")
+
+        self.assertEqual(response.content, b"/throttled")
+
+        stats = fetch.get_stats()[fetch.get_host(self.url)]
+        self.assertEqual((stats["requests"], stats["throttled"], stats["in_flight"]), (2, 1, 0))
+
+    def test_iter_parsed_keeps_order_and_errors(self):
+        urls = [self.url + "/a", self.url + "/missing", self.url + "/b"]
+
+        outcomes = aiofetch.map_parsed(urls, _parse, "!")
+
+        self.assertEqual([result for result, _ in outcomes], ["/a!", None, "/b!"])
+        self.assertIsInstance(outcomes[1][1], requests.HTTPError)
+
+    def test_pages_load_together(self):
+        urls = [f"{self.url}/slow/{page}" for page in range(40)]
+
+        with unittest.mock.patch("common.config.FETCH_MAX_CONCURRENCY", 100), \
+                unittest.mock.patch("common.config.FETCH_BURST", 100):
+            outcomes = aiofetch.map_parsed(urls, _parse)
+
+        self.assertEqual([result for result, _ in outcomes], [f"/slow/{page}" for page in range(40)])
+        self.assertGreater(self.server.peak, 20)
+
+    def test_cache_and_page_store_are_used_off_the_loop(self):
+        threads = []
+
+        class _Cache(dict):
+            def get(self, key):
+                threads.append(threading.current_thread())
+                return super().get(key)
+
+            def set(self, key, value, timeout=None):
+                threads.append(threading.current_thread())
+                self[key] = value
+
+        store = pagestore.get_store()
+        get_record = store.get_record
+
+        def recording_get_record(url):
+            threads.append(threading.current_thread())
+            return get_record(url)
+
+        with unittest.mock.patch.object(fetch, "_get_cache", return_value=_Cache()), \
+                unittest.mock.patch.object(store, "get_record", recording_get_record):
+            self.assertEqual(aiofetch.get_parsed(self.url + "/etag", _parse), "/etag")
+
+        self.assertEqual(len(threads), 2)
+        self.assertNotIn(aiofetch.get_engine().thread, threads)
+
+    def test_fetch_uses_the_engine(self):
+        with unittest.mock.patch("common.config.FETCH_ENGINE", "async"):
+            self.assertIsInstance(fetch.get(self.url + "/page"), aiofetch.Response)
+            self.assertEqual(fetch.get_content(self.url + "/page"), b"/page")
+            self.assertEqual(fetch.map_parsed([self.url + "/a"], _parse), [("/a", None)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+import os
+import tempfile
+import time
+import unittest
+
+from flask import Flask
+from flask_caching import Cache
+
+from common import cache_backends
+
+
+class TestSQLiteCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "cache.sqlite")
+        self.cache = cache_backends.SQLiteCache(self.path)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_get_missing(self):
+        self.assertIsNone(self.cache.get("missing"))
+
+    def test_set_and_get(self):
+        self.cache.set("key", {"name": "value"})
+        self.assertEqual(self.cache.get("key"), {"name": "value"})
+
+    def test_shared_between_instances(self):
+        """
+        Test that a value written by one instance is visible to another instance on the same file.
+        """
+        self.cache.set("key", [1, 2, 3])
+        other = cache_backends.SQLiteCache(self.path)
+        self.assertEqual(other.get("key"), [1, 2, 3])
+
+    def test_expired_entries_are_misses(self):
+        self.cache.set("key", "value", timeout=1)
+        self.cache._connection().execute("UPDATE entries SET expires = ?", (time.time() - 1,))
+        self.assertIsNone(self.cache.get("key"))
+        self.assertFalse(self.cache.has("key"))
+
+    def test_add_only_when_absent_or_expired(self):
+        self.assertTrue(self.cache.add("key", "first"))
+        self.assertFalse(self.cache.add("key", "second"))
+        self.assertEqual(self.cache.get("key"), "first")
+
+        self.cache._connection().execute("UPDATE entries SET expires = ?", (time.time() - 1,))
+        self.assertTrue(self.cache.add("key", "third"))
+        self.assertEqual(self.cache.get("key"), "third")
+
+    def test_delete_and_clear(self):
+        self.cache.set("a", 1)
+        self.cache.set("b", 2)
+        self.assertTrue(self.cache.delete("a"))
+        self.assertFalse(self.cache.delete("a"))
+        self.cache.clear()
+        self.assertIsNone(self.cache.get("b"))
+
+    def test_inc_and_dec(self):
+        self.assertEqual(self.cache.inc("counter"), 1)
+        self.assertEqual(self.cache.inc("counter", 5), 6)
+        self.assertEqual(self.cache.dec("counter", 2), 4)
+
+
+class TestRedisCacheWithLocalStandIn(unittest.TestCase):
+    def setUp(self):
+        app = Flask(__name__)
+        self.cache = Cache()
+        self.cache.init_app(app, {
+            "CACHE_TYPE": "common.cache_backends.RedisCache",
+            "CACHE_REDIS_CLIENT": "common.cache_backends.LocalRedis",
+        })
+        self.app = app
+
+    def test_memoize_fills_once(self):
+        calls = []
+
+        @self.cache.memoize(timeout=60)
+        def double(value):
+            calls.append(value)
+            return value * 2
+
+        with self.app.app_context():
+            self.assertEqual(double(2), 4)
+            self.assertEqual(double(2), 4)
+
+        self.assertEqual(calls, [2])
+
+    def test_add_and_delete(self):
+        with self.app.app_context():
+            self.assertTrue(self.cache.add("key", "first"))
+            self.assertFalse(self.cache.add("key", "second"))
+            self.assertEqual(self.cache.get("key"), "first")
+            self.assertTrue(self.cache.delete("key"))
+            self.assertIsNone(self.cache.get("key"))
+
+
+class TestGetCacheConfig(unittest.TestCase):
+    def setUp(self):
+        self.saved = os.environ.get("SOCCER_API_CACHE_TYPE")
+
+    def tearDown(self):
+        if self.saved is None:
+            os.environ.pop("SOCCER_API_CACHE_TYPE", None)
+        else:
+            os.environ["SOCCER_API_CACHE_TYPE"] = self.saved
+
+    def test_default_is_simple(self):
+        os.environ.pop("SOCCER_API_CACHE_TYPE", None)
+        self.assertEqual(cache_backends.get_cache_config()["CACHE_TYPE"], "SimpleCache")
+
+    def test_short_name(self):
+        os.environ["SOCCER_API_CACHE_TYPE"] = "sqlite"
+        settings = cache_backends.get_cache_config()
+        self.assertEqual(settings["CACHE_TYPE"], "common.cache_backends.SQLiteCache")
+        self.assertIn("CACHE_SQLITE_PATH", settings)
+
+
+if __name__ == '__main__':
+    unittest.main()
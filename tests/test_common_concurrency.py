@@ -0,0 +1,73 @@
+import threading
+import time
+import unittest
+
+from common import concurrency
+
+
+class TestFanOut(unittest.TestCase):
+    def test_empty(self):
+        result = concurrency.fan_out(lambda item: item, [])
+        self.assertEqual(result, [])
+
+    def test_preserves_order(self):
+        """
+        Test that the results come back in input order even when later items finish first.
+        """
+        def slow_for_small(item):
+            time.sleep(0.01 * (5 - item))
+            return item * 2
+
+        result = concurrency.fan_out(slow_for_small, [1, 2, 3, 4], max_workers=4)
+        self.assertEqual(result, [(2, None), (4, None), (6, None), (8, None)])
+
+    def test_failure_is_reported_per_item(self):
+        def fail_on_two(item):
+            if item == 2:
+                raise ValueError("bad item")
+            return item
+
+        result = concurrency.fan_out(fail_on_two, [1, 2, 3], max_workers=2)
+
+        self.assertEqual(result[0], (1, None))
+        self.assertIsNone(result[1][0])
+        self.assertIsInstance(result[1][1], ValueError)
+        self.assertEqual(result[2], (3, None))
+
+    def test_worker_count_is_bounded(self):
+        lock = threading.Lock()
+        state = {"active": 0, "peak": 0}
+
+        def track(item):
+            with lock:
+                state["active"] += 1
+                state["peak"] = max(state["peak"], state["active"])
+            time.sleep(0.01)
+            with lock:
+                state["active"] -= 1
+            return item
+
+        concurrency.fan_out(track, range(20), max_workers=3)
+        self.assertLessEqual(state["peak"], 3)
+
+
+class TestFanOutIter(unittest.TestCase):
+    def test_yields_in_order_before_all_items_finish(self):
+        release = threading.Event()
+
+        def wait_for_last(item):
+            if item == 3:
+                release.wait(5)
+            return item * 2
+
+        outcomes = concurrency.fan_out_iter(wait_for_last, [1, 2, 3], max_workers=3)
+
+        self.assertEqual(next(outcomes), (2, None))
+        self.assertEqual(next(outcomes), (4, None))
+
+        release.set()
+        self.assertEqual(list(outcomes), [(6, None)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import unittest
+from unittest import mock
+
+from flask import Flask
+from flask_caching import Cache
+from flask_restx import Api, Resource, fields
+
+from common import conditional
+from common import marshalling
+from common import memo
+
+ns = marshalling.Namespace("test")
+
+record_model = ns.model("Record", {"name": fields.String()})
+
+cache = Cache()
+
+calls = []
+
+
+@memo.memoize(timeout=100, cache=cache)
+def get_records(name: str):
+    calls.append(name)
+    return [{"name": name}]
+
+
+@ns.route("/records/<string:name>")
+class Records(Resource):
+    @ns.marshal_list_with(record_model)
+    def get(self, name: str):
+        return get_records(name)
+
+
+@ns.route("/uncached")
+class Uncached(Resource):
+    @ns.marshal_list_with(record_model)
+    def get(self):
+        return [{"name": "plain"}]
+
+
+class TestConditionalResponses(unittest.TestCase):
+    def setUp(self):
+        app = Flask(__name__)
+        cache.init_app(app, {"CACHE_TYPE": "SimpleCache"})
+        api = Api(app)
+        api.add_namespace(ns, path="/test")
+        app.after_request(conditional.add_validators)
+        self.client = app.test_client()
+
+        with app.app_context():
+            cache.clear()
+
+        self.now = 1000.0
+        patcher = mock.patch.object(memo, "_now", lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_headers_from_the_cache_entry(self):
+        response = self.client.get("/test/records/a")
+
+        self.assertTrue(response.headers["ETag"].startswith('W/"'))
+        self.assertEqual(response.headers["Cache-Control"], "public, max-age=100")
+        self.assertIn("Last-Modified", response.headers)
+
+        self.now += 40
+        response = self.client.get("/test/records/a")
+
+        self.assertEqual(response.headers["Cache-Control"], "public, max-age=60")
+
+    def test_not_modified_without_serializing(self):
+        etag = self.client.get("/test/records/b").headers["ETag"]
+
+        with mock.patch.object(marshalling, "marshal") as marshal:
+            response = self.client.get("/test/records/b", headers={"If-None-Match": etag})
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b"")
+        self.assertEqual(response.headers["ETag"], etag)
+        marshal.assert_not_called()
+
+    def test_recomputed_value_changes_the_etag(self):
+        etag = self.client.get("/test/records/c").headers["ETag"]
+
+        # Past max_stale, so the value is recomputed for this request.
+        self.now += 10 ** 6
+        response = self.client.get("/test/records/c", headers={"If-None-Match": etag})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+
+    def test_body_hash_without_cache_entries(self):
+        response = self.client.get("/test/uncached")
+
+        self.assertEqual(response.headers["Cache-Control"], "no-cache")
+
+        response = self.client.get("/test/uncached", headers={"If-None-Match": response.headers["ETag"]})
+
+        self.assertEqual(response.status_code, 304)
+
+
+if __name__ == '__main__':
+    unittest.main()
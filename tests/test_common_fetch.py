@@ -0,0 +1,178 @@
+import tempfile
+import threading
+import unittest
+import unittest.mock
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+from flask import Flask
+from flask_caching import Cache
+
+from common import fetch
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b"hello"
+
+        if self.path == "/throttled":
+            self.server.throttled += 1
+            if self.server.throttled == 1:
+                self.send_response(429)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+
+        if self.path == "/etag":
+            if self.headers.get("If-None-Match") == '"v1"':
+                self.send_response(304)
+                self.send_header("ETag", '"v1"')
+                self.end_headers()
+                return
+
+            self.send_response(200)
+            self.send_header("ETag", '"v1"')
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestGetHost(unittest.TestCase):
+    def test_host(self):
+        result = fetch.get_host("https://www.TopDrawerSoccer.com/search/?query=")
+        self.assertEqual(result, "www.topdrawersoccer.com")
+
+
+class _ServerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        patcher = unittest.mock.patch("common.config.PAGE_STORE_DIR", self.directory.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.directory.cleanup)
+
+        fetch.close()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.server.throttled = 0
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}/page"
+
+    def tearDown(self):
+        fetch.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class TestGet(_ServerTestCase):
+    def test_reuses_connections(self):
+        """
+        Test that sequential requests to one host share a single pooled connection.
+        """
+        for _ in range(5):
+            response = fetch.get(self.url)
+            self.assertEqual(response.content, b"hello")
+
+        stats = fetch.get_stats()[fetch.get_host(self.url)]
+        self.assertEqual(stats["requests"], 5)
+        self.assertEqual(stats["errors"], 0)
+        self.assertEqual(stats["bytes"], 25)
+        self.assertEqual(stats["connections"], 1)
+
+    def test_throttled_requests_are_retried_through_the_limiter(self):
+        url = self.url.replace("/page", "/throttled")
+
+        with unittest.mock.patch("common.config.FETCH_BACKOFF", 0):
+            response = fetch.get(url)
+
+        self.assertEqual(response.content, b"hello")
+
+        stats = fetch.get_stats()[fetch.get_host(url)]
+        self.assertEqual(stats["requests"], 2)
+        self.assertEqual(stats["throttled"], 1)
+        self.assertEqual(stats["queue"], 0)
+
+
+def _parse(response, suffix):
+    _parse.calls += 1
+    return response.content.decode() + suffix
+
+
+class TestGetParsed(_ServerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.url = f"http://127.0.0.1:{self.server.server_port}/etag"
+
+        app = Flask(__name__)
+        self.cache = Cache()
+        self.cache.init_app(app, {"CACHE_TYPE": "SimpleCache"})
+        self.context = app.app_context()
+        self.context.push()
+
+        _parse.calls = 0
+
+    def tearDown(self):
+        self.context.pop()
+        super().tearDown()
+
+    def test_not_modified(self):
+        """
+        Test that a 304 answer returns the stored result without parsing the page again.
+        """
+        with unittest.mock.patch("common.fetch.cache", self.cache):
+            self.assertEqual(fetch.get_parsed(self.url, _parse, "!"), "hello!")
+            self.assertEqual(fetch.get_parsed(self.url, _parse, "!"), "hello!")
+
+        self.assertEqual(_parse.calls, 1)
+
+        stats = fetch.get_stats()[fetch.get_host(self.url)]
+        self.assertEqual(stats["requests"], 2)
+        self.assertEqual(stats["not_modified"], 1)
+        self.assertEqual(stats["bytes_saved"], 5)
+
+    def test_cold_cache_parses_the_stored_page(self):
+        """
+        Test that without a cached result a 304 answer is parsed from the page store.
+        """
+        with unittest.mock.patch("common.fetch.cache", self.cache):
+            fetch.get_parsed(self.url, _parse, "!")
+            self.cache.clear()
+
+            self.assertEqual(fetch.get_parsed(self.url, _parse, "?"), "hello?")
+
+        self.assertEqual(_parse.calls, 2)
+        self.assertEqual(fetch.get_stats()[fetch.get_host(self.url)]["not_modified"], 1)
+
+
+class TestPageStore(_ServerTestCase):
+    def test_get_content_revalidates(self):
+        url = self.url.replace("/page", "/etag")
+
+        self.assertEqual(fetch.get_content(url), b"hello")
+        self.assertEqual(fetch.get_content(url), b"hello")
+        self.assertEqual(fetch.get_stats()[fetch.get_host(url)]["not_modified"], 1)
+
+    def test_offline(self):
+        fetch.get(self.url)
+
+        with unittest.mock.patch("common.config.FETCH_OFFLINE", True):
+            self.server.shutdown()
+            self.assertEqual(fetch.get(self.url).content, b"hello")
+
+            with self.assertRaises(requests.ConnectionError):
+                fetch.get(self.url + "/missing")
+
+
+if __name__ == '__main__':
+    unittest.main()
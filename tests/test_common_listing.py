@@ -0,0 +1,87 @@
+import unittest
+
+from flask import Flask
+from flask_restx import Api, Namespace, Resource, fields
+
+from common import listing
+
+ns = Namespace("test")
+
+team_model = ns.model("Team", {"name": fields.String(), "city": fields.String()})
+
+club_model = ns.model(
+    "Club", {"name": fields.String(), "state": fields.String(), "team": fields.Nested(team_model)}
+)
+
+CLUBS = [
+    {"name": f"Club {number}", "state": "TX" if number % 2 else "CA", "team": {"name": f"Team {number}", "city": "X"}}
+    for number in range(10)
+]
+
+
+@ns.route("/clubs")
+class Clubs(Resource):
+    @listing.marshal_list_with(ns, club_model, {"state": "state", "team": "team.name"})
+    def get(self):
+        return CLUBS
+
+
+class TestMarshalListWith(unittest.TestCase):
+    def setUp(self):
+        app = Flask(__name__)
+        api = Api(app)
+        api.add_namespace(ns, path="/test")
+        self.client = app.test_client()
+
+    def test_everything_by_default(self):
+        response = self.client.get("/test/clubs")
+
+        self.assertEqual(len(response.json), 10)
+        self.assertEqual(response.headers["X-Total-Count"], "10")
+        self.assertNotIn("X-Next-Cursor", response.headers)
+
+    def test_pages(self):
+        names = []
+        url = "/test/clubs?limit=4"
+
+        while True:
+            response = self.client.get(url)
+            names.extend(club["name"] for club in response.json)
+
+            if "X-Next-Cursor" not in response.headers:
+                break
+
+            url = "/test/clubs?limit=4&cursor=" + response.headers["X-Next-Cursor"]
+
+        self.assertEqual(names, [club["name"] for club in CLUBS])
+
+    def test_filters(self):
+        response = self.client.get("/test/clubs?state=tx&limit=2")
+
+        self.assertEqual([club["name"] for club in response.json], ["Club 1", "Club 3"])
+        self.assertEqual(response.headers["X-Total-Count"], "5")
+
+        response = self.client.get("/test/clubs?team=Team 4")
+
+        self.assertEqual([club["name"] for club in response.json], ["Club 4"])
+
+    def test_fields(self):
+        response = self.client.get("/test/clubs?limit=1&fields=name,team{city}")
+
+        self.assertEqual(response.json, [{"name": "Club 0", "team": {"city": "X"}}])
+
+    def test_bad_queries(self):
+        for query in ("limit=0", "limit=many", "cursor=%21%21", "fields=nickname"):
+            with self.subTest(query=query):
+                response = self.client.get("/test/clubs?" + query)
+
+                self.assertEqual(response.status_code, 400)
+
+
+class TestCursor(unittest.TestCase):
+    def test_round_trip(self):
+        self.assertEqual(listing.decode_cursor(listing.encode_cursor(120)), 120)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+
+import flask_restx
+from flask import Flask
+from flask_restx import Api, Resource, fields
+
+from common import marshalling
+
+ns = marshalling.Namespace("test")
+
+team_model = ns.model("Team", {"name": fields.String(), "founded": fields.Integer(default=-1)})
+
+player_model = ns.model(
+    "Player",
+    {
+        "name": fields.String(),
+        "number": fields.Integer(),
+        "height": fields.Float(),
+        "active": fields.Boolean(),
+        "extra": fields.Raw(),
+        "nickname": fields.String(default="none"),
+        "team": fields.Nested(team_model),
+        "teams": fields.List(fields.Nested(team_model)),
+    },
+)
+
+PLAYERS = [
+    {
+        "name": "Ann", "number": "9", "height": 1.7, "active": 1, "extra": [1, 2], "unused": True,
+        "team": {"name": "Dash", "founded": "2013"}, "teams": [{"name": "Dash"}, None],
+    },
+    {"name": None, "number": None, "team": None, "teams": None},
+    {},
+]
+
+
+@ns.route("/players")
+class Players(Resource):
+    @ns.marshal_list_with(player_model)
+    def get(self):
+        return PLAYERS
+
+
+class TestMarshal(unittest.TestCase):
+    def test_same_as_flask_restx(self):
+        self.assertIsNotNone(marshalling.compile_model(player_model))
+
+        for player in PLAYERS:
+            with self.subTest(player=player):
+                self.assertEqual(marshalling.marshal(player, player_model), flask_restx.marshal(player, player_model))
+
+    def test_unsupported_models_fall_back(self):
+        model = ns.model("Renamed", {"name": fields.String(attribute="title"), "born": fields.DateTime()})
+
+        self.assertIsNone(marshalling.compile_model(model))
+        self.assertEqual(marshalling.marshal({"title": "Ann"}, model), {"name": "Ann", "born": None})
+
+    def test_unsupported_values_fall_back(self):
+        class Player:
+            name = "Ann"
+
+        self.assertEqual(marshalling.marshal([Player()], player_model), flask_restx.marshal([Player()], player_model))
+
+        with self.assertRaises(flask_restx.fields.MarshallingError):
+            marshalling.marshal({"number": "nine"}, player_model)
+
+
+class TestNamespace(unittest.TestCase):
+    def setUp(self):
+        app = Flask(__name__)
+        self.api = Api(app)
+        self.api.add_namespace(ns, path="/test")
+        self.client = app.test_client()
+
+    def test_response(self):
+        response = self.client.get("/test/players")
+
+        self.assertEqual(response.json, flask_restx.marshal(PLAYERS, player_model))
+
+    def test_mask_header(self):
+        response = self.client.get("/test/players", headers={"X-Fields": "name"})
+
+        self.assertEqual(response.json, [{"name": "Ann"}, {"name": None}, {"name": None}])
+
+    def test_documented_model(self):
+        responses = self.client.get("/swagger.json").json["paths"]["/test/players"]["get"]["responses"]
+
+        self.assertEqual(responses["200"]["schema"]["items"]["$ref"], "#/definitions/Player")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+
+from common import matching
+
+
+class TestClubKey(unittest.TestCase):
+    def test_spelling_variants_share_a_key(self):
+        names = ["So Cal Blues", "SoCal Blues SC", "so cal  blues soccer club", "So-Cal Blues (CA)"]
+
+        self.assertEqual({matching.club_key(name) for name in names}, {"socalblues"})
+
+    def test_noise_only_name_is_kept(self):
+        self.assertEqual(matching.club_key("Soccer Club"), "soccerclub")
+        self.assertEqual(matching.club_key(None), "")
+        self.assertEqual(matching.club_key("  "), "")
+
+    def test_accents(self):
+        self.assertEqual(matching.club_key("Atlético FC"), "atletico")
+
+
+class TestNgramIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = matching.NgramIndex()
+        self.index.add("Sting Austin", "first")
+        self.index.add("Sting Austin FC", "duplicate")
+        self.index.add("Solar SC", "solar")
+
+    def test_exact_key(self):
+        self.assertEqual(len(self.index), 2)
+        self.assertEqual(self.index.search("sting austin sc"), ("first", 1.0))
+
+    def test_closest_name(self):
+        value, score = self.index.search("Sting Austen")
+
+        self.assertEqual(value, "first")
+        self.assertGreater(score, 0.6)
+        self.assertLess(score, 1.0)
+
+    def test_nothing_alike(self):
+        self.assertEqual(self.index.search("XYZ"), (None, 0.0))
+        self.assertEqual(self.index.search(""), (None, 0.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,219 @@
+import os
+import threading
+import time
+import unittest
+from unittest import mock
+
+from flask import Flask
+from flask_caching import Cache
+
+from common import memo
+
+
+class TestMemoize(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.cache = Cache()
+        self.cache.init_app(self.app, {"CACHE_TYPE": "SimpleCache"})
+
+        self.now = 1000.0
+        patcher = mock.patch("common.memo._now", lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.calls = []
+        self.refreshed = threading.Event()
+
+        @memo.memoize(timeout=60, max_stale=600, cache=self.cache)
+        def scrape(name):
+            self.calls.append(name)
+            self.refreshed.set()
+            return f"{name} {len(self.calls)}"
+
+        self.scrape = scrape
+
+    def test_fresh(self):
+        self.assertEqual(self.scrape("a"), "a 1")
+        self.assertEqual(self.scrape("a"), "a 1")
+        self.assertEqual(self.scrape("b"), "b 2")
+
+    def test_stale_value_served_while_refreshing(self):
+        """
+        Test that an expired value is returned at once and replaced by one background refresh.
+        """
+        self.scrape("a")
+        self.refreshed.clear()
+        self.now += 120
+
+        self.assertEqual(self.scrape("a"), "a 1")
+        self.assertTrue(self.refreshed.wait(5))
+
+        for _ in range(50):
+            if self.scrape("a") == "a 2":
+                break
+            time.sleep(0.01)
+
+        self.assertEqual(self.scrape("a"), "a 2")
+        self.assertEqual(self.calls, ["a", "a"])
+
+    def test_too_stale_value_is_recomputed(self):
+        self.scrape("a")
+        self.now += 1000
+
+        self.assertEqual(self.scrape("a"), "a 2")
+
+    def test_refreshing_recomputes_entries_about_to_expire(self):
+        self.scrape("a")
+        self.now += 50
+
+        self.assertEqual(self.scrape("a"), "a 1")
+
+        with memo.refreshing(30):
+            self.assertEqual(self.scrape("a"), "a 2")
+
+    def test_iterate(self):
+        """
+        Test that iterate streams a miss, caches the complete list and then replays it.
+        """
+        @memo.memoize(timeout=60, cache=self.cache)
+        def crawl(count):
+            return list(range(count))
+
+        def load(count):
+            self.calls.append(count)
+            yield from range(count)
+
+        self.assertEqual(list(memo.iterate(crawl, load, 3)), [0, 1, 2])
+        self.assertEqual(list(memo.iterate(crawl, load, 3)), [0, 1, 2])
+        self.assertEqual(crawl(3), [0, 1, 2])
+        self.assertEqual(self.calls, [3])
+
+    def test_key_shares_entries(self):
+        """
+        Test that calls with the same key share one entry, and that every lookup is counted.
+        """
+        @memo.memoize(timeout=60, max_stale=600, cache=self.cache, key=lambda gender, name: gender.lower())
+        def scrape(gender, name):
+            self.calls.append(name)
+            return gender.lower()
+
+        self.assertEqual(scrape("Female", "ACC"), "female")
+        self.assertEqual(scrape("female", "acc"), "female")
+        self.now += 120
+        self.assertEqual(scrape("FEMALE", "Acc"), "female")
+
+        self.assertEqual(self.calls[0], "ACC")
+
+        stats = memo.get_stats()[scrape.__module__ + "." + scrape.__qualname__]
+        self.assertEqual((stats["misses"], stats["hits"], stats["stale"], stats["lookups"]), (1, 1, 1, 3))
+        self.assertEqual(stats["ratio"], 0.667)
+
+    def test_age_header(self):
+        self.scrape("a")
+        self.now += 120
+
+        @self.app.route("/")
+        def index():
+            return self.scrape("a")
+
+        self.app.after_request(memo.add_age_header)
+
+        response = self.app.test_client().get("/")
+
+        self.assertEqual(response.headers["Age"], "120")
+
+
+class TestSingleFlight(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.cache = Cache()
+        self.cache.init_app(self.app, {"CACHE_TYPE": "SimpleCache"})
+
+        self.calls = 0
+        self.release = threading.Event()
+
+        @memo.memoize(timeout=60, cache=self.cache)
+        def crawl(name):
+            self.calls += 1
+            self.release.wait(5)
+            if name == "broken":
+                raise RuntimeError("upstream is down")
+            return name.upper()
+
+        self.crawl = crawl
+
+    def _call_concurrently(self, name, count=5):
+        results = []
+
+        def run():
+            try:
+                results.append(self.crawl(name))
+            except RuntimeError as err:
+                results.append(err)
+
+        threads = [threading.Thread(target=run) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+
+        time.sleep(0.1)
+        self.release.set()
+
+        for thread in threads:
+            thread.join(5)
+
+        return results
+
+    def test_concurrent_misses_share_one_computation(self):
+        self.assertEqual(self._call_concurrently("acc"), ["ACC"] * 5)
+        self.assertEqual(self.calls, 1)
+
+    def test_concurrent_misses_share_the_exception(self):
+        results = self._call_concurrently("broken")
+
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(len(results), 5)
+        self.assertTrue(all(isinstance(result, RuntimeError) for result in results))
+
+    def test_lease_is_renewed_while_computing(self):
+        """
+        Test that the lease outlives its timeout while the computation runs and goes when it ends.
+        """
+        key = self.crawl.make_key("acc")
+        leased = []
+
+        def other_worker():
+            # The cache counts whole seconds: past the lease however it was rounded.
+            time.sleep(2.5)
+            leased.append(self.cache.cache.get(key + ":flight"))
+            self.release.set()
+
+        threading.Thread(target=other_worker).start()
+
+        with mock.patch("common.config.MEMO_FLIGHT_LEASE", 2):
+            self.assertEqual(self.crawl("acc"), "ACC")
+
+        self.assertEqual(leased, [os.getpid()])
+        self.assertIsNone(self.cache.cache.get(key + ":flight"))
+
+    def test_waits_for_another_worker(self):
+        """
+        Test that a miss leased by another worker is read from the cache instead of recomputed.
+        """
+        key = self.crawl.make_key("acc")
+        self.cache.cache.add(key + ":flight", 1)
+
+        def other_worker():
+            time.sleep(0.1)
+            self.cache.cache.set(key, {"value": "FROM WORKER", "created": time.time()})
+            self.cache.cache.delete(key + ":flight")
+
+        threading.Thread(target=other_worker).start()
+
+        with mock.patch("common.config.MEMO_FLIGHT_POLL", 0.01):
+            self.assertEqual(self.crawl("acc"), "FROM WORKER")
+
+        self.assertEqual(self.calls, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from common import pagestore
+
+
+class TestPageStore(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.store = pagestore.PageStore(self.directory.name)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_missing(self):
+        self.assertIsNone(self.store.get("https://example.com/"))
+
+    def test_put_and_get(self):
+        digest = self.store.put("https://example.com/", b"<html></html>", {"etag": '"v1"', "Server": "x"})
+        page = self.store.get("https://example.com/")
+
+        self.assertEqual(page.content, b"<html></html>")
+        self.assertEqual(page.headers["ETag"], '"v1"')
+        self.assertNotIn("Server", page.headers)
+        self.assertEqual(self.store.read(digest), b"<html></html>")
+
+    def test_identical_bodies_are_stored_once(self):
+        first = self.store.put("https://example.com/a", b'{"data": []}')
+        second = self.store.put("https://example.com/b", b'{"data": []}')
+
+        self.assertEqual(first, second)
+        self.assertEqual(self.store.get("https://example.com/b").json(), {"data": []})
+
+        objects = [name for _, _, names in os.walk(os.path.join(self.directory.name, "objects")) for name in names]
+        self.assertEqual(len(objects), 1)
+        urls = sorted(record["url"] for record in self.store.records())
+        self.assertEqual(urls, ["https://example.com/a", "https://example.com/b"])
+
+
+class TestPrune(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def put(self, store, url: str, content: bytes, age: float):
+        with mock.patch("time.time", return_value=time.time() - age):
+            store.put(url, content)
+
+    def objects(self):
+        return [name for _, _, names in os.walk(os.path.join(self.directory.name, "objects")) for name in names]
+
+    def test_old_pages_are_dropped(self):
+        store = pagestore.PageStore(self.directory.name, max_bytes=0, max_age=60)
+        self.put(store, "https://example.com/old", b"old", 120)
+        self.put(store, "https://example.com/new", b"new", 0)
+
+        self.assertEqual(store.prune(), 1)
+
+        self.assertIsNone(store.get("https://example.com/old"))
+        self.assertEqual(store.get("https://example.com/new").content, b"new")
+        self.assertEqual(len(self.objects()), 1)
+
+    def test_oldest_pages_are_dropped_to_fit(self):
+        store = pagestore.PageStore(self.directory.name, max_bytes=0, max_age=0)
+        for number, age in enumerate((30, 20, 10)):
+            self.put(store, f"https://example.com/{number}", os.urandom(1000), age)
+
+        store.max_bytes = 2500
+        self.assertEqual(store.prune(), 1)
+
+        self.assertEqual(sorted(record["url"] for record in store.records()), [
+            "https://example.com/1", "https://example.com/2"
+        ])
+
+    def test_bodies_shared_or_replaced(self):
+        store = pagestore.PageStore(self.directory.name, max_bytes=0, max_age=60)
+        self.put(store, "https://example.com/a", b"shared", 120)
+        self.put(store, "https://example.com/b", b"shared", 0)
+        self.put(store, "https://example.com/c", b"first", 0)
+        self.put(store, "https://example.com/c", b"second", 0)
+
+        # The replaced body is only removed once it is no longer being written.
+        with mock.patch.object(store, "ORPHAN_GRACE", -1):
+            store.prune()
+
+        self.assertEqual(store.get("https://example.com/b").content, b"shared")
+        self.assertEqual(len(self.objects()), 2)
+
+    def test_writes_start_a_prune(self):
+        store = pagestore.PageStore(self.directory.name, max_bytes=1000, max_age=0)
+
+        with mock.patch.object(store, "prune") as prune:
+            store.put("https://example.com/a", os.urandom(200))
+
+            deadline = time.time() + 5
+            while store._pruning and time.time() < deadline:
+                time.sleep(0.01)
+
+        prune.assert_called_once_with()
+
+
+if __name__ == '__main__':
+    unittest.main()
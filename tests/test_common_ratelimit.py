@@ -0,0 +1,82 @@
+import threading
+import time
+import unittest
+from unittest import mock
+
+from common import ratelimit
+
+
+class TestParseRetryAfter(unittest.TestCase):
+    def test_seconds(self):
+        self.assertEqual(ratelimit.parse_retry_after("3"), 3.0)
+
+    def test_date(self):
+        self.assertEqual(ratelimit.parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT"), 0.0)
+
+    def test_invalid(self):
+        self.assertIsNone(ratelimit.parse_retry_after("soon"))
+        self.assertIsNone(ratelimit.parse_retry_after(None))
+
+
+class TestHostLimiter(unittest.TestCase):
+    def test_token_bucket(self):
+        """
+        Test that requests beyond the burst are spaced out at the rate.
+        """
+        limiter = ratelimit.HostLimiter(rate=20, burst=2, max_concurrency=10)
+
+        started = time.monotonic()
+        for _ in range(4):
+            limiter.release(limiter.acquire(), 200)
+
+        self.assertGreaterEqual(time.monotonic() - started, 0.08)
+
+    def test_backs_off_when_throttled(self):
+        limiter = ratelimit.HostLimiter(rate=8, burst=8, max_concurrency=8)
+
+        limiter.release(limiter.acquire(), 429)
+        limiter.release(limiter.acquire(), 503)
+
+        stats = limiter.get_stats()
+        self.assertEqual(stats["rate"], 2)
+        self.assertEqual(stats["concurrency"], 2)
+        self.assertEqual(stats["throttled"], 2)
+
+    def test_retry_after_pauses_the_host(self):
+        limiter = ratelimit.HostLimiter(rate=100, burst=100, max_concurrency=8)
+
+        limiter.release(limiter.acquire(), 429, "1")
+
+        self.assertGreater(limiter.get_stats()["paused"], 0.5)
+
+    def test_ramps_up_while_healthy(self):
+        limiter = ratelimit.HostLimiter(rate=1, burst=100, max_concurrency=4)
+        limiter.concurrency = 1
+
+        with mock.patch("common.config.FETCH_RATE_STEP", 0.5):
+            for _ in range(4):
+                limiter.release(limiter.acquire(), 200)
+
+        stats = limiter.get_stats()
+        self.assertEqual(stats["rate"], 3)
+        self.assertEqual(stats["concurrency"], 3)
+
+    def test_queue_depth(self):
+        limiter = ratelimit.HostLimiter(rate=100, burst=100, max_concurrency=1)
+        first = limiter.acquire()
+
+        waiter = threading.Thread(target=lambda: limiter.release(limiter.acquire(), 200))
+        waiter.start()
+        time.sleep(0.05)
+
+        self.assertEqual(limiter.get_stats()["queue"], 1)
+        self.assertEqual(limiter.get_stats()["in_flight"], 1)
+
+        limiter.release(first, 200)
+        waiter.join(1)
+
+        self.assertEqual(limiter.get_stats()["queue"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import pickle
+import unittest
+
+import flask_restx
+from flask_restx import fields
+
+from common import marshalling
+from common.records import Record
+
+
+class Player(Record):
+    __slots__ = ("name", "state", "club", "teams")
+
+    INTERNED = ("state",)
+
+
+player_model = {"name": fields.String(), "state": fields.String(), "club": fields.String(default="Other")}
+
+
+class TestRecord(unittest.TestCase):
+    def setUp(self):
+        self.player = Player(name="Ann", state="".join(["T", "X"]))
+
+    def test_reads_like_a_dict(self):
+        self.assertEqual(self.player["name"], "Ann")
+        self.assertEqual(self.player.get("club", "Other"), "Other")
+        self.assertIn("state", self.player)
+        self.assertNotIn("club", self.player)
+        self.assertEqual(sorted(self.player), ["name", "state"])
+
+        with self.assertRaises(KeyError):
+            self.player["club"]
+
+    def test_updates_like_a_dict(self):
+        self.player["club"] = "Dash"
+        self.assertEqual(self.player.to_dict(), {"name": "Ann", "state": "TX", "club": "Dash"})
+
+        with self.assertRaises(KeyError):
+            self.player["nickname"] = "A"
+
+    def test_equality(self):
+        self.assertEqual(self.player, Player(name="Ann", state="TX"))
+        self.assertEqual(self.player, {"name": "Ann", "state": "TX", "club": None})
+        self.assertNotEqual(self.player, Player(name="Bea", state="TX"))
+
+    def test_nested_records(self):
+        self.player["teams"] = [Player(name="Dash")]
+
+        self.assertEqual(self.player.to_dict()["teams"], [{"name": "Dash"}])
+
+    def test_interned_after_a_cache_read(self):
+        player = pickle.loads(pickle.dumps(self.player))
+
+        self.assertEqual(player, self.player)
+        self.assertIs(player["state"], self.player["state"])
+
+    def test_marshalled_like_a_dict(self):
+        model = flask_restx.Model("Player", player_model)
+
+        self.assertEqual(
+            marshalling.marshal([self.player], model), flask_restx.marshal([self.player.to_dict()], model)
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import contextlib
+import io
+import json
+import unittest
+
+from flask import Flask
+from flask_restx import Api, Namespace, Resource, fields
+
+from common import streaming
+
+ns = Namespace("test")
+
+record_model = ns.model("Record", {"name": fields.String(), "value": fields.Integer()})
+
+RECORDS = [{"name": "a", "value": 1, "hidden": True}, {"name": "b", "value": 2}]
+
+
+def _generate(broken: str):
+    if broken == "first":
+        raise RuntimeError("upstream is down")
+
+    yield RECORDS[0]
+
+    if broken == "later":
+        raise RuntimeError("lost the connection")
+
+    yield RECORDS[1]
+
+
+@ns.route("/records/<string:broken>")
+class Records(Resource):
+    @streaming.marshal_list_with(ns, record_model)
+    def get(self, broken: str):
+        return RECORDS
+
+    def stream(self, broken: str):
+        return _generate(broken)
+
+
+class TestMarshalListWith(unittest.TestCase):
+    def setUp(self):
+        app = Flask(__name__)
+        api = Api(app)
+        api.add_namespace(ns, path="/test")
+        self.client = app.test_client()
+
+    def test_json_by_default(self):
+        response = self.client.get("/test/records/none")
+
+        self.assertEqual(response.json, [{"name": "a", "value": 1}, {"name": "b", "value": 2}])
+
+    def test_query_flag(self):
+        response = self.client.get("/test/records/none?stream=true")
+
+        self.assertEqual(response.mimetype, streaming.NDJSON)
+        lines = [json.loads(line) for line in response.data.decode().splitlines()]
+        self.assertEqual(lines, [{"name": "a", "value": 1}, {"name": "b", "value": 2}])
+
+    def test_accept_header(self):
+        response = self.client.get("/test/records/none", headers={"Accept": streaming.NDJSON})
+
+        self.assertEqual(len(response.data.decode().splitlines()), 2)
+
+    def test_error_before_the_first_record(self):
+        response = self.client.get("/test/records/first?stream=true")
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_error_after_the_first_record(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            response = self.client.get("/test/records/later?stream=true")
+
+        lines = [json.loads(line) for line in response.data.decode().splitlines()]
+        self.assertEqual(lines, [{"name": "a", "value": 1}, {"error": "lost the connection"}])
+
+
+if __name__ == '__main__':
+    unittest.main()
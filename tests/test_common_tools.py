@@ -35,6 +35,36 @@ class TestIsMemberClub(unittest.TestCase):
         result = tools.is_member_club("OtherThing", [ { "name": "Thing" } ])
         self.assertFalse(result)
 
+    def test_spelling_variant(self):
+        result = tools.is_member_club("So Cal  Blues SC (CA)", [ { "name": "SoCal Blues" } ])
+        self.assertTrue(result)
+
+class TestNormalizeClubName(unittest.TestCase):
+
+
+    def test_none(self):
+        result = tools.normalize_club_name(None)
+        self.assertEqual(result, "")
+
+    def test_case_and_spaces(self):
+        result = tools.normalize_club_name("  So Cal   Blues ")
+        self.assertEqual(result, "so cal blues")
+
+class TestCanonicalGender(unittest.TestCase):
+    def test_none(self):
+        self.assertIsNone(tools.canonical_gender(None))
+
+    def test_spellings(self):
+        for gender in ("Female", "F", "W", " women ", "Women's", "girls"):
+            self.assertEqual(tools.canonical_gender(gender), "female")
+
+        for gender in ("Male", "M", "men", "Men's", "boys"):
+            self.assertEqual(tools.canonical_gender(gender), "male")
+
+    def test_unknown(self):
+        self.assertEqual(tools.canonical_gender(" All "), "all")
+
+
 class TestGetAnchorText(unittest.TestCase):
 
 
@@ -0,0 +1,16 @@
+import unittest
+
+from benchmarks import bench_import
+
+
+class TestImportApi(unittest.TestCase):
+    def test_no_network_io(self):
+        """
+        Test that importing the api package never touches the network.
+        """
+        result = bench_import.measure_import("api")
+        self.assertEqual(result["attempts"], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import contextlib
+import io
+import unittest
+from unittest import mock
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from benchmarks import pages
+from common import parsing
+
+
+class TestHasClass(unittest.TestCase):
+    def test_matches_one_of_several_classes(self):
+        html = "<div><table class='table table-striped'><tr><td>x</td></tr></table><table class='other'></table></div>"
+        soup = BeautifulSoup(html, "html.parser", parse_only=SoupStrainer("table", class_=parsing.has_class("table-striped")))
+        self.assertEqual(len(soup.find_all("table")), 1)
+
+    def test_none(self):
+        self.assertFalse(parsing.has_class("item")(None))
+
+
+class TestGetParserName(unittest.TestCase):
+    def test_explicit(self):
+        with mock.patch("common.config.HTML_PARSER", "html.parser"):
+            self.assertEqual(parsing.get_parser_name(), "html.parser")
+
+    def test_auto(self):
+        with mock.patch("common.config.HTML_PARSER", "auto"):
+            self.assertIn(parsing.get_parser_name(), ("lxml", "html.parser"))
+
+
+class TestTargetedParsing(unittest.TestCase):
+    def test_same_result_as_full_tree(self):
+        """
+        Test that every page type extracts the same records from the strained tree as from the full page.
+        """
+        with pages.offline(), contextlib.redirect_stdout(io.StringIO()):
+            for page in pages.HTML_PAGES:
+                with self.subTest(page=page.name):
+                    content = page.load()
+                    expected = page.parse_full(content)
+
+                    self.assertTrue(expected)
+                    self.assertEqual(page.parse_targeted(content), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from common import memo
+from lib import store
+from lib import topdrawer
+from lib.topdrawer import Conference, Player, School
+
+
+class TestStore(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+        self.now = 1000.0
+        patcher = mock.patch.object(store, "_now", lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.store = store.Store("sqlite:///" + os.path.join(self.directory.name, "store.sqlite"))
+
+    def test_player_upserts_merge(self):
+        url = "https://www.topdrawersoccer.com/club-player-profile/jane-doe/pid-42"
+        failed = Player(name="Jane Doe", url=url, team="U17", league="ECNL", error="timeout")
+        self.store.save_players([failed], detailed=True)
+
+        # The profile page failed, so the player has no details yet.
+        self.assertIsNone(self.store.get_player(42, 60))
+
+        self.store.save_players([Player(name="Jane Doe", url=url, club="Sting", rating="4 star")], detailed=True)
+        # A search row fills in what the profile did not say, without overwriting it.
+        self.store.save_players([Player(id="42", name="Jane Doe", club="Sting Austin", state="TX")])
+
+        self.assertEqual(self.store.get_player(42, 60), {
+            "name": "Jane Doe", "url": url, "team": "U17", "league": "ECNL", "club": "Sting", "rating": "4 star",
+            "state": "TX",
+        })
+        self.assertEqual([player["id"] for player in self.store.get_players(club="Sting")], [42])
+
+        self.now += 61
+        self.assertIsNone(self.store.get_player(42, 60))
+
+    def test_commitments_round_trip(self):
+        schools = [
+            School(name="Duke", url="https://www.topdrawersoccer.com/duke/clgid-7", clgid=7, players=[
+                Player(name="A", url="/club-player-profile/a/pid-1", year="2025", club="Sting", league="ECNL"),
+                Player(name="B", url="/club-player-profile/b/pid-2", year="2025"),
+            ]),
+            School(name="No Link", players=[]),
+        ]
+        self.store.save_commitments("commits:female:di:ACC:2025", schools)
+
+        loaded = self.store.load_commitments("commits:female:di:ACC:2025", 60)
+
+        self.assertEqual([school["name"] for school in loaded], ["Duke", "No Link"])
+        self.assertEqual([player["name"] for player in loaded[0]["players"]], ["A", "B"])
+
+        self.store.save_players([Player(name="A", url="/club-player-profile/a/pid-1", club="Search Spelling FC")])
+        reloaded = self.store.load_commitments("commits:female:di:ACC:2025", 60)
+        self.assertEqual((reloaded[0]["players"][0]["club"], reloaded[0]["players"][0]["league"]), ("Sting", "ECNL"))
+        self.assertEqual([player["id"] for player in self.store.get_players(clgid=7)], [1, 2])
+        self.assertIsNone(self.store.load_commitments("commits:female:di:ACC:2024", 60))
+
+        self.now += 61
+        self.assertIsNone(self.store.load_commitments("commits:female:di:ACC:2025", 60))
+
+    def test_listing_keeps_page_order_and_drops_removed_members(self):
+        self.store.save_conferences("female", "di", [Conference(id=2, name="B", url="b"), Conference(id=1, name="A")])
+        self.store.save_conferences("female", "di", [Conference(id=3, name="C", url="c"), Conference(id=2, name="B2")])
+
+        self.assertEqual(self.store.load_conferences("female", "di", 60), [
+            {"id": 3, "name": "C", "url": "c"}, {"id": 2, "name": "B2", "url": None}
+        ])
+        self.assertIsNone(self.store.load_conferences("male", "di", 60))
+        self.assertEqual(self.store.get_stats()["conferences"], 3)
+
+    def test_rankings_and_clubs(self):
+        ranking = [{"rank": 1, "school": "UCLA"}, {"rank": 2, "school": "Stanford"}]
+        self.store.save_rankings("rpi", ranking)
+        self.store.save_clubs("ECNL", [{"name": "Sting", "state": "TX"}])
+
+        self.assertEqual(self.store.load_rankings("rpi", 60), ranking)
+        self.assertEqual(self.store.load_clubs("ECNL"), ([{"name": "Sting", "state": "TX"}], 1000.0))
+        self.assertEqual(self.store.load_clubs("GA"), (None, 0))
+
+
+class TestReadThrough(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+        store_url = "sqlite:///" + os.path.join(self.directory.name, "store.sqlite")
+        patcher = mock.patch("common.config.STORE_URL", store_url)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_player_details_from_the_store(self):
+        url = "https://www.topdrawersoccer.com/club-player-profile/jane-doe/pid-42"
+        player = Player(id=42, name="Jane Doe", url=url, club="Sting")
+        store.save_players([player], detailed=True)
+
+        with mock.patch.object(topdrawer, "load_player_details") as load_player_details:
+            loaded = topdrawer.get_player_details.__wrapped__("jane doe", 42)
+
+        load_player_details.assert_not_called()
+        self.assertEqual(loaded, player)
+
+    def test_conference_commits_from_the_store(self):
+        schools = [School(name="Duke", clgid=7, players=[Player(name="A", url="/pid-1", club="Sting", league="ECNL")])]
+        store.save_commitments("conference:female:3:2025", schools)
+
+        with mock.patch.object(topdrawer.fetch, "get_parsed") as get_parsed:
+            loaded = topdrawer.get_conference_details.__wrapped__("female", "ACC", 3, 2025)
+
+        get_parsed.assert_not_called()
+        self.assertEqual(loaded, schools)
+
+    def test_refresh_skips_rows_stale_within_its_horizon(self):
+        url = "https://www.topdrawersoccer.com/club-player-profile/jane-doe/pid-42"
+        store.save_players([Player(id=42, name="Jane Doe", url=url, club="Sting")], detailed=True)
+
+        with mock.patch.object(topdrawer, "load_player_details") as load_player_details:
+            # A warm-up whose next round comes before the row goes stale reads it.
+            with memo.refreshing(3600):
+                topdrawer.get_player_details.__wrapped__("jane doe", 42)
+
+            load_player_details.assert_not_called()
+
+            with memo.refreshing(86400):
+                topdrawer.get_player_details.__wrapped__("jane doe", 42)
+
+        load_player_details.assert_called_once()
+        self.assertIsNotNone(store.load_player(42, 60))
+
+    def test_disabled(self):
+        with mock.patch("common.config.STORE_URL", ""):
+            self.assertIsNone(store.get_store())
+            self.assertIsNone(store.load_rankings("rpi", 60))
+            self.assertEqual(store.load_clubs("ECNL"), (None, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
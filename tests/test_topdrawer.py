@@ -1,5 +1,13 @@
+import os
+import tempfile
 import unittest
+from unittest import mock
 
+from flask import Flask
+from flask_caching import Cache
+
+from common import pagestore
+from lib import analytics
 from lib import topdrawer
 
 
@@ -33,5 +41,148 @@ class TestGetIdentifierFromUrl(unittest.TestCase):
         result = topdrawer.get_identifier_from_url(url)
         self.assertEqual(result, 30)
 
+
+class TestMergeSearchedPlayers(unittest.TestCase):
+    def test_empty(self):
+        result = topdrawer._merge_searched_players([])
+        self.assertEqual(result, [])
+
+    def test_keeps_page_order_and_drops_duplicates(self):
+        """
+        Test that players are merged in page order and only the first occurrence of an id is kept.
+        """
+        pages = [
+            [{"id": "1", "name": "a"}, {"id": "2", "name": "b"}],
+            [{"id": "2", "name": "b again"}, {"id": "3", "name": "c"}],
+        ]
+        result = topdrawer._merge_searched_players(pages)
+        self.assertEqual([player["name"] for player in result], ["a", "b", "c"])
+
+class TestCanonicalKeys(unittest.TestCase):
+    def setUp(self):
+        app = Flask(__name__)
+        self.cache = Cache()
+        self.cache.init_app(app, {"CACHE_TYPE": "SimpleCache"})
+
+        patchers = [
+            mock.patch("common.memo.default_cache", self.cache),
+            mock.patch("common.config.STORE_URL", ""),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_college_details_by_clgid(self):
+        """
+        Test that every spelling of the gender and the college name shares one entry.
+        """
+        with mock.patch.object(topdrawer.fetch, "get_parsed", return_value={"coach": "A"}) as get_parsed:
+            topdrawer.get_college_details("Female", "Wake Forest", 42)
+            topdrawer.get_college_details("women", "wake forest ", 42)
+            topdrawer.get_college_details("male", "Wake Forest", 42)
+
+        self.assertEqual(get_parsed.call_count, 2)
+        self.assertIn("/women/wake-forest/clgid-42", get_parsed.call_args_list[0][0][0])
+        self.assertIn("/men/wake-forest/clgid-42", get_parsed.call_args_list[1][0][0])
+
+    def test_college_details_of_each_gender_are_stored_apart(self):
+        """
+        Test that the men's and women's pages of one college do not overwrite each other in the store.
+        """
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+
+        pages = {"/women/": {"coach": "Her Coach"}, "/men/": {"coach": "His Coach"}}
+
+        def get_parsed(url, parse):
+            return next(details for path, details in pages.items() if path in url)
+
+        store_url = "sqlite:///" + os.path.join(directory.name, "store.sqlite")
+        with mock.patch("common.config.STORE_URL", store_url), \
+                mock.patch.object(topdrawer.fetch, "get_parsed", side_effect=get_parsed) as fetched:
+            women = topdrawer.get_college_details("female", "Wake Forest", 42)
+            men = topdrawer.get_college_details("male", "Wake Forest", 42)
+
+            # A new process, with an empty cache, reads both from the store.
+            self.cache.clear()
+            stored = [topdrawer.get_college_details(gender, "Wake Forest", 42) for gender in ("women", "men")]
+
+        self.assertEqual((women["coach"], men["coach"]), ("Her Coach", "His Coach"))
+        self.assertEqual(stored, [women, men])
+        self.assertEqual(fetched.call_count, 2)
+
+    def test_player_profile_by_pid(self):
+        """
+        Test that the profile is loaded once per player id and copied into every player record.
+        """
+        page = pagestore.StoredPage("", b'<ul class="profile_grid"><li>Club: Sting</li></ul>', {}, 0)
+        url = "https://www.topdrawersoccer.com/club-player-profile/jane-doe/pid-42"
+
+        first = topdrawer.Player(name="Jane Doe", url=url)
+        second = topdrawer.Player(name="Jane Doe", url=url.replace("jane-doe", "jane"))
+
+        with mock.patch.object(topdrawer.fetch, "get", return_value=page) as get, \
+                mock.patch.object(topdrawer, "_get_league", return_value="ECNL"):
+            topdrawer.load_player_details(first)
+            topdrawer.load_player_details(second)
+
+        get.assert_called_once_with(url)
+        self.assertEqual((second["club"], second["league"]), ("Sting", "ECNL"))
+
+
+    def test_conference_page_is_cached_without_player_details(self):
+        """
+        Test that only the schools are parsed from the conference page and the players are loaded afterwards.
+        """
+        url = "https://www.topdrawersoccer.com/club-player-profile/jane-doe/pid-42"
+        schools = [topdrawer.School(name="Duke", players=[topdrawer.Player(name="Jane Doe", url=url, club="Sting")])]
+
+        def load_player_details(player):
+            player["rating"] = "5 star"
+
+        with mock.patch.object(topdrawer.fetch, "get_parsed", return_value=schools) as get_parsed, \
+                mock.patch.object(topdrawer, "load_player_details", load_player_details), \
+                mock.patch.object(topdrawer.clubs, "get_club_name", lambda club: club), \
+                mock.patch.object(topdrawer, "_get_league", return_value="ECNL"):
+            loaded = topdrawer.get_conference_details("female", "ACC", 3, 2025)
+
+        self.assertIs(get_parsed.call_args[0][1], topdrawer._parse_conference_schools)
+        self.assertEqual(loaded[0]["players"][0]["rating"], "5 star")
+
+    def test_conference_commits_by_cfid(self):
+        """
+        Test that every spelling of the gender and the conference name shares one entry.
+        """
+        conferences = [topdrawer.Conference(id=3, name="ACC", url="https://www.topdrawersoccer.com/acc/cfid-3")]
+
+        with mock.patch.object(topdrawer, "get_conferences", return_value=conferences), \
+                mock.patch.object(topdrawer.fetch, "get_content", return_value=b"") as get_content, \
+                mock.patch.object(topdrawer, "_extract_conference_commits", return_value=[]):
+            topdrawer.get_conference_commits("Female", "di", "ACC", 2025)
+            topdrawer.get_conference_commits("W", "DI", " acc", 2025)
+            topdrawer.get_conference_commits("female", "di", "ACC", 2026)
+
+            self.assertEqual(topdrawer._conference_key("women", "di", "Acc", 2025), ("female", "di", 3, 2025))
+
+        self.assertEqual(get_content.call_count, 2)
+
+    def test_chart_data_is_recorded_under_the_listed_conference(self):
+        """
+        Test that the chart data reuses the commits crawl of the conference's division and name.
+        """
+        conferences = {"di": [topdrawer.Conference(id=3, name="ACC")], "dii": [topdrawer.Conference(id=4, name="PSAC")]}
+        schools = [topdrawer.School(name="Duke", players=[topdrawer.Player(name="Jane Doe", league="ECNL")])]
+        table = analytics.CommitmentTable()
+
+        with mock.patch.object(topdrawer, "get_conferences", lambda gender, division: conferences.get(division, [])), \
+                mock.patch.object(topdrawer, "get_conference_commits", return_value=schools) as get_commits, \
+                mock.patch.object(analytics, "COMMITMENTS", table):
+            shares = topdrawer.get_conference_commitment_chart_data("Women", "psac ", 4, 2025)
+
+        get_commits.assert_called_once_with("Women", "dii", "PSAC", 2025)
+        self.assertEqual(shares, [{"name": "ECNL 100%", "league": "ECNL", "value": 1}])
+        self.assertEqual(table.count(("division",), conference="PSAC")[1], [({"division": "dii"}, 1)])
+
+
 if __name__ == '__main__':
     unittest.main()
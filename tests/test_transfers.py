@@ -0,0 +1,132 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from common.pagestore import StoredPage
+from lib import transfers
+from lib.topdrawer import Transfer
+
+TRACKER = {
+    "id": 50187,
+    "year": 2022,
+    "gender": "female",
+    "division": "di",
+    "url": "https://www.topdrawersoccer.com/college-soccer-articles/2022-womens-di-transfer-tracker_aid50187",
+}
+
+LINKED = "/college-soccer-articles/2023-mens-dii-transfer-tracker_aid51000"
+
+
+def _transfer(name: str, school: str):
+    return Transfer(name=name, url=f"/club-player-profile/{name.lower()}/pid-1", position="D", newSchoolName=school)
+
+
+class TestFindTrackers(unittest.TestCase):
+    def test_links(self):
+        text = f'<a href="{LINKED}">Men</a> <a href="https://www.topdrawersoccer.com{LINKED}">again</a>'
+
+        self.assertEqual(transfers.find_trackers(text), {51000: {
+            "id": 51000, "year": 2023, "gender": "male", "division": "dii",
+            "url": "https://www.topdrawersoccer.com" + LINKED,
+        }})
+
+    def test_parse_tracker(self):
+        fixtures = os.path.join(os.path.dirname(os.path.dirname(__file__)), "benchmarks", "fixtures")
+        path = os.path.join(fixtures, "tds_transfer_tracker.html")
+        with open(path, "rb") as f:
+            page = StoredPage(TRACKER["url"], f.read(), {}, 0)
+
+        rows, links = transfers._parse_tracker(page)
+
+        self.assertEqual(rows[0]["name"], "Nora Lee")
+        self.assertEqual(rows[0]["newSchoolName"], "Clemson")
+        self.assertIsInstance(links, dict)
+
+
+class TestIngest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+        self.pages = {TRACKER["url"]: ([_transfer("Ann", "Duke"), _transfer("Bea", "UCLA")], {})}
+
+        patchers = [
+            mock.patch("common.config.STORE_URL", "sqlite:///" + os.path.join(self.directory.name, "store.sqlite")),
+            mock.patch.object(transfers, "get_trackers", lambda: [TRACKER]),
+            mock.patch.object(transfers.fetch, "get_parsed", lambda url, parse: self.pages[url]),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def ingest(self):
+        return transfers.ingest.__wrapped__()
+
+    def test_only_changes_are_recorded(self):
+        self.assertEqual(self.ingest()["added"], 2)
+
+        unchanged = self.ingest()
+        self.assertEqual((unchanged["added"], unchanged["changed"], unchanged["removed"]), (0, 0, 0))
+        self.assertEqual(unchanged["sequence"], 2)
+
+        self.pages[TRACKER["url"]] = ([_transfer("Ann", "Stanford"), _transfer("Cat", "Duke")], {})
+        totals = self.ingest()
+
+        self.assertEqual((totals["added"], totals["changed"], totals["removed"]), (1, 1, 1))
+
+        with mock.patch.object(transfers, "ingest"):
+            current, sequence = transfers.get_transfers()
+            changes, _ = transfers.get_transfers(since=2)
+
+        self.assertEqual(sequence, 5)
+        self.assertEqual(
+            [(record["name"], record["newSchoolName"]) for record in current], [("Ann", "Stanford"), ("Cat", "Duke")]
+        )
+        self.assertEqual(
+            [(record["name"], record["sequence"], record["removed"]) for record in changes],
+            [("Ann", 3, False), ("Cat", 4, False), ("Bea", 5, True)],
+        )
+        self.assertEqual(current[0]["year"], 2022)
+
+    def test_linked_trackers_are_followed(self):
+        linked = dict(TRACKER, id=51000, year=2023, gender="male", division="dii")
+        linked["url"] = "https://www.topdrawersoccer.com" + LINKED
+        self.pages[TRACKER["url"]] = ([_transfer("Ann", "Duke")], {51000: linked})
+        self.pages[linked["url"]] = ([_transfer("Dan", "Tampa")], {50187: TRACKER})
+
+        totals = self.ingest()
+
+        self.assertEqual((totals["trackers"], totals["added"]), (2, 2))
+
+        with mock.patch.object(transfers, "ingest"):
+            men, _ = transfers.get_transfers(gender="male")
+
+        self.assertEqual([record["name"] for record in men], ["Dan"])
+
+    def test_transfers_are_read_from_the_store_only(self):
+        self.ingest()
+
+        with mock.patch.object(transfers, "ingest") as ingest, \
+                mock.patch.object(transfers, "ingest_in_background") as ingest_in_background:
+            ingest.peek.return_value = None
+            records, sequence = transfers.get_transfers()
+
+        ingest.assert_not_called()
+        ingest_in_background.assert_called_once_with()
+        self.assertEqual((len(records), sequence), (2, 2))
+
+    def test_failed_tracker_keeps_its_rows(self):
+        self.ingest()
+
+        with mock.patch.object(transfers.fetch, "get_parsed", side_effect=Exception("timeout")):
+            totals = self.ingest()
+
+        self.assertEqual((totals["failed"], totals["removed"]), (1, 0))
+
+        with mock.patch.object(transfers, "ingest"):
+            self.assertEqual(len(transfers.get_transfers()[0]), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import contextlib
+import io
+import unittest
+from unittest import mock
+
+from lib import warmup
+
+
+class TestWarmupScheduler(unittest.TestCase):
+    def setUp(self):
+        conferences = [{"id": 1, "name": "ACC"}, {"id": 2, "name": "Big Ten"}]
+
+        patchers = [
+            mock.patch("lib.topdrawer.get_conferences", return_value=conferences),
+            mock.patch("lib.topdrawer.get_conference_commits"),
+            mock.patch("lib.topdrawer.get_conference_commitment_chart_data"),
+            mock.patch("lib.transfers.ingest"),
+        ]
+        self.get_conferences, self.get_commits, self.get_chart_data, self.ingest = [
+            patcher.start() for patcher in patchers
+        ]
+        for patcher in patchers:
+            self.addCleanup(patcher.stop)
+
+        self.scheduler = warmup.WarmupScheduler(interval=60, workers=2, years=[2024, 2025], divisions=["di"])
+
+    def test_run_once(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            status = self.scheduler.run_once()
+
+        self.assertEqual(status["state"], "idle")
+        self.assertEqual(status["rounds"], 1)
+        self.assertEqual(status["total"], 8)
+        self.assertEqual(status["done"], 8)
+        self.assertEqual(status["failed"], 0)
+        self.assertIn("female/di/Big Ten/2025", [job["name"] for job in status["jobs"]])
+
+        self.get_commits.assert_any_call("male", "di", "ACC", 2024)
+        self.get_commits.assert_any_call("female", "di", "Big Ten", 2025)
+
+        # The chart data would crawl every player a second time.
+        self.get_chart_data.assert_not_called()
+
+        self.ingest.assert_called_once_with()
+
+    def test_failed_jobs_are_counted(self):
+        self.get_commits.side_effect = [RuntimeError("upstream is down")] + [None] * 7
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            status = self.scheduler.run_once()
+
+        self.assertEqual(status["done"], 8)
+        self.assertEqual(status["failed"], 1)
+        self.assertEqual([job["error"] for job in status["jobs"] if job["error"]], ["upstream is down"])
+
+
+class TestGetActiveYears(unittest.TestCase):
+    def test_configured(self):
+        with mock.patch("common.config.WARMUP_YEARS", "2024, 2025"):
+            self.assertEqual(warmup.get_active_years(), [2024, 2025])
+
+    def test_default(self):
+        with mock.patch("common.config.WARMUP_YEARS", ""):
+            self.assertEqual(len(warmup.get_active_years()), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()